@@ -0,0 +1,167 @@
+"""
+Headless batch analysis of a range of runs, for use without a display (e.g. on compute nodes or in cron jobs). Each
+run is loaded with the default corrections in the config, then the peaks in each detector are found, matched to
+muonic X-rays and fitted. Results are written to CSV or HDF5.
+
+Example:
+    python -m EVA.batch 3063-3070 -d /data/cycle_24_1 -o results.csv -j 8
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+# paths given on the command line are relative to where the command was run from
+INVOCATION_DIRECTORY = os.getcwd()
+
+# Changes cwd to root so that paths can be specified relative to root level - MUST BE BEFORE ANY EVA IMPORTS
+ROOT = Path(__file__).resolve().parent.parent.parent.parent
+os.chdir(ROOT)
+
+from EVA.batch import output, pipeline
+
+
+def make_parser() -> argparse.ArgumentParser:
+    defaults = pipeline.AnalysisOptions()
+    parser = argparse.ArgumentParser(
+        prog="python -m EVA.batch",
+        description="Find, identify and fit the peaks of a range of runs without the gui.",
+    )
+    parser.add_argument(
+        "runs", nargs="+", help="run numbers or ranges, e.g. 3063-3070 3075 3080-3090:2"
+    )
+    parser.add_argument(
+        "-d",
+        "--directory",
+        help="directory to load runs from (default: working directory in config)",
+    )
+    parser.add_argument(
+        "-o", "--output", required=True, help="file to write results to"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=output.output_formats,
+        help="output format (default: from output file extension)",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes (default: number of cpus)",
+    )
+    parser.add_argument(
+        "--method",
+        choices=list(pipeline.peakfind_methods),
+        default=defaults.peakfind_method,
+        help="peak finding method",
+    )
+    parser.add_argument("--height", type=float, default=defaults.height)
+    parser.add_argument("--threshold", type=float, default=defaults.threshold)
+    parser.add_argument("--distance", type=float, default=defaults.distance)
+    parser.add_argument(
+        "--search-width",
+        type=float,
+        default=defaults.search_width,
+        help="width to search for muonic X-rays around each peak, in keV",
+    )
+    parser.add_argument(
+        "--fit-width",
+        type=float,
+        default=defaults.fit_width,
+        help="half-width of range to fit around each peak, in keV",
+    )
+    parser.add_argument(
+        "--no-fit", action="store_true", help="do not fit the peaks which are found"
+    )
+    parser.add_argument(
+        "--max-elements",
+        type=int,
+        default=defaults.max_elements,
+        help="number of most likely elements to write for each detector",
+    )
+    parser.add_argument(
+        "--database",
+        choices=("mudirac", "legacy"),
+        help="muonic X-ray database (default: database in config)",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Runs the batch analysis.
+
+    Args:
+        argv: command line arguments, defaults to sys.argv
+
+    Returns:
+        Exit code - 0 if all runs were analysed (or not found), 1 if any failed, 2 for invalid arguments.
+    """
+    parser = make_parser()
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)s: %(message)s",
+    )
+
+    try:
+        run_list = pipeline.parse_run_list(args.runs)
+    except ValueError as e:
+        parser.error(str(e))
+
+    output_path = os.path.join(INVOCATION_DIRECTORY, args.output)
+    output_format = output.get_output_format(output_path, args.format)
+    options = pipeline.AnalysisOptions(
+        peakfind_method=args.method,
+        height=args.height,
+        threshold=args.threshold,
+        distance=args.distance,
+        search_width=args.search_width,
+        fit=not args.no_fit,
+        fit_width=args.fit_width,
+        mu_xray_db=args.database,
+        max_elements=args.max_elements,
+    )
+
+    directory = (
+        os.path.join(INVOCATION_DIRECTORY, args.directory) if args.directory else None
+    )
+    settings = pipeline.get_load_settings(directory)
+
+    t0 = time.time()
+    results = []
+    for result in pipeline.iter_analyse_runs(
+        run_list, settings, options, max_workers=args.workers
+    ):
+        results.append(result)
+        print(
+            f"[{len(results)}/{len(run_list)}] run {result.run_num}: {result.status}"
+            + (f" ({len(result.peaks)} peaks)" if result.status == "done" else ""),
+            file=sys.stderr,
+        )
+
+    # keep runs in the order they were given, as workers finish out of order
+    order = {run_num: i for i, run_num in enumerate(run_list)}
+    results.sort(key=lambda result: order[result.run_num])
+
+    paths = output.write_results(results, output_path, output_format)
+    print(
+        f"Analysed {len(run_list)} runs in {time.time() - t0:.1f}s. Results written to {', '.join(paths)}",
+        file=sys.stderr,
+    )
+
+    return 1 if any(result.status == "failed" for result in results) else 0
+
+
+if __name__ == "__main__":
+    # needed for worker processes of frozen executables
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,179 @@
+import csv
+import os
+from dataclasses import asdict, fields
+import h5py
+import numpy as np
+
+from EVA.batch.pipeline import PeakResult, RunResult
+
+PEAK_COLUMNS = [f.name for f in fields(PeakResult)]
+ELEMENT_COLUMNS = [
+    "run_num",
+    "detector",
+    "rank",
+    "element",
+    "score",
+    "confidence",
+    "peaks_matched",
+    "peaks",
+]
+RUN_COLUMNS = ["run_num", "status", "message", "peaks_found"]
+
+output_formats = ("csv", "hdf5")
+
+
+def get_output_format(path: str, output_format: str | None) -> str:
+    """Gets the output format from its name, or the extension of the output path if it is not given."""
+    if output_format is not None:
+        return output_format
+
+    if os.path.splitext(path)[1].lower() in (".h5", ".hdf5", ".nxs"):
+        return "hdf5"
+    return "csv"
+
+
+def get_tables(results: list[RunResult]) -> dict[str, list[dict]]:
+    """
+    Flattens analysis results into tables.
+
+    Args:
+        results: results of analysed runs
+
+    Returns:
+        Dict of {"peaks": rows, "elements": rows, "runs": rows}, where each row is a dict of {column: value}.
+    """
+    peaks = []
+    elements = []
+    runs = []
+
+    for result in results:
+        peaks.extend(asdict(peak) for peak in result.peaks)
+        runs.append(
+            {
+                "run_num": result.run_num,
+                "status": result.status,
+                "message": result.message,
+                "peaks_found": len(result.peaks),
+            }
+        )
+
+        for detector, scores in result.elements.items():
+            for rank, score in enumerate(scores, start=1):
+                peaks_matched = score.peaks
+                elements.append(
+                    {
+                        "run_num": result.run_num,
+                        "detector": detector,
+                        "rank": rank,
+                        "element": score.element,
+                        "score": score.score,
+                        "confidence": score.confidence,
+                        "peaks_matched": len(peaks_matched),
+                        "peaks": " ".join(f"{peak:.2f}" for peak in peaks_matched),
+                    }
+                )
+
+    return {"peaks": peaks, "elements": elements, "runs": runs}
+
+
+def get_output_paths(path: str) -> dict[str, str]:
+    """
+    Gets the paths of the CSV files results are written to - peaks are written to path, and the element and run
+    summaries to files next to it.
+
+    Args:
+        path: path to write peaks to, e.g. "results.csv"
+
+    Returns:
+        Dict of {table: path}, e.g. {"peaks": "results.csv", "elements": "results_elements.csv", ...}.
+    """
+    root, ext = os.path.splitext(path)
+    ext = ext or ".csv"
+
+    return {
+        "peaks": root + ext,
+        "elements": f"{root}_elements{ext}",
+        "runs": f"{root}_runs{ext}",
+    }
+
+
+def write_csv(results: list[RunResult], path: str) -> list[str]:
+    """
+    Writes analysis results to CSV files, see ``get_output_paths()``.
+
+    Args:
+        results: results of analysed runs
+        path: path to write peaks to
+
+    Returns:
+        List of paths written to.
+    """
+    tables = get_tables(results)
+    columns = {"peaks": PEAK_COLUMNS, "elements": ELEMENT_COLUMNS, "runs": RUN_COLUMNS}
+    paths = get_output_paths(path)
+
+    for name, rows in tables.items():
+        with open(paths[name], "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=columns[name])
+            writer.writeheader()
+            writer.writerows(rows)
+
+    return list(paths.values())
+
+
+def write_hdf5(results: list[RunResult], path: str) -> list[str]:
+    """
+    Writes analysis results to an HDF5 file, with a group for each table ("peaks", "elements" and "runs") holding a
+    dataset for each column.
+
+    Args:
+        results: results of analysed runs
+        path: path of HDF5 file
+
+    Returns:
+        List of paths written to.
+    """
+    tables = get_tables(results)
+    columns = {"peaks": PEAK_COLUMNS, "elements": ELEMENT_COLUMNS, "runs": RUN_COLUMNS}
+
+    with h5py.File(path, "w") as file:
+        for name, rows in tables.items():
+            group = file.create_group(name)
+
+            for column in columns[name]:
+                values = [row[column] for row in rows]
+
+                if values and isinstance(values[0], str):
+                    group.create_dataset(column, data=values, dtype=h5py.string_dtype())
+                else:
+                    group.create_dataset(
+                        column, data=np.asarray(values) if values else np.empty(0)
+                    )
+
+    return [path]
+
+
+def write_results(results: list[RunResult], path: str, output_format: str) -> list[str]:
+    """
+    Writes analysis results to file.
+
+    Args:
+        results: results of analysed runs
+        path: path to write to
+        output_format: "csv" or "hdf5"
+
+    Returns:
+        List of paths written to.
+
+    Raises:
+        ValueError: If output_format is unknown.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    if output_format == "csv":
+        return write_csv(results, path)
+    if output_format == "hdf5":
+        return write_hdf5(results, path)
+
+    raise ValueError(f"Unknown output format '{output_format}'.")
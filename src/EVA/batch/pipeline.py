@@ -0,0 +1,394 @@
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+import numpy as np
+
+from EVA.core.context import EvaContext, get_context, set_context
+from EVA.core.data_loading import load_data
+from EVA.core.data_searching import element_scoring, get_match
+from EVA.core.fitting import fit_data
+from EVA.core.peak_finding import find_peaks
+
+logger = logging.getLogger(__name__)
+
+# peak finding methods as in the elemental analysis window, with the background estimator each uses
+peakfind_methods = {
+    "background": "mean filter",
+    "snip": "snip",
+    "rolling-ball": "rolling ball",
+    "scipy": None,
+}
+
+# fewest points in a fit window which are fitted - a Gaussian on a quadratic background has 6 parameters
+MIN_FIT_POINTS = 7
+
+
+@dataclass
+class AnalysisOptions:
+    """Settings of each step of the analysis of a run. Defaults are the defaults of the elemental analysis window."""
+
+    peakfind_method: str = "background"
+    height: float = 10
+    threshold: float = 15
+    distance: float = 1
+    search_width: float = 1
+    fit: bool = True
+    fit_width: float = 10
+    mu_xray_db: str | None = None
+    max_elements: int = 7
+
+
+@dataclass
+class PeakResult:
+    """A peak found in a spectrum, with its closest muonic X-ray match and fitted Gaussian."""
+
+    run_num: str
+    detector: str
+    energy: float
+    height: float
+    element: str = ""
+    transition: str = ""
+    database_energy: float = math.nan
+    diff: float = math.nan
+    fit_centre: float = math.nan
+    fit_centre_error: float = math.nan
+    fit_sigma: float = math.nan
+    fit_amplitude: float = math.nan
+    fit_redchi: float = math.nan
+
+
+@dataclass
+class RunResult:
+    """
+    Result of analysing a run. Status is "done" if the run was analysed, "not found" if there are no files for the
+    run, or "failed" if the analysis raised an error, which is stored in message. Elements holds the most likely
+    elements of each detector, highest score first.
+    """
+
+    run_num: str
+    status: str
+    message: str = ""
+    peaks: list[PeakResult] = field(default_factory=list)
+    elements: dict[str, list[element_scoring.ElementScore]] = field(
+        default_factory=dict
+    )
+
+
+def parse_run_list(runs: list[str]) -> list[str]:
+    """
+    Parses run numbers and ranges of run numbers given on the command line.
+
+    Args:
+        runs: list of run numbers, ranges ("3063-3070") and ranges with steps ("3063-3070:2"), which may also be
+            separated by commas
+
+    Returns:
+        List of run numbers.
+
+    Raises:
+        ValueError: If a run number or range is invalid.
+    """
+    run_list = []
+
+    for item in ",".join(runs).split(","):
+        item = item.strip()
+        if not item:
+            continue
+
+        run_range, _, step = item.partition(":")
+        start, _, end = run_range.partition("-")
+
+        if not end:
+            run_list.append(str(int(start)))
+            continue
+
+        start, end, step = int(start), int(end), int(step or 1)
+        if end < start or step < 1:
+            raise ValueError(f"Invalid run range '{item}'.")
+
+        run_list.extend(str(run_num) for run_num in range(start, end + 1, step))
+
+    return run_list
+
+
+def get_load_settings(working_directory: str | None = None) -> dict:
+    """
+    Gets the settings to load runs with, using the default corrections in the config.
+
+    Args:
+        working_directory: directory to load runs from, defaults to the working directory in the config
+
+    Returns:
+        Dict of keyword arguments for ``load_data.load_run()``.
+    """
+    return load_data.get_load_settings(working_directory=working_directory)
+
+
+def fit_peak(x: np.ndarray, y: np.ndarray, centre: float, width: float) -> dict | None:
+    """
+    Fits a Gaussian on a quadratic background to a peak.
+
+    Args:
+        x: x-data of spectrum
+        y: y-data of spectrum
+        centre: energy of peak
+        width: half-width of the energy range to fit
+
+    Returns:
+        Dict of fitted "centre", "centre_error", "sigma", "amplitude" and "redchi", or None if the peak could not be
+        fitted.
+    """
+    # bins without counts are left out, as the fit is weighted by 1/sqrt(counts)
+    mask = (np.abs(x - centre) <= width) & (y > 0)
+    if np.count_nonzero(mask) < MIN_FIT_POINTS:
+        return None
+
+    x_fit, y_fit = x[mask], y[mask]
+    background = float(np.min(y_fit))
+    height = float(np.max(y_fit)) - background
+
+    peak_params = {
+        "p0": {
+            "center": {"value": centre, "min": centre - width, "max": centre + width},
+            "sigma": {"value": 1, "min": 0, "max": width},
+            "amplitude": {"value": height * math.sqrt(2 * math.pi), "min": 0},
+        }
+    }
+    bg_params = {
+        "background": {
+            "a": {"value": 0, "vary": True},
+            "b": {"value": 0, "vary": True},
+            "c": {"value": background, "vary": True},
+        }
+    }
+
+    try:
+        result = fit_data.fit_gaussian_lmfit(x_fit, y_fit, peak_params, bg_params)
+    except (TypeError, ValueError) as e:
+        logger.debug("Failed to fit peak at %s: %s", centre, e)
+        return None
+
+    stderr = result.params["p0_center"].stderr
+    return {
+        "centre": result.params["p0_center"].value,
+        "centre_error": stderr if stderr is not None else math.nan,
+        "sigma": result.params["p0_sigma"].value,
+        "amplitude": result.params["p0_amplitude"].value,
+        "redchi": result.redchi,
+    }
+
+
+def analyse_spectrum(
+    run_num: str,
+    detector: str,
+    x: np.ndarray,
+    y: np.ndarray,
+    options: AnalysisOptions,
+    context: EvaContext | None = None,
+    indices: np.ndarray | None = None,
+    heights: np.ndarray | None = None,
+) -> tuple[list[PeakResult], list[element_scoring.ElementScore]]:
+    """
+    Finds peaks in a spectrum, matches them to muonic X-rays and fits them, and scores the elements which explain the
+    peaks.
+
+    Args:
+        run_num: run number of spectrum
+        detector: detector of spectrum
+        x: x-data of spectrum
+        y: y-data of spectrum
+        options: analysis settings
+        context: context to search the databases of, defaults to ``get_context()``
+        indices: indices of the peaks in the spectrum, if they have already been found (see
+            ``find_peaks.find_peaks_in_spectra()``)
+        heights: heights of the peaks above background, if they have already been found
+
+    Returns:
+        Tuple of (peaks, most likely elements), see ``element_scoring.score_elements()``.
+    """
+    if indices is None:
+        peaks, _ = find_peaks.find_peaks_batch(
+            x,
+            y[np.newaxis],
+            options.height,
+            options.threshold,
+            options.distance,
+            peakfind_methods[options.peakfind_method],
+        )[0]
+        indices = peaks[0]
+        heights = peaks[1].get("peak_heights")
+    positions = x[indices]
+
+    matches, _, _ = get_match.search_muxrays(
+        [[position, options.search_width] for position in positions], context=context
+    )
+
+    # closest match to each peak
+    best_matches = {}
+    for match in matches:
+        best = best_matches.get(match["peak_centre"])
+        if best is None or match["diff"] < best["diff"]:
+            best_matches[match["peak_centre"]] = match
+
+    results = []
+    for index, position in zip(indices, positions):
+        peak = PeakResult(run_num, detector, float(position), float(y[index]))
+
+        match = best_matches.get(float(position))
+        if match is not None:
+            peak.element = match["element"]
+            peak.transition = match["transition"]
+            peak.database_energy = match["energy"]
+            peak.diff = match["diff"]
+
+        if options.fit:
+            fit = fit_peak(x, y, float(position), options.fit_width)
+            if fit is not None:
+                peak.fit_centre = fit["centre"]
+                peak.fit_centre_error = fit["centre_error"]
+                peak.fit_sigma = fit["sigma"]
+                peak.fit_amplitude = fit["amplitude"]
+                peak.fit_redchi = fit["redchi"]
+
+        results.append(peak)
+
+    elements = element_scoring.score_elements(
+        positions, heights, detector, (x[0], x[-1]), context=context
+    )
+
+    return results, elements[: options.max_elements]
+
+
+def analyse_run(
+    run_num: str,
+    settings: dict,
+    options: AnalysisOptions,
+    context: EvaContext | None = None,
+) -> RunResult:
+    """
+    Loads a run with corrections applied, then finds, matches and fits the peaks in the spectrum of each detector.
+    Errors are stored in the result rather than raised, so that one bad run does not stop a batch.
+
+    Args:
+        run_num: run number to analyse
+        settings: keyword arguments for ``load_data.load_run()``, see ``get_load_settings()``
+        options: analysis settings
+        context: context to search the databases of, defaults to ``get_context()``
+
+    Returns:
+        RunResult of run.
+    """
+    try:
+        run, flags = load_data.load_run(run_num, **settings)
+
+        if flags["no_files_found"]:
+            return RunResult(run_num, "not found")
+
+        result = RunResult(run_num, "done")
+        detectors = [
+            detector
+            for detector in run.loaded_detectors
+            if run.data[detector].x.size > 0
+        ]
+
+        # the peaks of all detectors are found in one go
+        all_peaks = find_peaks.find_peaks_in_spectra(
+            [(run.data[detector].x, run.data[detector].y) for detector in detectors],
+            options.height,
+            options.threshold,
+            options.distance,
+            peakfind_methods[options.peakfind_method],
+        )
+
+        for detector, (found, _) in zip(detectors, all_peaks):
+            spectrum = run.data[detector]
+            peaks, elements = analyse_spectrum(
+                run_num,
+                detector,
+                spectrum.x,
+                spectrum.y,
+                options,
+                context,
+                indices=found[0],
+                heights=found[1].get("peak_heights"),
+            )
+            result.peaks.extend(peaks)
+            result.elements[detector] = elements
+
+        logger.info("Found %s peaks in run %s.", len(result.peaks), run_num)
+        return result
+
+    except Exception as e:
+        logger.error("Failed to analyse run %s: %s", run_num, e)
+        return RunResult(run_num, "failed", message=str(e))
+
+
+def init_worker(context: EvaContext | None = None, mu_xray_db: str | None = None):
+    """
+    Sets up a worker process (or the main process) to run analyses without a gui. No QApplication is needed - the
+    databases and config are held by the process's ``EvaContext``.
+
+    Args:
+        context: context to use in the process, e.g. the (pickled) context of the parent process. Defaults to
+            ``get_context()``, which reads the config from file.
+        mu_xray_db: muonic X-ray database to use ("mudirac" or "legacy"), defaults to the one in the config
+    """
+    if context is not None:
+        set_context(context)
+    context = get_context()
+
+    if mu_xray_db == "legacy":
+        context.use_legacy_muon_db()
+    elif mu_xray_db == "mudirac":
+        context.use_mudirac_muon_db()
+
+
+def iter_analyse_runs(
+    run_list: list[str],
+    settings: dict,
+    options: AnalysisOptions,
+    max_workers: int | None = None,
+):
+    """
+    Analyses a list of runs, yielding the result of each run as soon as it is done. Runs are shared between a pool of
+    worker processes, so may finish out of order.
+
+    Args:
+        run_list: list of run numbers to analyse
+        settings: keyword arguments for ``load_data.load_run()``, see ``get_load_settings()``
+        options: analysis settings
+        max_workers: maximum number of worker processes, defaults to the number of cpus. Set to 1 to analyse all
+            runs in the calling process.
+
+    Yields:
+        RunResult of each run.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(run_list))
+
+    init_worker(mu_xray_db=options.mu_xray_db)
+
+    if max_workers <= 1:
+        for run_num in run_list:
+            yield analyse_run(run_num, settings, options)
+        return
+
+    # spawned rather than forked, as forking a process with running threads (h5py, Qt) can deadlock
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        # workers get the config of this process rather than reading it from file - databases are loaded lazily
+        initargs=(get_context(), options.mu_xray_db),
+    ) as executor:
+        futures = [
+            executor.submit(analyse_run, run_num, settings, options)
+            for run_num in run_list
+        ]
+
+        for future in as_completed(futures):
+            yield future.result()
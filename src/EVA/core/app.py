@@ -1,14 +1,13 @@
-import json
 import logging
-import time
 import matplotlib
 from PyQt6.QtCore import QThreadPool
 
 from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import QApplication
+from EVA.core.context import EvaContext, get_context, set_context
 from EVA.core.settings.config import Config
-from EVA.core.data_loading import load_mu_xray_db, load_gamma_db
 from EVA.util.path_handler import get_path
+from EVA.util.worker import Worker
 
 logger = logging.getLogger(__name__)
 
@@ -18,59 +17,39 @@ def get_app():
     Shorthand function to quickly access the App instance.
 
     Returns:
-        Instance of App currently running.
+        Instance of App currently running, or None if there is no gui - use ``get_context()`` for settings and
+        databases, which are available with or without the gui.
     """
     return QApplication.instance()
 
 
 def get_config():
     """
-    Shorthand function to get the Config object instance from App.
+    Shorthand function to get the Config object instance of the current context (the App, if the gui is running).
 
     Returns:
-        Instance of Config from the App.
+        Config of the current context - the Config of the App if the gui is running.
     """
-    return get_app().config
+    return get_context().config
 
 
-class App(QApplication):
+class App(QApplication, EvaContext):
     """
     The app class contains all settings, parameters, etc. of the app. It has a single instance (created in main.py)
     which can be accessed anywhere using QApplication.instance(). The instance can easily be returned using the
-    shorthand function get_app().
+    shorthand function get_app(). The App is the EvaContext of the gui, see ``EvaContext``.
     """
 
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+        QApplication.__init__(self, *args, **kwargs)
+        EvaContext.__init__(self, Config())
+        set_context(self)
         self.main_window = None
         self.setWindowIcon(QIcon(get_path("icon.ico")))
 
-        # store config in app
-        self.config = Config()
-
-        # load and store databases in app
-        t0 = time.time_ns()
-        self.gamma_database = load_gamma_db.load_gamma_data()
-        self.mudirac_muon_database_with_intensity = load_mu_xray_db.load_mudirac_data()
-        self.mudirac_muon_database = load_mu_xray_db.load_extended_mudirac_data()
-        self.legacy_muon_database = load_mu_xray_db.load_legacy_data()
-
-        with open(
-            get_path("src/EVA/databases/electronic_xrays/xray_booklet_data.json")
-        ) as e_xray_file:
-            self.e_xray_database = json.load(e_xray_file)
-
-        logger.debug("Loaded all databases in %ss.", (time.time_ns() - t0) / 1e9)
-
-        # Check config and set default "muon database" accordingly
-        if self.config["database"]["mu_xray_db"] == "legacy":
-            self.muon_database = self.legacy_muon_database
-            logger.info("Using legacy muon database.")
-        elif self.config["database"]["mu_xray_db"] == "mudirac":
-            logger.info("Using mudirac muon database.")
-            self.muon_database = self.mudirac_muon_database
-        else:
-            raise KeyError  # Invalid muon database in config
+        # Check config to make sure the selected "muon database" is valid - it is loaded on first use
+        self._check_muon_database_config()
+        logger.info("Using %s muon database.", self.config["database"]["mu_xray_db"])
 
         self.threadpool = QThreadPool()
         logger.debug(
@@ -78,21 +57,17 @@ class App(QApplication):
             self.threadpool.maxThreadCount(),
         )
 
-    def use_mudirac_muon_db(self):
+    def prefetch_databases(self):
         """
-        Sets current muonic X-ray database in App to mudirac and updates configurations.
+        Starts loading all databases in a background thread, so that they are (usually) ready by the time they are
+        first used. Anything using a database before it has been loaded will wait for it to finish loading.
         """
-        self.muon_database = self.mudirac_muon_database
-        self.config["database"]["mu_xray_db"] = "mudirac"
-        logger.info("Muon database has been set to mudirac.")
-
-    def use_legacy_muon_db(self):
-        """
-        Sets current muonic X-ray database in App to legacy and updates configurations.
-        """
-        self.muon_database = self.legacy_muon_database
-        self.config["database"]["mu_xray_db"] = "legacy"
-        logger.info("Muon database has been set to legacy.")
+        worker = Worker(self.load_all_databases)
+        worker.signals.error.connect(
+            lambda e: logger.error("Failed to prefetch databases: %s", e[1])
+        )
+        self.threadpool.start(worker)
+        logger.debug("Started prefetching databases in the background.")
 
     # reset the app to its initial state
     def reset(self):
@@ -108,12 +83,8 @@ class App(QApplication):
             None  # "delete" main window - garbage collection will take care of it
         )
 
-        # Check config and set default "muon database" accordingly
-        if self.config["database"]["mu_xray_db"] == "legacy":
-            self.muon_database = self.legacy_muon_database
-        elif self.config["database"]["mu_xray_db"] == "mudirac":
-            self.muon_database = self.mudirac_muon_database
-        else:
-            raise KeyError("Invalid muon database in config")
+        # Check config and reset "muon database" accordingly - it is resolved from config on next use
+        self._check_muon_database_config()
+        self.muon_database = None
 
         matplotlib.pyplot.close()
@@ -0,0 +1,268 @@
+import json
+import logging
+import threading
+import time
+
+from EVA.core.data_loading import load_mu_xray_db, load_gamma_db
+from EVA.core.data_searching.muxray_index import MuXrayIndex
+from EVA.core.data_structures.gamma_database import GammaDatabase
+from EVA.core.settings.config_data import ConfigData
+from EVA.util.path_handler import get_path
+
+logger = logging.getLogger(__name__)
+
+# context returned by get_context() - the App when the gui is running
+_context = None
+
+
+def get_context() -> "EvaContext":
+    """
+    Gets the current context, which is the App if the gui is running. If no context has been set, a new context is
+    created with the settings in config.json.
+
+    Returns:
+        The current EvaContext.
+    """
+    global _context
+
+    if _context is None:
+        _context = EvaContext()
+
+    return _context
+
+
+def set_context(context: "EvaContext | None"):
+    """
+    Sets the context returned by ``get_context()``, e.g. in a worker process.
+
+    Args:
+        context: context to use, or None to create a new context on next use
+    """
+    global _context
+    _context = context
+
+
+def load_e_xray_data() -> dict:
+    """
+    Loads the electronic X-ray database.
+
+    Returns:
+        Dict of {element: {transition: energy}}.
+    """
+    with open(
+        get_path("src/EVA/databases/electronic_xrays/xray_booklet_data.json")
+    ) as e_xray_file:
+        return json.load(e_xray_file)
+
+
+class EvaContext:
+    """
+    Settings and databases used by the core of EVA, without any Qt. Databases are loaded on first use, so a context
+    is cheap to create. The App is the context of the gui, and a plain context is used where there is no gui (e.g.
+    ``python -m EVA.batch``) - see ``get_context()``. Core functions which use settings or databases take an optional
+    context, so a different context can be passed in (e.g. in tests or benchmarks).
+
+    Contexts can be pickled, e.g. to send to worker processes. Only the settings are pickled - databases are loaded
+    again on first use - and a pickled App is unpickled as a plain EvaContext.
+    """
+
+    def __init__(self, config: ConfigData | None = None):
+        """
+        Args:
+            config: settings to use, read from config.json on first use if not given
+        """
+        self._config = config
+        self._muon_database = None
+        self._muon_database_index = None
+        self._muon_database_index_all_isotopes = None
+
+        # databases are loaded on first use (or prefetched in the background, see App.prefetch_databases()), so that
+        # startup does not have to wait for databases which may never be used in a session
+        self._database_loaders = {
+            "gamma_database": load_gamma_db.load_gamma_data,
+            "mudirac_muon_database_with_intensity": load_mu_xray_db.load_mudirac_data,
+            "mudirac_muon_database": load_mu_xray_db.load_extended_mudirac_data,
+            "legacy_muon_database": load_mu_xray_db.load_legacy_data,
+            "e_xray_database": load_e_xray_data,
+        }
+        self._databases = {}
+        self._database_locks = {
+            name: threading.Lock() for name in self._database_loaders
+        }
+
+    def __reduce__(self):
+        return EvaContext.from_settings, (self.config.to_dict(),)
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> "EvaContext":
+        """
+        Creates a context from settings, without reading config.json.
+
+        Args:
+            settings: dict of all settings, e.g. from ``config.to_dict()``
+
+        Returns:
+            New context.
+        """
+        return cls(ConfigData(settings))
+
+    @property
+    def config(self) -> ConfigData:
+        """
+        The settings of the context. Read from config.json on first use if they were not given.
+        """
+        if self._config is None:
+            self._config = ConfigData()
+        return self._config
+
+    def _get_database(self, name: str):
+        """
+        Gets a database, loading it if it has not been loaded yet. Safe to call from multiple threads - if the
+        database is being loaded in another thread, this waits for that load to finish instead of loading it again.
+
+        Args:
+            name: name of database attribute, e.g. "gamma_database"
+
+        Returns:
+            The loaded database.
+        """
+        database = self._databases.get(name)
+        if database is not None:
+            return database
+
+        with self._database_locks[name]:
+            # may have been loaded by another thread while waiting for the lock
+            if name not in self._databases:
+                t0 = time.time_ns()
+                self._databases[name] = self._database_loaders[name]()
+                logger.debug("Loaded %s in %ss.", name, (time.time_ns() - t0) / 1e9)
+
+        return self._databases[name]
+
+    @property
+    def gamma_database(self) -> GammaDatabase:
+        """
+        The gamma transition database. Loaded on first use.
+        """
+        return self._get_database("gamma_database")
+
+    @property
+    def mudirac_muon_database_with_intensity(self) -> dict:
+        """
+        The mudirac muonic X-ray database with estimated intensities. Loaded on first use.
+        """
+        return self._get_database("mudirac_muon_database_with_intensity")
+
+    @property
+    def mudirac_muon_database(self) -> dict:
+        """
+        The extended mudirac muonic X-ray database. Loaded on first use.
+        """
+        return self._get_database("mudirac_muon_database")
+
+    @property
+    def legacy_muon_database(self) -> dict:
+        """
+        The legacy muonic X-ray database. Loaded on first use.
+        """
+        return self._get_database("legacy_muon_database")
+
+    @property
+    def e_xray_database(self) -> dict:
+        """
+        The electronic X-ray database. Loaded on first use.
+        """
+        return self._get_database("e_xray_database")
+
+    def load_all_databases(self, progress_callback=None):
+        """
+        Loads all databases which have not been loaded yet.
+
+        Args:
+            progress_callback: optional signal to emit progress to, as {"current": n, "total": N}
+        """
+        t0 = time.time_ns()
+
+        for i, name in enumerate(self._database_loaders):
+            self._get_database(name)
+
+            if progress_callback is not None:
+                progress_callback.emit(
+                    {"current": i + 1, "total": len(self._database_loaders)}
+                )
+
+        logger.debug("Loaded all databases in %ss.", (time.time_ns() - t0) / 1e9)
+
+    def _check_muon_database_config(self):
+        """
+        Checks that the muon database selected in the config is valid.
+
+        Raises:
+            KeyError: If current muon database in config is invalid.
+        """
+        if self.config["database"]["mu_xray_db"] not in ("legacy", "mudirac"):
+            raise KeyError("Invalid muon database in config")
+
+    @property
+    def muon_database(self) -> dict:
+        """
+        The muonic X-ray database currently in use. If no database has been set, the database selected in the config
+        is used (and loaded if necessary).
+        """
+        if self._muon_database is None:
+            self._check_muon_database_config()
+            if self.config["database"]["mu_xray_db"] == "legacy":
+                self.muon_database = self.legacy_muon_database
+            else:
+                self.muon_database = self.mudirac_muon_database
+
+        return self._muon_database
+
+    @muon_database.setter
+    def muon_database(self, database: dict | None):
+        # search indices are only valid for the database they were built from
+        if database is not self._muon_database:
+            self._muon_database_index = None
+            self._muon_database_index_all_isotopes = None
+
+        self._muon_database = database
+
+    @property
+    def muon_database_index(self) -> MuXrayIndex:
+        """
+        Search index over the default isotopes of the current muonic X-ray database. Built on first use and rebuilt
+        only when the muonic X-ray database is changed.
+        """
+        if self._muon_database_index is None:
+            self._muon_database_index = MuXrayIndex.from_database(self.muon_database)
+
+        return self._muon_database_index
+
+    @property
+    def muon_database_index_all_isotopes(self) -> MuXrayIndex:
+        """
+        Search index over all isotopes of the current muonic X-ray database. Built on first use and rebuilt only when
+        the muonic X-ray database is changed.
+        """
+        if self._muon_database_index_all_isotopes is None:
+            self._muon_database_index_all_isotopes = MuXrayIndex.from_database(
+                self.muon_database, all_isotopes=True
+            )
+
+        return self._muon_database_index_all_isotopes
+
+    def use_mudirac_muon_db(self):
+        """
+        Sets current muonic X-ray database in App to mudirac and updates configurations.
+        """
+        self.muon_database = self.mudirac_muon_database
+        self.config["database"]["mu_xray_db"] = "mudirac"
+        logger.info("Muon database has been set to mudirac.")
+
+    def use_legacy_muon_db(self):
+        """
+        Sets current muonic X-ray database in App to legacy and updates configurations.
+        """
+        self.muon_database = self.legacy_muon_database
+        self.config["database"]["mu_xray_db"] = "legacy"
+        logger.info("Muon database has been set to legacy.")
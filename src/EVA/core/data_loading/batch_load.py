@@ -0,0 +1,161 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from EVA.core.data_loading import load_data
+from EVA.core.data_structures.run_nxs import RunNexus
+
+logger = logging.getLogger(__name__)
+
+# below this number of runs, starting worker processes takes longer than loading the runs one by one
+PROCESS_POOL_MIN_RUNS = 16
+
+# how often to check for cancellation while waiting for worker processes, in seconds
+CANCEL_POLL_INTERVAL = 0.2
+
+
+def read_run_arrays(run_num: str, settings: dict) -> dict:
+    """
+    Does the expensive part of loading a run - reading Biriani data files and histogramming Nexus event data - and
+    returns the results as plain arrays, which can be sent back from a worker process. Pass the result to
+    ``load_data.load_run()`` as ``preloaded`` to build the Run without doing the work again.
+
+    Args:
+        run_num: run number to load
+        settings: keyword arguments for ``load_data.load_run()``, as given by ``MainModel.get_load_settings()``
+
+    Returns:
+        Dict with either "spectra" - {detector: (x, y)} for Biriani runs, or "event_histograms" -
+        {detector: EventHistograms} for Nexus runs. Empty if no files were found.
+    """
+    run, flags = load_data.load_run(run_num, **settings)
+
+    if flags.get("no_files_found"):
+        return {}
+
+    arrays = get_run_arrays(run)
+
+    # close the file here, as the run is thrown away when this process returns
+    if isinstance(run, RunNexus):
+        for spectrum in run._raw.values():
+            if getattr(spectrum.energy, "file", None) is not None:
+                spectrum.energy.file.close()
+                break
+
+    return arrays
+
+
+def get_run_arrays(run) -> dict:
+    """
+    Gets the data of a loaded run which is expensive to read - the spectra of Biriani runs, and the event histograms
+    of Nexus runs. The arrays are shared with the run rather than copied, which is safe as corrections never change
+    the raw data of a run.
+
+    Args:
+        run: loaded run
+
+    Returns:
+        Dict which can be passed to ``load_data.load_run()`` as ``preloaded``, see ``read_run_arrays()``.
+    """
+    # the raw spectra are read directly rather than through get_raw(), as deep copying Nexus spectra would try to copy
+    # their h5py datasets
+    raw = run._raw
+
+    if isinstance(run, RunNexus):
+        histograms = {}
+        for detector, spectrum in raw.items():
+            spectrum_histograms = spectrum.event_histograms
+            if spectrum_histograms is not None:
+                histograms[detector] = spectrum_histograms
+
+        return {"event_histograms": histograms}
+
+    return {
+        "spectra": {
+            detector: (spectrum.x, spectrum.y)
+            for detector, spectrum in raw.items()
+            if detector in run.loaded_detectors
+        }
+    }
+
+
+def iter_load_runs(
+    run_list: list[str],
+    settings: dict,
+    is_cancelled=None,
+    max_workers: int | None = None,
+):
+    """
+    Loads a list of runs, yielding each run as soon as it has been loaded. Long lists of runs are read in parallel by
+    a pool of worker processes (see ``read_run_arrays()``), and the Run objects are then built on the calling thread
+    from the returned arrays, so runs can finish out of order. Short lists are loaded one by one on the calling
+    thread.
+
+    Args:
+        run_list: list of run numbers to load
+        settings: keyword arguments for ``load_data.load_run()``, as given by ``MainModel.get_load_settings()``
+        is_cancelled: optional function returning True if loading should stop
+        max_workers: maximum number of worker processes, defaults to the number of cpus. Set to 1 to load all runs
+            on the calling thread.
+
+    Yields:
+        Tuple of (index of run in run_list, Run, flags), see ``load_data.load_run()``.
+
+    Raises:
+        LoadCancelled: if is_cancelled returns True while runs are being loaded.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(run_list))
+
+    if max_workers <= 1 or len(run_list) < PROCESS_POOL_MIN_RUNS:
+        for i, run_num in enumerate(run_list):
+            run, flags = load_data.load_run(
+                run_num, is_cancelled=is_cancelled, **settings
+            )
+            yield i, run, flags
+        return
+
+    # worker processes are spawned rather than forked, as forking a process with running threads (Qt, h5py) can
+    # deadlock
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+    try:
+        futures = {
+            executor.submit(read_run_arrays, run_num, settings): i
+            for i, run_num in enumerate(run_list)
+        }
+        pending = set(futures)
+
+        while pending:
+            if is_cancelled is not None and is_cancelled():
+                raise load_data.LoadCancelled("Loading was cancelled.")
+
+            done, pending = wait(
+                pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED
+            )
+
+            for future in done:
+                i = futures[future]
+                try:
+                    preloaded = future.result()
+                except Exception as e:
+                    # load on this thread instead, which reports the error as loading one by one would
+                    logger.warning(
+                        "Failed to read run %s in worker process: %s", run_list[i], e
+                    )
+                    preloaded = None
+
+                run, flags = load_data.load_run(
+                    run_list[i],
+                    is_cancelled=is_cancelled,
+                    preloaded=preloaded,
+                    **settings,
+                )
+                yield i, run, flags
+
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,102 @@
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# binary copies of Biriani spectra are kept in this subdirectory of the data directory
+BRNI_CACHE_DIRECTORY = ".eva_cache"
+
+# bump if the layout of the cache files changes so old files are no longer used
+BRNI_CACHE_VERSION = 1
+
+
+def get_cache_path(file_path: str, stat: os.stat_result) -> str:
+    """
+    Gets the path of the binary copy of a Biriani data file. The size and modification time of the data file are part
+    of the file name, so a copy is never used once the data file has changed.
+
+    Args:
+        file_path: path to Biriani data file
+        stat: result of ``os.stat()`` on the data file
+
+    Returns:
+        Path to .npy file.
+    """
+    directory, filename = os.path.split(file_path)
+    return os.path.join(
+        directory,
+        BRNI_CACHE_DIRECTORY,
+        f"{filename}.v{BRNI_CACHE_VERSION}.{stat.st_size}.{stat.st_mtime_ns}.npy",
+    )
+
+
+def read_brni_spectrum(
+    file_path: str, use_cache: bool = True
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reads a Biriani ``.rooth*.dat`` spectrum. Parsing the text file is slow compared to reading a binary array, so the
+    first time a file is read a binary copy is saved to a cache directory next to it (see ``save_brni_cache()``), and
+    later reads load the copy instead, as long as the data file has not changed.
+
+    Args:
+        file_path: path to data file
+        use_cache: whether to read and write the binary copy
+
+    Returns:
+        Tuple of (x, y) arrays.
+
+    Raises:
+        FileNotFoundError: if the data file does not exist.
+    """
+    if not use_cache:
+        return np.loadtxt(file_path, delimiter=" ", unpack=True)
+
+    stat = os.stat(file_path)
+    cache_path = get_cache_path(file_path, stat)
+
+    try:
+        data = np.load(cache_path, allow_pickle=False)
+        return data[0], data[1]
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning("Failed to read cached copy of %s: %s", file_path, e)
+
+    xdata, ydata = np.loadtxt(file_path, delimiter=" ", unpack=True)
+    save_brni_cache(cache_path, xdata, ydata)
+
+    return xdata, ydata
+
+
+def save_brni_cache(cache_path: str, xdata: np.ndarray, ydata: np.ndarray):
+    """
+    Saves a binary copy of a Biriani spectrum, removing copies made from older versions of the same data file. Failing
+    to write the copy (e.g. read-only data directory) is not an error.
+
+    Args:
+        cache_path: path to save copy to, see ``get_cache_path()``
+        xdata: x values of spectrum
+        ydata: y values of spectrum
+    """
+    directory, cache_name = os.path.split(cache_path)
+    source_name = cache_name.split(f".v{BRNI_CACHE_VERSION}.")[0]
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+
+        # write to a temporary file first so that an interrupted write never leaves a broken copy behind
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, np.vstack([xdata, ydata]))
+        os.replace(tmp_path, cache_path)
+
+        for entry in os.scandir(directory):
+            if (
+                entry.name.startswith(source_name + ".")
+                and entry.name != cache_name
+                and not entry.name.endswith(".tmp.npy")
+            ):
+                os.remove(entry.path)
+
+    except OSError as e:
+        logger.debug("Could not write cached copy %s: %s", cache_path, e)
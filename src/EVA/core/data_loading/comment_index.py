@@ -0,0 +1,128 @@
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# each run in Comment.dat starts with a line "Run <run number>", followed by the run information
+RUN_HEADER_PATTERN = re.compile(r"^\s*Run\s+(\d+)\s*$")
+
+# lines after the header containing [start time, end time, number of events, comment]
+COMMENT_LINE_OFFSETS = (1, 2, 3, 5)
+
+EMPTY_COMMENT = [" ", " ", " ", " "]
+
+
+def parse_comment_file(lines: list[str]) -> dict[int, list[str]]:
+    """
+    Parses the lines of a Biriani Comment.dat file.
+
+    Args:
+        lines: lines of file, including line endings
+
+    Returns:
+        Dict of {run number: [start time, end time, number of events, comment]}, with each entry being the full line
+        from the file. If a run appears more than once, the first entry is used.
+    """
+    comments = {}
+
+    for i, line in enumerate(lines):
+        match = RUN_HEADER_PATTERN.match(line)
+        if match is None:
+            continue
+
+        run_num = int(match.group(1))
+        if run_num in comments:
+            continue
+
+        comments[run_num] = [
+            lines[i + offset] if i + offset < len(lines) else " "
+            for offset in COMMENT_LINE_OFFSETS
+        ]
+
+    return comments
+
+
+class CommentIndex:
+    """
+    Parsed contents of a Biriani Comment.dat file. The file is read once and parsed into a dict of run number to run
+    information, and only read again once its modification time changes, e.g. when a new run has been added during
+    an experiment.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path: path to Comment.dat
+        """
+        self.file_path = file_path
+        self._mtime = None
+        self._comments = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Parses the file again if it has changed since it was last read.
+
+        Raises:
+            OSError: if the file can not be read.
+        """
+        with self._lock:
+            mtime = os.stat(self.file_path).st_mtime_ns
+            if mtime == self._mtime:
+                return
+
+            with open(self.file_path, "r") as f:
+                self._comments = parse_comment_file(f.readlines())
+
+            self._mtime = mtime
+            logger.debug("Read %s runs from %s.", len(self._comments), self.file_path)
+
+    def find(self, run_num) -> list[str] | None:
+        """
+        Gets the information recorded for a run.
+
+        Args:
+            run_num: run number
+
+        Returns:
+            List of [start time, end time, number of events, comment], or None if the run is not in the file.
+
+        Raises:
+            OSError: if the file can not be read.
+        """
+        self.refresh()
+
+        try:
+            run_num = int(run_num)
+        except ValueError:
+            return None
+
+        with self._lock:
+            comment = self._comments.get(run_num)
+
+        return None if comment is None else list(comment)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_comment_index(directory: str) -> CommentIndex:
+    """
+    Gets the index of the Comment.dat file in a directory, which is shared by all runs loaded from the directory.
+
+    Args:
+        directory: directory containing Comment.dat
+
+    Returns:
+        CommentIndex of Comment.dat in directory.
+    """
+    key = os.path.normcase(os.path.abspath(directory))
+
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = CommentIndex(os.path.join(directory, "Comment.dat"))
+
+        return _indexes[key]
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+import numpy as np
+
+from EVA.core.physics.event_binning import EventHistograms
+
+logger = logging.getLogger(__name__)
+
+# histograms of Nexus event data are kept in this subdirectory of the data directory
+HISTOGRAM_CACHE_DIRECTORY = os.path.join(".eva_cache", "histograms")
+
+# bump if the layout of the cache files changes so old files are no longer used
+HISTOGRAM_CACHE_VERSION = 1
+
+# size limit used if none is set in the config
+DEFAULT_HISTOGRAM_CACHE_SIZE_MB = 256
+
+
+class HistogramCache:
+    """
+    Cache of event histograms (see ``EventHistograms``) stored as .npz files in a directory, which can be shared
+    between sessions and between users of the same data directory. Files are named by their key (see
+    ``make_key()``), and once the files take up more than the size limit the least recently used ones are
+    removed. Reading a file updates its modification time, which is used to find the least recently used files.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        """
+        Args:
+            directory: directory to store histograms in
+            max_bytes: size limit of all files in the directory
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        energy,
+        time,
+        time_windows: list[tuple],
+        bin_num: int,
+        bin_range: tuple,
+        time_bin_num: int | None,
+        time_range: tuple | None,
+    ) -> str | None:
+        """
+        Makes the key the event histograms of a detector are stored under. The key covers the file the events are read
+        from (name, size and modification time), the event datasets and their dtypes, and all binning parameters, so
+        histograms are never used for different data or binning.
+
+        Args:
+            energy: h5py dataset or EventAccessor of event energies
+            time: h5py dataset or EventAccessor of event times
+            time_windows: time windows energies are histogrammed for
+            bin_num: number of energy bins
+            bin_range: (min, max) range of energy histograms
+            time_bin_num: number of bins in time histogram
+            time_range: (min, max) range of time histogram
+
+        Returns:
+            Hex digest, or None if the events are not read from a file.
+        """
+        data_file = getattr(energy, "file", None)
+        if data_file is None:
+            return None
+
+        dataset_names = [
+            getattr(events, "dataset", events).name for events in (energy, time)
+        ]
+
+        try:
+            stat = os.stat(data_file.filename)
+        except OSError:
+            return None
+
+        description = {
+            "version": HISTOGRAM_CACHE_VERSION,
+            "file": os.path.basename(data_file.filename),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "datasets": dataset_names,
+            "dtypes": [str(energy.dtype), str(time.dtype)],
+            "time_windows": [list(window) for window in time_windows],
+            "bin_num": bin_num,
+            "bin_range": [float(value) for value in bin_range],
+            "time_bin_num": time_bin_num,
+            "time_range": time_range,
+        }
+        return hashlib.sha1(
+            json.dumps(description, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key: str, time_windows: list[tuple]) -> EventHistograms | None:
+        """
+        Loads event histograms from the cache.
+
+        Args:
+            key: key of histograms, see ``make_key()``
+            time_windows: time windows the histograms were made for, in the same order as when they were saved
+
+        Returns:
+            EventHistograms, or None if they are not in the cache.
+        """
+        path = self._path(key)
+
+        try:
+            with np.load(path, allow_pickle=False) as cached:
+                histograms = EventHistograms(
+                    bin_num=int(cached["bin_num"]),
+                    bin_range=tuple(float(value) for value in cached["bin_range"]),
+                    energy_centres=cached["energy_centres"],
+                    energy_counts=dict(
+                        zip(dict.fromkeys(time_windows), cached["energy_counts"])
+                    ),
+                )
+                if "time_counts" in cached.files:
+                    histograms.time_centres = cached["time_centres"]
+                    histograms.time_counts = cached["time_counts"]
+
+            os.utime(path)  # mark as recently used
+            logger.debug("Loaded event histograms from %s.", path)
+            return histograms
+
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning("Failed to read cached event histograms %s: %s", path, e)
+            return None
+
+    def put(self, key: str, histograms: EventHistograms):
+        """
+        Saves event histograms to the cache, then removes least recently used files until the cache fits in its size
+        limit. Failing to write to the cache (e.g. read-only data directory) is not an error.
+
+        Args:
+            key: key of histograms, see ``make_key()``
+            histograms: histograms to save
+        """
+        path = self._path(key)
+        arrays = {
+            "bin_num": histograms.bin_num,
+            "bin_range": np.asarray(histograms.bin_range, dtype=np.float64),
+            "energy_centres": histograms.energy_centres,
+            "energy_counts": np.asarray(list(histograms.energy_counts.values())),
+        }
+        if histograms.time_counts is not None:
+            arrays["time_centres"] = histograms.time_centres
+            arrays["time_counts"] = histograms.time_counts
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            # write to a temporary file first so that an interrupted write never leaves a broken file behind
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp.npz"
+            np.savez_compressed(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+            logger.debug("Saved event histograms to %s.", path)
+
+            self.evict()
+
+        except OSError as e:
+            logger.debug("Could not write cached event histograms %s: %s", path, e)
+
+    def evict(self):
+        """Removes least recently used files until the cache fits in its size limit."""
+        with self._lock:
+            entries = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".npz") and ".tmp." not in entry.name:
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:  # removed by another user of the cache already
+                    pass
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_histogram_cache(data_file_path: str, max_bytes: int) -> HistogramCache:
+    """
+    Gets the histogram cache for the data directory a Nexus file is in.
+
+    Args:
+        data_file_path: path to Nexus file
+        max_bytes: size limit of cache
+
+    Returns:
+        HistogramCache in the ``HISTOGRAM_CACHE_DIRECTORY`` of the data directory.
+    """
+    directory = os.path.join(
+        os.path.dirname(os.path.abspath(data_file_path)), HISTOGRAM_CACHE_DIRECTORY
+    )
+    key = os.path.normcase(directory)
+
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = HistogramCache(directory, max_bytes)
+
+        cache = _caches[key]
+        cache.max_bytes = max_bytes
+        return cache
@@ -1,13 +1,115 @@
 import numpy as np
 import os
 import h5py
+from EVA.core.data_loading import (
+    brni_cache,
+    comment_index,
+    histogram_cache,
+    run_index,
+)
+from EVA.core.context import EvaContext, get_context
+from EVA.core.physics.event_accessor import EventAccessor
 from EVA.core.data_structures.run import Run
 from EVA.core.data_structures.run_nxs import RunNexus
 from EVA.core.data_structures.run_brni import RunBiriani
 from EVA.core.data_structures.spectrum import Spectrum
 from EVA.core.data_structures.spectrum_nexus import SpectrumNexus
 
-from EVA.core.app import get_config
+
+class LoadCancelled(Exception):
+    """Raised while loading a run if the user has asked for loading to be cancelled."""
+
+
+class LoadProgress:
+    """
+    Reports the progress of loading a run in stages (opening files, reading metadata, histogramming events) to a
+    progress signal such as WorkerSignals.progress, and checks whether loading has been cancelled every time progress
+    is reported.
+    """
+
+    def __init__(self, progress_callback=None, is_cancelled=None):
+        """
+        Args:
+            progress_callback: signal to emit progress to, as {"stage": description, "current": n, "total": N}
+            is_cancelled: function returning True if loading should stop, e.g. when the user presses cancel
+        """
+        self.progress_callback = progress_callback
+        self.is_cancelled = is_cancelled
+        self.stage = ""
+
+    def check_cancelled(self):
+        """
+        Raises:
+            LoadCancelled: if loading has been cancelled.
+        """
+        if self.is_cancelled is not None and self.is_cancelled():
+            raise LoadCancelled("Loading was cancelled.")
+
+    def set_stage(self, stage: str, current: int = 0, total: int = 1):
+        """
+        Starts a new loading stage.
+
+        Args:
+            stage: description of stage, shown in the gui
+            current: progress within the stage
+            total: total progress of the stage
+        """
+        self.stage = stage
+        self.emit({"current": current, "total": total})
+
+    def emit(self, progress: dict):
+        """
+        Reports progress within the current stage. Can be passed as progress_callback to functions which report
+        progress to a signal, e.g. ``RunNexus.set_corrections()``.
+
+        Args:
+            progress: dict with keys "current" and "total"
+
+        Raises:
+            LoadCancelled: if loading has been cancelled.
+        """
+        self.check_cancelled()
+
+        if self.progress_callback is not None:
+            self.progress_callback.emit({"stage": self.stage, **progress})
+
+
+def get_load_settings(
+    corrections: dict | None = None,
+    working_directory: str | None = None,
+    context: EvaContext | None = None,
+) -> dict:
+    """
+    Gets the settings to load runs with from the config of a context.
+
+    Args:
+        corrections: corrections to load runs with, e.g. the saved corrections of a run. Defaults to the default
+            corrections in the config.
+        working_directory: directory to load runs from, defaults to the working directory in the config
+        context: context to take the config from, defaults to ``get_context()``
+
+    Returns:
+        Dict of keyword arguments for ``load_run()``.
+    """
+    config = (context or get_context()).config
+
+    if corrections is None:
+        corrections = config["default_corrections"]
+
+    return {
+        "working_directory": working_directory
+        or config["general"]["working_directory"],
+        "energy_corrections": corrections["detector_specific"],
+        "normalisation": corrections["normalisation"],
+        "binning": corrections["binning"],
+        "plot_mode": corrections["plot_mode"],
+        "prompt_limit": corrections["prompt_limit"],
+        "delayed_limit": corrections["delayed_limit"],
+        "event_dtypes": config["general"].get("event_dtypes"),
+        "histogram_cache_mb": config["general"].get(
+            "histogram_cache_size_mb", histogram_cache.DEFAULT_HISTOGRAM_CACHE_SIZE_MB
+        ),
+    }
 
 
 def load_run(
@@ -19,27 +121,77 @@ def load_run(
     plot_mode: str,
     prompt_limit: int,
     delayed_limit: int,
+    event_dtypes: dict | None = None,
+    histogram_cache_mb: float | None = None,
+    progress_callback=None,
+    is_cancelled=None,
+    preloaded: dict | None = None,
 ) -> tuple[Run, dict]:
     """
-    Attempts to load specified run as both Biriani and Nexus run files and returns whichever is found. Throws error if neither/both found."""
+    Loads specified run from whichever Biriani or Nexus files exist for it in the working directory. The files are
+    looked up in the run index of the working directory (see ``run_index.RunIndex``), so only the loader for the
+    format found is called. Throws error if neither/both found.
+
+    Args:
+        event_dtypes: optional dict of {"energy": dtype, "time": dtype} to convert Nexus event data to as it is read,
+            see ``event_accessor.EventAccessor``
+        histogram_cache_mb: size limit in MB of the on-disk cache of Nexus event histograms (see
+            ``histogram_cache.HistogramCache``), or None to not use the cache
+        progress_callback: optional signal (e.g. WorkerSignals.progress) to report loading progress to, see
+            ``LoadProgress``
+        is_cancelled: optional function returning True if loading should be cancelled
+        preloaded: optional dict of data already read for the run by ``batch_load.read_run_arrays()``, e.g. in a
+            worker process. May contain "spectra" (Biriani spectra) and "event_histograms" (Nexus event histograms),
+            which are then not read or computed again.
+
+    Raises:
+        LoadCancelled: if is_cancelled returns True while the run is being loaded.
+    """
+    progress = LoadProgress(progress_callback, is_cancelled)
+
+    if preloaded is None:
+        preloaded = {}
+
+    brni_files, nxs_file = run_index.get_run_index(working_directory).find(run_num)
+
+    nxs_flags = None
+    if nxs_file is not None:
+        nxs_run, nxs_flags = load_run_nxs(
+            run_num,
+            working_directory,
+            energy_corrections,
+            normalisation,
+            binning,
+            plot_mode,
+            prompt_limit,
+            delayed_limit,
+            progress=progress,
+            event_histograms=preloaded.get("event_histograms"),
+            file_path=nxs_file,
+            event_dtypes=event_dtypes,
+            histogram_cache_mb=histogram_cache_mb,
+        )
+        if not brni_files and nxs_flags["no_files_found"] == 0:
+            return nxs_run, nxs_flags
+
+    # also used as the empty run if no data was found
     brni_run, brni_flags = load_run_brni(
-        run_num, working_directory, energy_corrections, normalisation, binning
-    )
-    nxs_run, nxs_flags = load_run_nxs(
         run_num,
         working_directory,
         energy_corrections,
         normalisation,
         binning,
-        plot_mode,
-        prompt_limit,
-        delayed_limit,
+        progress=progress,
+        spectra=preloaded.get("spectra"),
+        detector_files=brni_files,
     )
-    if brni_flags["no_files_found"] == 1 and nxs_flags["no_files_found"] == 1:
+
+    nxs_found = nxs_flags is not None and nxs_flags["no_files_found"] == 0
+    if brni_flags["no_files_found"] == 1 and not nxs_found:
         return brni_run, {
             "no_files_found": 1
         }  # uses the empty run implementation from brni as default
-    if brni_flags["no_files_found"] == 0 and nxs_flags["no_files_found"] == 0:
+    if brni_flags["no_files_found"] == 0 and nxs_found:
         return brni_run, {"duplicate_files_found": 1}
 
     elif brni_flags["no_files_found"] == 0:
@@ -50,7 +202,8 @@ def load_run(
 
 def load_comment_brni(run_num: str, file_path: str) -> tuple[list[str], int]:
     """
-    Loads data from comment.dat at specified path.
+    Loads data from comment.dat at specified path. The file is parsed once and shared by all runs loaded from the
+    same directory, see ``comment_index.CommentIndex``.
 
     Args:
         run_num: run number to read for
@@ -62,32 +215,14 @@ def load_comment_brni(run_num: str, file_path: str) -> tuple[list[str], int]:
 
     """
     try:
-        fd = open(file_path + "/Comment.dat", "r")
-        # commenttext = open(globals.workingdirectory + '/comment.dat', 'r').readlines()
-        commenttext = fd.readlines()
-
-        search_str = "Run " + run_num
-        flag = 1
-        index = 0
-        for line in commenttext:
-            index += 1
-            if search_str in line:
-                flag = 0
-                break
-        if flag == 1:
-            rtn_str = [" ", " ", " ", " "]
-        else:
-            starttime_str = commenttext[index]
-            endtime_str = commenttext[index + 1]
-            events_str = commenttext[index + 2]
-            comment_str = commenttext[index + 4]
-            rtn_str = [starttime_str, endtime_str, events_str, comment_str]
-            fd.close()
+        rtn_str = comment_index.get_comment_index(file_path).find(run_num)
     except IOError:
-        rtn_str = [" ", " ", " ", " "]
-        flag = 1
+        rtn_str = None
 
-    return rtn_str, flag
+    if rtn_str is None:
+        return list(comment_index.EMPTY_COMMENT), 1
+
+    return rtn_str, 0
 
 
 def load_run_brni(
@@ -96,6 +231,9 @@ def load_run_brni(
     energy_corrections: dict,
     normalisation: str,
     binning: int,
+    progress: LoadProgress | None = None,
+    spectra: dict | None = None,
+    detector_files: dict | None = None,
 ) -> tuple[Run, dict]:
     """
     Loads the specified run by searching for the run in the working directory.
@@ -107,6 +245,10 @@ def load_run_brni(
     Args:
         run_num: run number to load for
         config: Config object
+        progress: optional LoadProgress to report progress to
+        spectra: optional dict of {detector: (x, y)} already read from the data files, which are then not read again
+        detector_files: optional dict of {detector: path} of the data files found for the run, e.g. from the run
+            index. Detectors which are not in the dict are not looked for.
 
     Returns:
         Returns a tuple containing the Run object and a dict containing error status, with keys ``no_files_found``,
@@ -115,7 +257,11 @@ def load_run_brni(
 
     channels = {"GE1": "2099", "GE2": "3099", "GE3": "4099", "GE4": "5099"}
 
+    if progress is None:
+        progress = LoadProgress()
+
     # Load metadata from comment
+    progress.set_stage("Reading metadata")
     comment_data, comment_flag = load_comment_brni(run_num, working_directory)
 
     raw = {}
@@ -123,11 +269,21 @@ def load_run_brni(
 
     none_loaded_flag = 1
 
-    for detector, channel in channels.items():
+    for i, (detector, channel) in enumerate(channels.items()):
+        progress.set_stage(f"Reading {detector}", i, len(channels))
         filename = f"{working_directory}/ral0{run_num}.rooth{channel}.dat"
         try:
             # Store data read from file in a Spectrum object
-            xdata, ydata = np.loadtxt(filename, delimiter=" ", unpack=True)
+            if spectra is not None:
+                if detector not in spectra:
+                    raise FileNotFoundError(filename)
+                xdata, ydata = spectra[detector]
+            elif detector_files is not None:
+                if detector not in detector_files:
+                    raise FileNotFoundError(filename)
+                xdata, ydata = brni_cache.read_brni_spectrum(detector_files[detector])
+            else:
+                xdata, ydata = brni_cache.read_brni_spectrum(filename)
             spectrum = Spectrum(detector=detector, run_number=run_num, x=xdata, y=ydata)
 
             raw[detector] = spectrum  # Add Spectrum to list of spectra
@@ -237,22 +393,47 @@ def open_hex_file(run_num: int, base_path: str, max_digits: int = 10):
     raise FileNotFoundError(f"No file found for run number {run_num} in {base_path}")
 
 
-def generate_spectrum_nxs(run_number, data_file):
+def nxs_detector_has_data(data_file: h5py.File, i: int) -> bool:
+    """
+    Checks whether a detector channel in a Nexus file recorded any data. Uses the number of prompt events stored in
+    the file where possible, so that the prompt spectrum does not need to be read.
+
+    Args:
+        data_file: open Nexus file
+        i: detector channel number (1-4)
+
+    Returns:
+        True if the detector has prompt counts or an efficiency histogram.
+
+    Raises:
+        KeyError: If the detector channel is missing from the file.
+    """
+    num_events = data_file.get(f"raw_data_1/detector_{i}_energyA/num_events")
+
+    if num_events is not None:
+        if np.any(num_events[()] > 0):
+            return True
+    elif data_file[f"raw_data_1/detector_{i}_energyA/counts"][()].any():
+        return True
+
+    return bool(data_file[f"raw_data_1/detector_{i}_energyHist/energy"][()].any())
+
+
+def generate_spectrum_nxs(run_number, data_file, event_dtypes: dict | None = None):
     """Build a SpectrumNexus object for each detector channel in Nexus file using references to raw and pre-binned data.
+    Event data is read through an EventAccessor, optionally converting it to the dtypes given in event_dtypes as
+    {"energy": dtype, "time": dtype}.
     Skips over detectors with missing data for now, eventually will handle missing detectors more gracefully TODO."""
+    if event_dtypes is None:
+        event_dtypes = {}
+
     raw = {}
     detectors = []
     none_loaded_flag = 1
-    config = get_config()
 
     for i in range(1, 5):
-        check_loaded_cond_1 = f"raw_data_1/detector_{i}_energyA/counts"
-        check_loaded_cond_2 = f"raw_data_1/detector_{i}_energyHist/energy"
         try:
-            if (
-                data_file[check_loaded_cond_1][()].any()
-                or data_file[check_loaded_cond_2][()].any()
-            ):
+            if nxs_detector_has_data(data_file, i):
                 detector_name = data_file[f"raw_data_1/instrument/detector_{i}/name"][
                     ()
                 ].decode("utf-8")
@@ -263,8 +444,14 @@ def generate_spectrum_nxs(run_number, data_file):
                 delayed_energy = data_file[f"raw_data_1/detector_{i}_energyB/energy"]
                 delayed_count = data_file[f"raw_data_1/detector_{i}_energyB/counts"]
 
-                energy = data_file[f"raw_data_1/detector_{i}_events/event_energy"]
-                time = data_file[f"raw_data_1/detector_{i}_events/event_time_offset"]
+                energy = EventAccessor(
+                    data_file[f"raw_data_1/detector_{i}_events/event_energy"],
+                    dtype=event_dtypes.get("energy"),
+                )
+                time = EventAccessor(
+                    data_file[f"raw_data_1/detector_{i}_events/event_time_offset"],
+                    dtype=event_dtypes.get("time"),
+                )
 
                 try:
                     efficiency_hist_energy = data_file[
@@ -317,14 +504,40 @@ def load_run_nxs(
     plot_mode: str,
     prompt_limit: int,
     delayed_limit: int,
+    progress: LoadProgress | None = None,
+    event_histograms: dict | None = None,
+    file_path: str | None = None,
+    event_dtypes: dict | None = None,
+    histogram_cache_mb: float | None = None,
 ) -> tuple[Run, dict]:
     """Loads nexus run file from given run number, collects data from each channel into dictionary of SpectrumNexus objects, stores in RunNexus object
-    along with run metadata, and apply any detected corrections from saved settings in config."""
+    along with run metadata, and apply any detected corrections from saved settings in config. If a progress object is
+    given, progress is reported for opening the file, reading metadata and histogramming the events of each detector.
+    Event histograms computed elsewhere (e.g. in a worker process) can be passed in as a dict of
+    {detector: EventHistograms}, in which case the events are not histogrammed again. If the path of the file is
+    already known (e.g. from the run index) it can be given as file_path, otherwise the file is searched for. Event
+    data can be converted to smaller dtypes as it is read by passing event_dtypes, see ``generate_spectrum_nxs()``.
+    If histogram_cache_mb is given, event histograms are stored in (and loaded from) an on-disk cache of that size
+    in the data directory, see ``histogram_cache.HistogramCache``.
+    """
+    if progress is None:
+        progress = LoadProgress()
+
+    try:
+        progress.set_stage("Opening file")
+        if file_path is not None:
+            data_file = h5py.File(file_path, "r")
+        else:
+            data_file = open_hex_file(int(run_num), working_directory)
+    except FileNotFoundError:
+        run = RunNexus.empty()
+        return run, {"no_files_found": 1}
+
     try:
-        data_file = open_hex_file(int(run_num), working_directory)
+        progress.set_stage("Reading metadata")
         comment_data, comment_flag = load_comment_nxs(data_file)
         detectors, raw, momentum, none_loaded_flag = generate_spectrum_nxs(
-            run_num, data_file
+            run_num, data_file, event_dtypes
         )
 
         run = RunNexus(
@@ -337,8 +550,19 @@ def load_run_nxs(
             delayed_limit=delayed_limit,
             momentum=momentum,
         )
+
+        if histogram_cache_mb is not None:
+            run.histogram_cache = histogram_cache.get_histogram_cache(
+                data_file.filename, int(histogram_cache_mb * 1024**2)
+            )
+
+        for detector, histograms in (event_histograms or {}).items():
+            if detector in raw:
+                raw[detector].event_histograms = histograms
+
         try:
-            # Apply corrections
+            # Apply corrections - event data of all detectors is histogrammed here if the plot mode needs it
+            progress.set_stage("Histogramming events")
             run.set_corrections(
                 energy_corrections,
                 normalise_which=None,
@@ -347,6 +571,7 @@ def load_run_nxs(
                 plot_mode=plot_mode,
                 prompt_limit=prompt_limit,
                 delayed_limit=delayed_limit,
+                progress_callback=progress,
             )
             norm_flag = 0
 
@@ -362,6 +587,6 @@ def load_run_nxs(
 
         return run, flags
 
-    except FileNotFoundError:
-        run = RunNexus.empty()
-        return run, {"no_files_found": 1}
+    except LoadCancelled:
+        data_file.close()
+        raise
@@ -1,9 +1,12 @@
 import os
 import sys
-from pathlib import Path
+import time
+import hashlib
 from collections import namedtuple
 import logging
+import numpy as np
 
+from EVA.core.data_structures.gamma_database import GammaDatabase
 from EVA.util.path_handler import get_path
 
 logger = logging.getLogger(__name__)
@@ -12,33 +15,179 @@ logger = logging.getLogger(__name__)
 bundle_dir = getattr(sys, "_MEIPASS", "")
 
 
-def load_gamma_data():
-    minZ, maxZ = 0, 118
+# compiled copy of the level files, rebuilt automatically whenever a level file changes
+gamma_cache_path = get_path("src/EVA/databases/gammas/gamma_levels_cache.npz")
 
+# bump if the layout of the cache file changes to force a rebuild
+GAMMA_CACHE_VERSION = 1
+
+
+def get_gamma_level_files() -> list[str]:
+    """
+    Gets paths to all gamma level files, ordered by atomic number.
+
+    Returns:
+        List of absolute file paths.
+    """
     gamma_levels_path = get_path("src/EVA/databases/gammas/levels/")
+    return [
+        os.path.abspath(os.path.join(gamma_levels_path, f"z{Z:03d}.dat"))
+        for Z in range(1, 119)
+    ]
+
+
+def load_gamma_data(use_cache: bool = True) -> GammaDatabase:
+    """
+    Loads gamma transitions for all elements. If a valid compiled cache of the level files exists it is loaded
+    directly, otherwise the level files are parsed and the cache is (re)written.
 
+    Args:
+        use_cache: whether to read and write the compiled cache
+
+    Returns:
+        GammaDatabase containing all gamma transitions.
+    """
+    level_files = get_gamma_level_files()
+
+    if use_cache:
+        t0 = time.time_ns()
+        database = load_gamma_cache(gamma_cache_path, level_files)
+        if database is not None:
+            logger.debug(
+                "Loaded gamma database from cache in %ss.", (time.time_ns() - t0) / 1e9
+            )
+            return database
+
+    t0 = time.time_ns()
     logger.debug("working directory: %s", os.getcwd())
 
     gamma_data = {}
+    for filename in level_files:
+        data, elem_name = decode_gammas(filename)
+        gamma_data[elem_name] = data
 
-    for i in range(minZ, maxZ):
-        Z = i + 1
-        if len(str(Z)) == 1:
-            data, elem_name = decode_gammas(
-                os.path.abspath(os.path.join(gamma_levels_path, f"z00{str(Z)}.dat"))
-            )
-        if len(str(Z)) == 2:
-            data, elem_name = decode_gammas(
-                os.path.abspath(os.path.join(gamma_levels_path, f"z0{str(Z)}.dat"))
-            )
-        if len(str(Z)) == 3:
-            data, elem_name = decode_gammas(
-                os.path.abspath(os.path.join(gamma_levels_path, f"z{str(Z)}.dat"))
+    database = GammaDatabase.from_element_lists(gamma_data)
+    logger.debug("Parsed gamma level files in %ss.", (time.time_ns() - t0) / 1e9)
+
+    if use_cache:
+        save_gamma_cache(gamma_cache_path, database, level_files)
+
+    return database
+
+
+def _hash_file(filename: str) -> str:
+    with open(filename, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_gamma_cache(cache_path: str, level_files: list[str]) -> GammaDatabase | None:
+    """
+    Loads the compiled gamma database cache if it is up-to-date with the level files. A level file is considered
+    unchanged if its size and modification time match those stored in the cache, or if its size and SHA-1 hash
+    match (e.g. after a fresh checkout, which changes modification times only), in which case the cache is written
+    again with the new modification times so that the files are not hashed on every launch.
+
+    Args:
+        cache_path: path to cache file
+        level_files: paths to the level files the cache was built from
+
+    Returns:
+        GammaDatabase if cache is valid, otherwise None.
+    """
+    if not os.path.exists(cache_path):
+        return None
+
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            if int(cache["cache_version"]) != GAMMA_CACHE_VERSION or list(
+                cache["source_files"]
+            ) != [os.path.basename(filename) for filename in level_files]:
+                logger.info("Gamma database cache is outdated, rebuilding.")
+                return None
+
+            mtimes_changed = False
+            for filename, mtime, size, file_hash in zip(
+                level_files,
+                cache["source_mtimes"],
+                cache["source_sizes"],
+                cache["source_hashes"],
+            ):
+                stat = os.stat(filename)
+                if stat.st_size != size:
+                    logger.info(
+                        "%s has changed, rebuilding gamma database cache.", filename
+                    )
+                    return None
+                if stat.st_mtime_ns != mtime:
+                    if _hash_file(filename) != file_hash:
+                        logger.info(
+                            "%s has changed, rebuilding gamma database cache.",
+                            filename,
+                        )
+                        return None
+                    mtimes_changed = True
+
+            database = GammaDatabase.from_arrays(
+                {
+                    key: cache[key]
+                    for key in cache.files
+                    if not key.startswith(("source_", "cache_"))
+                }
             )
+            source_hashes = list(cache["source_hashes"])
 
-        gamma_data[elem_name] = data
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning("Failed to read gamma database cache: %s", e)
+        return None
+
+    if mtimes_changed:
+        logger.info("Updating modification times in gamma database cache.")
+        save_gamma_cache(cache_path, database, level_files, source_hashes)
 
-    return gamma_data
+    return database
+
+
+def save_gamma_cache(
+    cache_path: str,
+    database: GammaDatabase,
+    level_files: list[str],
+    source_hashes: list[str] | None = None,
+):
+    """
+    Writes the gamma database to a compiled cache file, along with the size, modification time and hash of each
+    level file it was built from. Failing to write the cache (e.g. read-only install directory) is not an error.
+
+    Args:
+        cache_path: path to cache file
+        database: gamma database to save
+        level_files: paths to the level files the database was built from
+        source_hashes: SHA-1 hashes of the level files, if already known, so they are not hashed again
+    """
+    stats = [os.stat(filename) for filename in level_files]
+    if source_hashes is None:
+        source_hashes = [_hash_file(filename) for filename in level_files]
+
+    try:
+        # write to a temporary file first so that an interrupted write never leaves a broken cache behind
+        tmp_path = cache_path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            cache_version=GAMMA_CACHE_VERSION,
+            source_files=np.asarray(
+                [os.path.basename(filename) for filename in level_files], dtype=str
+            ),
+            source_mtimes=np.asarray(
+                [stat.st_mtime_ns for stat in stats], dtype=np.int64
+            ),
+            source_sizes=np.asarray([stat.st_size for stat in stats], dtype=np.int64),
+            source_hashes=np.asarray(source_hashes, dtype=str),
+            **database.to_arrays(),
+        )
+        os.replace(tmp_path, cache_path)
+        logger.debug("Saved gamma database cache to %s.", cache_path)
+
+    except OSError as e:
+        logger.warning("Could not write gamma database cache: %s", e)
 
 
 """
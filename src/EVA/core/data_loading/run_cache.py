@@ -0,0 +1,234 @@
+import dataclasses
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import h5py
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# memory budget used if none is set in the config
+DEFAULT_RUN_CACHE_MEMORY_MB = 1024
+
+# how often to check for cancellation while waiting for a run being loaded by another thread, in seconds
+CANCEL_POLL_INTERVAL = 0.1
+
+
+def make_run_key(run_num, settings: dict) -> tuple:
+    """
+    Makes the key a loaded run is stored under in a RunCache.
+
+    Args:
+        run_num: run number
+        settings: settings the run is loaded with, see ``MainModel.get_load_settings()``
+
+    Returns:
+        Tuple of (working directory, run number, correction settings).
+    """
+    corrections = {
+        key: value for key, value in settings.items() if key != "working_directory"
+    }
+    return (
+        os.path.normpath(settings["working_directory"]),
+        str(run_num),
+        json.dumps(corrections, sort_keys=True, default=str),
+    )
+
+
+def estimate_nbytes(obj, _seen: set | None = None) -> int:
+    """
+    Estimates the memory held by an object by adding up the size of all numpy arrays it refers to, looking through
+    attributes, dicts, lists, tuples and dataclasses. Arrays referred to more than once are only counted once. Data
+    which has not been read from file (e.g. h5py datasets, memory-mapped arrays) is not counted.
+
+    Args:
+        obj: object to estimate memory usage of, e.g. a Run
+
+    Returns:
+        Estimated size in bytes.
+    """
+    if _seen is None:
+        _seen = set()
+
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, (h5py.HLObject, np.memmap)):  # data stays on disk until read
+        return 0
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+
+    if isinstance(obj, dict):
+        children = obj.values()
+    elif isinstance(obj, (list, tuple, set)):
+        children = obj
+    elif dataclasses.is_dataclass(obj) or hasattr(obj, "__dict__"):
+        children = vars(obj).values()
+    else:
+        return 0
+
+    return sum(estimate_nbytes(child, _seen) for child in children)
+
+
+class RunCache:
+    """
+    Thread-safe least-recently-used cache of loaded runs, with a memory budget. Runs can be added from worker threads,
+    e.g. when neighbouring runs are prefetched, and loads of the same run can be coordinated using ``claim()`` and
+    ``release()`` so that a run being prefetched is not read from file a second time.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes: memory budget of cache - least recently used runs are removed once it is exceeded
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (run, flags, size)
+        self._pending = {}  # key -> threading.Event set once the run has been loaded
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: tuple) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory used by all cached runs."""
+        with self._lock:
+            return sum(size for _, _, size in self._entries.values())
+
+    def get(self, key: tuple):
+        """
+        Gets a run from the cache and marks it as most recently used.
+
+        Args:
+            key: key of run, see ``make_run_key()``
+
+        Returns:
+            Tuple of (run, flags), or None if the run is not cached.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+
+            self._entries.move_to_end(key)
+            run, flags, _ = self._entries[key]
+            return run, flags
+
+    def pop(self, key: tuple):
+        """
+        Removes a run from the cache, e.g. when it is handed over to a workspace which may change it.
+
+        Args:
+            key: key of run, see ``make_run_key()``
+
+        Returns:
+            Tuple of (run, flags), or None if the run is not cached.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+        if entry is None:
+            return None
+
+        run, flags, _ = entry
+        return run, flags
+
+    def put(self, key: tuple, run, flags: dict):
+        """
+        Adds a run to the cache, removing least recently used runs until the cache fits in its memory budget. The
+        newest run is always kept, even if it is larger than the budget on its own.
+
+        Args:
+            key: key of run, see ``make_run_key()``
+            run: loaded run
+            flags: error flags returned when the run was loaded
+        """
+        size = estimate_nbytes(run)
+
+        with self._lock:
+            self._entries[key] = (run, flags, size)
+            self._entries.move_to_end(key)
+
+            total = sum(entry[2] for entry in self._entries.values())
+            while total > self.max_bytes and len(self._entries) > 1:
+                old_key, (_, _, old_size) = self._entries.popitem(last=False)
+                total -= old_size
+                logger.debug("Removed run %s from run cache.", old_key[1])
+
+    def claim(self, key: tuple) -> bool:
+        """
+        Claims the right to load a run. Only one thread can hold the claim for a run at a time.
+
+        Args:
+            key: key of run, see ``make_run_key()``
+
+        Returns:
+            True if the caller should load the run and then call ``release()``, False if the run is already cached
+            or being loaded by another thread.
+        """
+        with self._lock:
+            if key in self._entries or key in self._pending:
+                return False
+
+            self._pending[key] = threading.Event()
+            return True
+
+    def release(self, key: tuple):
+        """
+        Releases the claim on a run taken with ``claim()``, waking up any thread waiting for it in ``wait()``.
+
+        Args:
+            key: key of run, see ``make_run_key()``
+        """
+        with self._lock:
+            event = self._pending.pop(key, None)
+
+        if event is not None:
+            event.set()
+
+    def wait(self, key: tuple, timeout: float | None = None, is_cancelled=None) -> bool:
+        """
+        Waits for a run which is being loaded by another thread, if any.
+
+        Args:
+            key: key of run, see ``make_run_key()``
+            timeout: maximum time to wait in seconds
+            is_cancelled: optional function returning True if waiting should stop
+
+        Returns:
+            False if waiting was cancelled, otherwise True.
+        """
+        with self._lock:
+            event = self._pending.get(key)
+
+        if event is None:
+            return True
+
+        if is_cancelled is None:
+            event.wait(timeout)
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not event.wait(CANCEL_POLL_INTERVAL):
+            if is_cancelled():
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+        return True
+
+    def clear(self):
+        """Removes all runs from the cache."""
+        with self._lock:
+            self._entries.clear()
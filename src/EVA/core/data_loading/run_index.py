@@ -0,0 +1,180 @@
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Biriani files are named ral0<run number>.rooth<channel>.dat, with one file per detector channel
+BRNI_FILE_PATTERN = re.compile(r"^ral0(\d+)\.rooth(\d+)\.dat$")
+BRNI_CHANNELS = {"2099": "GE1", "3099": "GE2", "4099": "GE3", "5099": "GE4"}
+
+# Nexus files are named MUX<zero-padded run number>.nxs - file names are case-insensitive on Windows
+NXS_FILE_PATTERN = re.compile(
+    r"^MUX(\d+)\.nxs$", re.IGNORECASE if os.path.normcase("A") == "a" else 0
+)
+
+
+class RunIndex:
+    """
+    Index of the run files in a directory, mapping run numbers to Biriani and Nexus files. The directory is listed
+    once with ``os.scandir()`` rather than checking for every possible file name of a run, which is slow on
+    network-mounted directories. The index is refreshed when the modification time of the directory changes, and
+    only new or removed file names are parsed again.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: directory containing run files
+        """
+        self.directory = directory
+        self._names = set()
+        self._mtime = None
+        self._brni = {}  # run number (as written in file name) -> {detector: path}
+        self._nxs = {}  # run number -> (number of digits, path)
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False):
+        """
+        Updates the index if the directory has changed since it was last listed.
+
+        Args:
+            force: list the directory even if its modification time has not changed, e.g. when a file is expected
+                to exist but is not in the index (some file systems only update directory times periodically)
+        """
+        with self._lock:
+            try:
+                mtime = os.stat(self.directory).st_mtime_ns
+            except OSError:
+                mtime = None
+
+            if not force and mtime is not None and mtime == self._mtime:
+                return
+
+            try:
+                with os.scandir(self.directory) as entries:
+                    names = {entry.name for entry in entries}
+            except OSError:
+                names = set()
+
+            for name in self._names - names:
+                self._remove(name)
+            for name in names - self._names:
+                self._add(name)
+
+            self._names = names
+            self._mtime = mtime
+
+    def _add(self, name: str):
+        path = os.path.join(self.directory, name)
+
+        if match := BRNI_FILE_PATTERN.match(name):
+            run_num, channel = match.groups()
+            if channel in BRNI_CHANNELS:
+                self._brni.setdefault(run_num, {})[BRNI_CHANNELS[channel]] = path
+
+        elif match := NXS_FILE_PATTERN.match(name):
+            digits = match.group(1)
+            run_num = int(digits)
+
+            # same file as open_hex_file() would find - the one with the fewest digits
+            if run_num not in self._nxs or len(digits) < self._nxs[run_num][0]:
+                self._nxs[run_num] = (len(digits), path)
+
+    def _remove(self, name: str):
+        if match := BRNI_FILE_PATTERN.match(name):
+            run_num, channel = match.groups()
+            files = self._brni.get(run_num, {})
+            files.pop(BRNI_CHANNELS.get(channel), None)
+            if not files:
+                self._brni.pop(run_num, None)
+
+        elif match := NXS_FILE_PATTERN.match(name):
+            run_num = int(match.group(1))
+            if run_num in self._nxs and self._nxs[run_num][1] == os.path.join(
+                self.directory, name
+            ):
+                # another file may exist for the same run with more digits
+                del self._nxs[run_num]
+                for other in self._names - {name}:
+                    other_match = NXS_FILE_PATTERN.match(other)
+                    if other_match and int(other_match.group(1)) == run_num:
+                        self._add(other)
+
+    def brni_files(self, run_num: str) -> dict[str, str]:
+        """
+        Gets the Biriani data files of a run.
+
+        Args:
+            run_num: run number, as used in the file names
+
+        Returns:
+            Dict of {detector: file path}. Empty if no files were found.
+        """
+        with self._lock:
+            return dict(self._brni.get(str(run_num), {}))
+
+    def nxs_file(self, run_num) -> str | None:
+        """
+        Gets the Nexus file of a run.
+
+        Args:
+            run_num: run number
+
+        Returns:
+            File path, or None if no file was found.
+        """
+        try:
+            run_num = int(run_num)
+        except ValueError:
+            return None
+
+        with self._lock:
+            entry = self._nxs.get(run_num)
+
+        return None if entry is None else entry[1]
+
+    def find(self, run_num) -> tuple[dict[str, str], str | None]:
+        """
+        Finds the files of a run, refreshing the index first if the directory has changed. If no files are found,
+        the directory is listed again in case it was changed without its modification time being updated.
+
+        Args:
+            run_num: run number
+
+        Returns:
+            Tuple of (dict of {detector: path} of Biriani files, path of Nexus file or None).
+        """
+        self.refresh()
+        brni_files, nxs_file = self.brni_files(run_num), self.nxs_file(run_num)
+
+        if not brni_files and nxs_file is None:
+            self.refresh(force=True)
+            brni_files, nxs_file = self.brni_files(run_num), self.nxs_file(run_num)
+
+        return brni_files, nxs_file
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_run_index(directory: str) -> RunIndex:
+    """
+    Gets the run index of a directory, creating it the first time the directory is used.
+
+    Args:
+        directory: directory containing run files
+
+    Returns:
+        RunIndex of directory.
+    """
+    key = os.path.normcase(os.path.abspath(directory))
+
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = RunIndex(directory)
+            logger.debug("Created run index for %s.", directory)
+
+        return _indexes[key]
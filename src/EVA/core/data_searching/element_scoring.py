@@ -0,0 +1,444 @@
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+import numpy as np
+
+from EVA.core.context import EvaContext, get_context
+from EVA.core.data_structures.detector import DetectorIndices
+from EVA.core.physics.functions import line, quadratic
+from EVA.util.path_handler import get_path
+
+logger = logging.getLogger(__name__)
+
+# energy resolution models of the detectors, giving the FWHM (keV) of a peak at an energy (keV)
+resolution_models = {
+    "linear": ("./src/EVA/databases/detectors/energy_resolution_linear.txt", line),
+    "quadratic": (
+        "./src/EVA/databases/detectors/energy_resolution_quadratic.txt",
+        quadratic,
+    ),
+}
+
+FWHM_TO_SIGMA = 1 / (2 * math.sqrt(2 * math.log(2)))
+
+
+@dataclass
+class ScoringOptions:
+    """Settings of the element scoring, see ``ElementScorer.score()``."""
+
+    # width (keV) added in quadrature to the detector resolution, for calibration errors in the peak positions
+    tolerance: float = 1
+    # peak width (keV) used for detectors without a resolution model
+    default_sigma: float = 1
+    # lines further than this many widths from a peak do not match it
+    window: float = 3
+    # probability of seeing the strongest line of an element which is present
+    detection_probability: float = 0.9
+    # secondary lines are this much less likely to be seen than primary lines of the same intensity
+    secondary_weight: float = 0.5
+    # spread (factor) allowed between the heights of the peaks of an element relative to their intensities
+    intensity_spread: float = 4
+    # weight of the capture ratio prior
+    capture_weight: float = 1
+    # lines matched with less than this weight are not listed as explaining a peak
+    min_match: float = 0.1
+
+
+@dataclass
+class LineMatch:
+    """A muonic X-ray line of an element, and the peak which explains it."""
+
+    transition: str
+    line_energy: float
+    intensity: float
+    primary: bool
+    peak_index: int
+    peak_energy: float
+    weight: float
+
+
+@dataclass
+class ElementScore:
+    """
+    Score of an element. The score is the log-likelihood ratio of the element being present against it being absent,
+    given the peaks, and confidence is the corresponding probability.
+    """
+
+    element: str
+    score: float
+    confidence: float
+    lines_expected: int
+    matches: list[LineMatch] = field(default_factory=list)
+
+    @property
+    def peaks(self) -> list[float]:
+        """Energies of the peaks which explain the element, in ascending order."""
+        return sorted({match.peak_energy for match in self.matches})
+
+
+@lru_cache
+def load_resolution_model(model: str) -> np.ndarray:
+    """
+    Loads the coefficients of an energy resolution model.
+
+    Args:
+        model: "linear" or "quadratic"
+
+    Returns:
+        Array with a row of coefficients for each detector, in ``DetectorIndices`` order.
+
+    Raises:
+        ValueError: If the model is unknown.
+    """
+    if model not in resolution_models:
+        raise ValueError(f"Unknown energy resolution model '{model}'.")
+
+    coefficients = np.loadtxt(
+        get_path(resolution_models[model][0]), delimiter=",", skiprows=1, dtype=float
+    )
+    return np.atleast_2d(coefficients)[:, 1:]
+
+
+def get_resolution_sigma(
+    energies: np.ndarray, detector: str, model: str = "linear"
+) -> np.ndarray | None:
+    """
+    Gets the width of peaks of a detector from its energy resolution model.
+
+    Args:
+        energies: energies of peaks, in keV
+        detector: detector name, e.g. "GE1"
+        model: energy resolution model, "linear" or "quadratic"
+
+    Returns:
+        Standard deviation of a peak at each energy, or None if the detector has no resolution model.
+    """
+    coefficients = load_resolution_model(model)
+
+    try:
+        index = DetectorIndices[detector].value
+    except KeyError:
+        return None
+    if index >= len(coefficients):
+        return None
+
+    fwhm = resolution_models[model][1](np.asarray(energies), *coefficients[index])
+    return fwhm * FWHM_TO_SIGMA
+
+
+class ElementScorer:
+    """
+    Scores how well each element of a muonic X-ray database explains a list of peaks. All lines of the database are
+    flattened into arrays, so that every line is matched to every peak, and every element scored, in one vectorised
+    pass.
+
+    Each line l of an element is matched to its closest peak p with weight m = exp(-z^2 / 2), where
+    z = (E_p - E_l) / sigma_l and sigma_l is the detector resolution at E_l, and m = 0 beyond ``window`` widths. If the
+    element is present the line is seen with probability s_l, which grows with the intensity of the line relative to
+    the strongest line of the element and is lower for secondary lines. If it is absent, a peak is near the line by
+    chance with probability c_l, from the density of peaks in the spectrum. The score of the element is the
+    log-likelihood ratio
+
+        sum over lines of m log(s_l / c_l) + (1 - m) log((1 - s_l) / (1 - c_l))
+
+    plus a prior from the capture ratio of the element, and a penalty if the heights of the matched peaks do not follow
+    the intensities of their lines. A matched strong line adds much more than a weak one, and a missing strong line
+    counts against the element.
+    """
+
+    def __init__(self, database: dict):
+        """
+        Args:
+            database: muonic X-ray database with intensities, e.g. ``mudirac_muon_database_with_intensity``
+        """
+        start_time = time.time_ns()
+
+        elements = list(database["All energies"])
+        element_ids = []
+        transitions = []
+        energies = []
+        intensities = []
+        primary = []
+
+        for i, element in enumerate(elements):
+            primary_lines = database["Primary energies"].get(element, {})
+            for transition, transition_data in database["All energies"][
+                element
+            ].items():
+                element_ids.append(i)
+                transitions.append(transition)
+                energies.append(transition_data["E"])
+                intensities.append(transition_data.get("I", 1))
+                primary.append(transition in primary_lines)
+
+        self.elements = np.asarray(elements, dtype=object)
+        self.element_ids = np.asarray(element_ids, dtype=np.intp)
+        self.transitions = np.asarray(transitions, dtype=object)
+        self.energies = np.asarray(energies, dtype=float)
+        self.is_primary = np.asarray(primary, dtype=bool)
+
+        # intensity of each line relative to the strongest line of its element
+        intensities = np.asarray(intensities, dtype=float)
+        strongest = np.zeros(len(elements))
+        np.maximum.at(strongest, self.element_ids, intensities)
+        self.relative_intensities = intensities / strongest[self.element_ids]
+
+        # capture ratios relative to the mean, as log prior odds
+        capture_ratios = np.array(
+            [
+                database.get("Capture ratios", {}).get(element, {}).get("Value", 0)
+                for element in elements
+            ]
+        )
+        known = capture_ratios > 0
+        self.log_capture_ratios = np.zeros(len(elements))
+        if known.any():
+            self.log_capture_ratios[known] = np.log(
+                capture_ratios[known] / capture_ratios[known].mean()
+            )
+
+        logger.debug(
+            "Built element scorer with %s lines in %s s.",
+            len(self.energies),
+            (time.time_ns() - start_time) / 1e9,
+        )
+
+    def __len__(self) -> int:
+        return len(self.energies)
+
+    def get_sigma(
+        self,
+        detector: str | None = None,
+        resolution_model: str = "linear",
+        options: ScoringOptions | None = None,
+    ) -> np.ndarray:
+        """
+        Gets the width each line is matched with - the detector resolution at the line energy, and the tolerance
+        added in quadrature.
+
+        Args:
+            detector: detector the peaks were measured with, e.g. "GE1". If None, or the detector has no resolution
+                model, ``options.default_sigma`` is used.
+            resolution_model: energy resolution model, "linear" or "quadratic"
+            options: scoring settings
+
+        Returns:
+            Array of the width of each line.
+        """
+        options = options or ScoringOptions()
+
+        sigma = None
+        if detector is not None:
+            sigma = get_resolution_sigma(self.energies, detector, resolution_model)
+        if sigma is None:
+            sigma = np.full(len(self.energies), float(options.default_sigma))
+
+        return np.sqrt(sigma**2 + options.tolerance**2)
+
+    def score(
+        self,
+        peak_energies,
+        peak_heights=None,
+        detector: str | None = None,
+        energy_range: tuple[float, float] | None = None,
+        resolution_model: str = "linear",
+        options: ScoringOptions | None = None,
+    ) -> list[ElementScore]:
+        """
+        Scores every element against a list of peaks.
+
+        Args:
+            peak_energies: energies of all peaks found in a spectrum, in keV
+            peak_heights: optional heights of the peaks above background, used to check that the peaks of an element
+                follow the intensities of its lines
+            detector: detector the peaks were measured with, e.g. "GE1", for its energy resolution
+            energy_range: (min, max) energy of the spectrum the peaks were found in. Only lines in this range are
+                scored. Defaults to the range of the peaks.
+            resolution_model: energy resolution model, "linear" or "quadratic"
+            options: scoring settings
+
+        Returns:
+            Scores of every element with at least one line in the energy range, highest first.
+        """
+        options = options or ScoringOptions()
+        peak_energies = np.asarray(peak_energies, dtype=float).ravel()
+        n_elements = len(self.elements)
+
+        if energy_range is None:
+            if not len(peak_energies):
+                return []
+            energy_range = (peak_energies.min(), peak_energies.max())
+
+        low, high = energy_range
+        in_range = (self.energies >= low) & (self.energies <= high)
+        sigma = self.get_sigma(detector, resolution_model, options)
+
+        # match every line to its closest peak, found by binary search in the sorted peak energies
+        if len(peak_energies):
+            peak_order = np.argsort(peak_energies, kind="stable")
+            sorted_peaks = peak_energies[peak_order]
+            position = np.searchsorted(sorted_peaks, self.energies)
+            below = np.clip(position - 1, 0, len(sorted_peaks) - 1)
+            above = np.clip(position, 0, len(sorted_peaks) - 1)
+            use_above = np.abs(sorted_peaks[above] - self.energies) < np.abs(
+                sorted_peaks[below] - self.energies
+            )
+            closest = peak_order[np.where(use_above, above, below)]
+
+            z = (peak_energies[closest] - self.energies) / sigma
+            match = np.where(np.abs(z) <= options.window, np.exp(-0.5 * z**2), 0)
+        else:
+            closest = np.zeros(len(self.energies), dtype=np.intp)
+            match = np.zeros(len(self.energies))
+        match[~in_range] = 0
+
+        # probability of seeing each line if the element is present, and of a peak being near it by chance
+        seen = options.detection_probability * self.relative_intensities
+        seen = np.where(self.is_primary, seen, seen * options.secondary_weight)
+        seen = np.clip(seen, 1e-6, 1 - 1e-6)
+
+        density = len(peak_energies) / max(high - low, 2 * options.window * sigma.max())
+        chance = -np.expm1(-density * math.sqrt(2 * math.pi) * sigma)
+        chance = np.clip(chance, 1e-6, 1 - 1e-6)
+
+        line_scores = match * np.log(seen / chance) + (1 - match) * np.log(
+            (1 - seen) / (1 - chance)
+        )
+        line_scores[~in_range] = 0
+
+        scores = np.bincount(self.element_ids, line_scores, n_elements)
+        scores += options.capture_weight * self.log_capture_ratios
+
+        # the heights of the peaks of an element should follow the intensities of their lines
+        if peak_heights is not None and len(peak_energies):
+            peak_heights = np.asarray(peak_heights, dtype=float).ravel()
+            heights = np.clip(peak_heights[closest], 1e-12, None)
+            log_ratio = np.log(heights / self.relative_intensities)
+
+            total = np.bincount(self.element_ids, match, n_elements)
+            mean = np.bincount(self.element_ids, match * log_ratio, n_elements)
+            mean = np.divide(mean, total, out=np.zeros(n_elements), where=total > 0)
+
+            spread = math.log(options.intensity_spread)
+            deviation = (log_ratio - mean[self.element_ids]) / spread
+            scores -= np.bincount(
+                self.element_ids, 0.5 * match * deviation**2, n_elements
+            )
+
+        lines_expected = np.bincount(self.element_ids, in_range, n_elements)
+
+        # confidence from the log-likelihood ratio, clipped so exp() does not overflow
+        confidence = 1 / (1 + np.exp(-np.clip(scores, -500, 500)))
+
+        order = np.argsort(-scores, kind="stable")
+
+        # lines which explain a peak, grouped by element in ranked order, best match first
+        rank = np.empty(n_elements, dtype=np.intp)
+        rank[order] = np.arange(n_elements)
+        lines = np.flatnonzero(match >= options.min_match)
+        lines = lines[np.lexsort((-match[lines], rank[self.element_ids[lines]]))]
+        ends = np.cumsum(np.bincount(rank[self.element_ids[lines]], None, n_elements))
+
+        all_matches = [
+            LineMatch(*values)
+            for values in zip(
+                self.transitions[lines].tolist(),
+                self.energies[lines].tolist(),
+                self.relative_intensities[lines].tolist(),
+                self.is_primary[lines].tolist(),
+                closest[lines].tolist(),
+                peak_energies[closest[lines]].tolist() if len(peak_energies) else [],
+                match[lines].tolist(),
+            )
+        ]
+
+        results = []
+        start = 0
+        for i, end in zip(order.tolist(), ends.tolist()):
+            if lines_expected[i]:
+                results.append(
+                    ElementScore(
+                        element=self.elements[i],
+                        score=float(scores[i]),
+                        confidence=float(confidence[i]),
+                        lines_expected=int(lines_expected[i]),
+                        matches=all_matches[start:end],
+                    )
+                )
+            start = end
+
+        return results
+
+
+_scorers = {}
+_scorers_lock = threading.Lock()
+
+
+def get_scorer(database: dict) -> ElementScorer:
+    """
+    Gets the element scorer of a database, building it on first use.
+
+    Args:
+        database: muonic X-ray database with intensities
+
+    Returns:
+        ElementScorer of database.
+    """
+    with _scorers_lock:
+        cached = _scorers.get(id(database))
+        # the database is kept with its scorer, so its id cannot be reused by another database
+        if cached is None or cached[0] is not database:
+            cached = (database, ElementScorer(database))
+            _scorers[id(database)] = cached
+
+        return cached[1]
+
+
+def score_elements(
+    peak_energies,
+    peak_heights=None,
+    detector: str | None = None,
+    energy_range: tuple[float, float] | None = None,
+    resolution_model: str = "linear",
+    options: ScoringOptions | None = None,
+    context: EvaContext | None = None,
+) -> list[ElementScore]:
+    """
+    Scores every element of the mudirac database with intensities against a list of peaks, see
+    ``ElementScorer.score()``.
+
+    Args:
+        peak_energies: energies of all peaks found in a spectrum, in keV
+        peak_heights: optional heights of the peaks above background
+        detector: detector the peaks were measured with, e.g. "GE1", for its energy resolution
+        energy_range: (min, max) energy of the spectrum the peaks were found in, defaults to the range of the peaks
+        resolution_model: energy resolution model, "linear" or "quadratic"
+        options: scoring settings
+        context: context to take the database from, defaults to ``get_context()``
+
+    Returns:
+        Scores of every element with at least one line in the energy range, highest first.
+    """
+    context = context or get_context()
+    scorer = get_scorer(context.mudirac_muon_database_with_intensity)
+
+    return scorer.score(
+        peak_energies, peak_heights, detector, energy_range, resolution_model, options
+    )
+
+
+def summarise_scores(scores: list[ElementScore], n: int = 7) -> dict[str, float]:
+    """
+    Gets the confidence of the top elements, e.g. to show in a table.
+
+    Args:
+        scores: element scores, highest first
+        n: number of elements to include
+
+    Returns:
+        Dict of {element: confidence}, highest first.
+    """
+    return {score.element: round(score.confidence, 3) for score in scores[:n]}
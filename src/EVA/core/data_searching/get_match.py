@@ -1,18 +1,21 @@
-import math
 import logging
 import time
-from EVA.core.app import get_app
+import numpy as np
+from EVA.core.context import EvaContext, get_context
 
 logger = logging.getLogger(__name__)
 
 
-def search_gammas_single_transition(isotope: str, energy: str) -> list[dict]:
+def search_gammas_single_transition(
+    isotope: str, energy: str, context: EvaContext | None = None
+) -> list[dict]:
     """
     Searches in the gamma database for all transitions within 0.5% of specified energy for a given isotope.
 
     Args:
         isotope: which isotope to search for
         energy: energy to search for
+        context: context to search the databases of, defaults to ``get_context()``
 
     Returns:
         List of dictionaries, one for each match, with keys
@@ -24,36 +27,29 @@ def search_gammas_single_transition(isotope: str, energy: str) -> list[dict]:
 
             * **lifetime** (str)
     """
-    gammas = list(get_app().gamma_database.values())
-    all_matches = []
-    i = 1
-    while i < len(gammas) - 1:
-        i += 1
-        for j in range(len(gammas[i])):
-            raw_data = gammas[i][j]
-
-            if isotope == raw_data[0].strip():
-                raw_data_kev = raw_data[1]
-                sigma = 0.005 * raw_data_kev
-
-                if raw_data_kev - sigma < float(energy) < raw_data_kev + sigma:
-                    data = {
-                        "isotope": raw_data[0],
-                        "energy": raw_data_kev,
-                        "intensity": raw_data[2],
-                        "lifetime": raw_data[3],
-                    }
+    context = context or get_context()
+    gamma_database = context.gamma_database
 
-                    all_matches.append(data)
-    return all_matches
+    positions = gamma_database.isotope_positions(isotope)
+    energies = gamma_database.energies[positions]
+    sigma = 0.005 * energies
+
+    positions = positions[
+        (energies - sigma < float(energy)) & (float(energy) < energies + sigma)
+    ]
+
+    return gamma_database.to_dicts(positions)
 
 
-def search_gammas_single_isotope(isotope: str) -> list[dict]:
+def search_gammas_single_isotope(
+    isotope: str, context: EvaContext | None = None
+) -> list[dict]:
     """
     Retrieves all gamma transitions available in the gamma database for specified isotope.
 
     Args:
         isotope: which isotope to search for
+        context: context to search the databases of, defaults to ``get_context()``
 
     Returns:
         List of dictionaries, one for each match, with keys
@@ -67,31 +63,15 @@ def search_gammas_single_isotope(isotope: str) -> list[dict]:
         * **lifetime** (str)
 
     """
-    gammas = list(get_app().gamma_database.values())
-
-    all_matches = []
-    i = 1
-    while i < len(gammas) - 1:
-        i += 1
-        for j in range(len(gammas[i])):
-            raw_data = gammas[i][j]
-
-            if str(isotope) == raw_data[0].strip():
-                raw_data_kev = float(raw_data[1])
-                data = {
-                    "isotope": raw_data[0],
-                    "energy": raw_data_kev,
-                    "intensity": raw_data[2],
-                    "lifetime": raw_data[3],
-                }
-
-                all_matches.append(data)
-
-    return all_matches
+    context = context or get_context()
+    gamma_database = context.gamma_database
+    return gamma_database.to_dicts(gamma_database.isotope_positions(isotope))
 
 
 def search_muxrays_single_transition(
-    input_element: str, input_trans: str
+    input_element: str,
+    input_trans: str,
+    context: EvaContext | None = None,
 ) -> list[dict]:
     """
     Searches in muonic xray database for all peaks specified for a single transition. When using the Mudirac database,
@@ -101,6 +81,7 @@ def search_muxrays_single_transition(
     Args:
         input_element: which element to search for
         input_trans: name of transition to search for (in spectroscopic notation e.g. (2p3/2->1s1/2))
+        context: context to search the databases of, defaults to ``get_context()``
 
     Returns:
         List of dictionaries, one for each match, with keys
@@ -111,11 +92,10 @@ def search_muxrays_single_transition(
 
         * **transition** (str)
     """
-
-    app = get_app()
+    context = context or get_context()
 
     matches = []
-    raw_data = app.muon_database["All energies"]
+    raw_data = context.muon_database["All energies"]
 
     for element in raw_data:
         if element == input_element:
@@ -131,12 +111,15 @@ def search_muxrays_single_transition(
     return matches
 
 
-def search_muxrays_single_element(input_element: str) -> list[dict]:
+def search_muxrays_single_element(
+    input_element: str, context: EvaContext | None = None
+) -> list[dict]:
     """
     Fetches all transitions available in the muonic x-ray database for specified element.
 
     Args:
         input_element: which element to search for
+        context: context to search the databases of, defaults to ``get_context()``
 
     Returns:
         List of dictionaries, one for each match, with keys
@@ -147,10 +130,10 @@ def search_muxrays_single_element(input_element: str) -> list[dict]:
 
         * **transition** (str)
     """
-    app = get_app()
+    context = context or get_context()
     matches = []
 
-    raw_data = app.muon_database["All energies"]
+    raw_data = context.muon_database["All energies"]
     for element in raw_data:
         if element == input_element:
             for transition, transition_data in raw_data[element].items():
@@ -164,12 +147,15 @@ def search_muxrays_single_element(input_element: str) -> list[dict]:
     return matches
 
 
-def search_muxrays_single_element_all_isotopes(input_element: str) -> list[dict]:
+def search_muxrays_single_element_all_isotopes(
+    input_element: str, context: EvaContext | None = None
+) -> list[dict]:
     """
     Fetches all transitions available in the muonic x-ray database for all isotopes of the specified element.
 
     Args:
         input_element: which element to search for
+        context: context to search the databases of, defaults to ``get_context()``
 
     Returns:
         List of dictionaries, one for each match, with keys
@@ -180,10 +166,10 @@ def search_muxrays_single_element_all_isotopes(input_element: str) -> list[dict]
 
         * **transition** (str)
     """
-    app = get_app()
+    context = context or get_context()
     matches = []
 
-    raw_data = app.muon_database["All isotopes"]["All energies"]
+    raw_data = context.muon_database["All isotopes"]["All energies"]
     for element in raw_data:
         if element == input_element:
             for transition, transition_data in raw_data[element].items():
@@ -199,6 +185,7 @@ def search_muxrays_single_element_all_isotopes(input_element: str) -> list[dict]
 
 def search_muxrays(
     input_peaks: list[list[float]],
+    context: EvaContext | None = None,
 ) -> tuple[list[dict], list[dict], list[dict]]:
     """
     Searches for possible muonic xray transitions in the database at multiple energies at once.
@@ -208,6 +195,7 @@ def search_muxrays(
 
     Args:
         input_peaks: List of [search energy, search width] search parameters.
+        context: context to search the databases of, defaults to ``get_context()``
 
     Returns:
         Tuple of results, where index 0 contains all matches, index 1 primary matches only, and index 2 secondary
@@ -227,43 +215,12 @@ def search_muxrays(
 
         * **diff**: difference between searched energy and match (how close the match is)
     """
+    context = context or get_context()
     start_time = time.time_ns()
-    app = get_app()
-    peak_data = app.muon_database
-
-    primary_matches = []
-    secondary_matches = []
-    all_matches = []
-    prims = []
-
-    raw_data = peak_data["All energies"]
-    for peak, sigma in input_peaks:
-        for element in raw_data:
-            for transition, transition_data in raw_data[element].items():
-                energy = transition_data["E"]
-                diff = abs(peak - energy)
-
-                if diff <= 3 * sigma:
-                    data = {
-                        "element": element,
-                        "energy": energy,
-                        "error": math.ceil(diff / sigma) * sigma,
-                        "peak_centre": peak,
-                        "transition": transition,
-                        "diff": diff,
-                    }
-
-                    all_matches.append(data)
-
-            prims = [peak[0] for peak in peak_data["Primary energies"][element].items()]
-
-    all_matches = sorted(all_matches, key=lambda o: o["diff"])
 
-    for match in all_matches:
-        if match["transition"] in prims:
-            primary_matches.append(match)
-        else:
-            secondary_matches.append(match)
+    all_matches, primary_matches, secondary_matches = (
+        context.muon_database_index.search(input_peaks)
+    )
 
     end_time = time.time_ns()
     logger.debug(f"Found matches in {(end_time - start_time) / 1e9} s.")
@@ -273,6 +230,7 @@ def search_muxrays(
 
 def search_muxrays_all_isotopes(
     input_peaks: list[list[float]],
+    context: EvaContext | None = None,
 ) -> tuple[list[dict], list[dict], list[dict]]:
     """
     Searches for possible muonic xray transitions for all isotopes in the database at multiple energies at once.
@@ -282,6 +240,7 @@ def search_muxrays_all_isotopes(
 
     Args:
         input_peaks: List of [search energy, search width] search parameters.
+        context: context to search the databases of, defaults to ``get_context()``
 
     Returns:
         Tuple of results, where index 0 contains all matches, index 1 primary matches only, and index 2 secondary
@@ -301,48 +260,14 @@ def search_muxrays_all_isotopes(
 
         * **diff**: difference between searched energy and match (how close the match is)
     """
+    context = context or get_context()
     start_time = time.time_ns()
-    app = get_app()
-    peak_data = app.muon_database
-
-    primary_matches = []
-    secondary_matches = []
-    all_matches = []
-    prims = []
-
-    raw_data = peak_data["All isotopes"]["All energies"]
-    for peak, sigma in input_peaks:
-        for element in raw_data:
-            for transition, transition_data in raw_data[element].items():
-                energy = transition_data["E"]
-                diff = abs(peak - energy)
-
-                if diff <= 3 * sigma:
-                    data = {
-                        "element": element,
-                        "energy": energy,
-                        "error": math.ceil(diff / sigma) * sigma,
-                        "peak_centre": peak,
-                        "transition": transition,
-                        "diff": diff,
-                    }
-
-                    all_matches.append(data)
-
-            prims = [
-                peak[0]
-                for peak in peak_data["All isotopes"]["Primary energies"][
-                    element
-                ].items()
-            ]
-
-    all_matches = sorted(all_matches, key=lambda o: o["diff"])
 
-    for match in all_matches:
-        if match["transition"] in prims:
-            primary_matches.append(match)
-        else:
-            secondary_matches.append(match)
+    (
+        all_matches,
+        primary_matches,
+        secondary_matches,
+    ) = context.muon_database_index_all_isotopes.search(input_peaks)
 
     end_time = time.time_ns()
     logger.debug(f"Found matches in {(end_time - start_time) / 1e9} s.")
@@ -350,12 +275,15 @@ def search_muxrays_all_isotopes(
     return all_matches, primary_matches, secondary_matches
 
 
-def search_gammas(input_peaks: list[list[float]]) -> list[dict]:
+def search_gammas(
+    input_peaks: list[list[float]], context: EvaContext | None = None
+) -> list[dict]:
     """
     Searches for possible gamma transitions in the database at multiple energies at once.
 
     Args:
         input_peaks: list of [search energy, search width] search parameters.
+        context: context to search the databases of, defaults to ``get_context()``
 
     Returns:
         List of dictionaries containing matches with keys
@@ -370,41 +298,30 @@ def search_gammas(input_peaks: list[list[float]]) -> list[dict]:
 
         * **intensity**: intensity of transition.
     """
-    all_matches = []
-    gammas = list(get_app().gamma_database.values())
-
-    i = 1
-    while i < len(gammas) - 1:
-        i += 1
-        # print('i=',i)
-        for j in range(len(gammas[i])):
-            raw_data = gammas[i][j]
-            # print('raw_data', raw_data)
-            for peak, sigma in input_peaks:
-                raw_data_kev = float(raw_data[1])
-
-                if (raw_data_kev - sigma) <= peak <= (raw_data_kev + sigma):
-                    # print('in print', peak, sigma, raw_data)
-                    data = {
-                        "isotope": raw_data[0],
-                        "energy": raw_data_kev,
-                        "diff": peak - float(raw_data_kev),
-                        "intensity": float(raw_data[2]),
-                        "lifetime": raw_data[3],
-                    }
+    context = context or get_context()
+    gamma_database = context.gamma_database
 
-                    all_matches.append(data)
+    if len(input_peaks) == 0:
+        return []
 
-    all_matches.sort(key=lambda x: abs(x["diff"]))
+    centres, widths = np.asarray(input_peaks, dtype=float).reshape(-1, 2).T
+    _, positions, diffs = gamma_database.find(centres, widths)
+
+    all_matches = gamma_database.to_dicts(positions)
+    for match, diff in zip(all_matches, diffs.tolist()):
+        match["diff"] = diff
 
     return all_matches
 
 
-def search_e_xrays(values: list[tuple[float, float]]) -> list[dict]:
+def search_e_xrays(
+    values: list[tuple[float, float]], context: EvaContext | None = None
+) -> list[dict]:
     """
     Searches in the electronic xray database given a list of search energies and widths.
     Args:
         values: list of tuples containing (search energy, search width)
+        context: context to search the databases of, defaults to ``get_context()``
 
     Returns:
         List of dictionaries, one for each match. dict keys are:
@@ -418,9 +335,10 @@ def search_e_xrays(values: list[tuple[float, float]]) -> list[dict]:
             * **diff**: difference between searched energy and match (how close the match is).
 
     """
+    context = context or get_context()
     results = []
 
-    for element, element_data in get_app().e_xray_database.items():
+    for element, element_data in context.e_xray_database.items():
         for transition, (energy, intensity) in element_data.items():
             energy = float(energy)
             for search_energy, search_width in values:
@@ -0,0 +1,165 @@
+import math
+import logging
+import time
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MuXrayIndex:
+    """
+    Sorted, column-oriented index over a muonic X-ray database, used to search for transitions at many energies at
+    once. All transitions in the database are flattened into one array of energies sorted in ascending order, with
+    parallel arrays holding the element, transition name and primary flag of each entry. Searches are done using
+    binary search (``np.searchsorted``) rather than by looping over every element and transition in the database.
+
+    The index is built once per database and should be rebuilt whenever the database it was built from changes.
+    """
+
+    def __init__(self, all_energies: dict, primary_energies: dict):
+        """
+        Args:
+            all_energies: dict of {element: {transition: {"E": energy, ...}}}, e.g. ``muon_database["All energies"]``
+            primary_energies: dict of {element: {transition: ...}} containing the primary transitions of each element
+        """
+        start_time = time.time_ns()
+
+        elements = []
+        transitions = []
+        energies = []
+        primary = []
+
+        for element, element_data in all_energies.items():
+            prims = primary_energies.get(element, {})
+            for transition, transition_data in element_data.items():
+                elements.append(element)
+                transitions.append(transition)
+                energies.append(transition_data["E"])
+                primary.append(transition in prims)
+
+        energies = np.asarray(energies, dtype=float)
+
+        # sort by energy - stable sort keeps database order for transitions with identical energies
+        order = np.argsort(energies, kind="stable")
+
+        self.energies = energies[order]
+        self.elements = np.asarray(elements, dtype=object)[order]
+        self.transitions = np.asarray(transitions, dtype=object)[order]
+        self.is_primary = np.asarray(primary, dtype=bool)[order]
+
+        # position of each entry in the original database, used to order matches like the database does
+        self.db_order = order
+
+        logger.debug(
+            "Built muonic X-ray index with %s transitions in %s s.",
+            len(self.energies),
+            (time.time_ns() - start_time) / 1e9,
+        )
+
+    @classmethod
+    def from_database(
+        cls, peak_data: dict, all_isotopes: bool = False
+    ) -> "MuXrayIndex":
+        """
+        Builds an index from a loaded muonic X-ray database (see ``load_mu_xray_db``).
+
+        Args:
+            peak_data: muonic X-ray database
+            all_isotopes: if True, index the "All isotopes" section of the database instead of default isotopes only
+
+        Returns:
+            MuXrayIndex for the database.
+        """
+        if all_isotopes:
+            peak_data = peak_data["All isotopes"]
+
+        return cls(peak_data["All energies"], peak_data["Primary energies"])
+
+    def __len__(self) -> int:
+        return len(self.energies)
+
+    def find(
+        self, centres: np.ndarray, widths: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Finds all transitions within 3x search width of each search energy in a single vectorised pass.
+
+        Args:
+            centres: array of search energies
+            widths: array of search widths (one per search energy)
+
+        Returns:
+            Tuple of (peak indices, index positions, differences) with one entry per match. Peak indices refer to
+            positions in ``centres``, index positions refer to positions in the arrays of this index, and differences
+            are the absolute differences between the search energy and the matched transition energy. Matches are
+            sorted by difference. Ties are kept in search order, then database order.
+        """
+        centres = np.asarray(centres, dtype=float)
+        widths = np.asarray(widths, dtype=float)
+        limits = 3 * widths
+
+        # widen search window slightly so that rounding in centre +- limit never drops a match - the exact condition
+        # is checked below
+        tol = 1e-9 * (np.abs(centres) + limits)
+        lo = np.searchsorted(self.energies, centres - limits - tol, side="left")
+        hi = np.searchsorted(self.energies, centres + limits + tol, side="right")
+
+        counts = hi - lo
+        total = int(counts.sum())
+
+        # expand each [lo, hi) window into explicit (peak, index position) pairs
+        peak_idx = np.repeat(np.arange(len(centres)), counts)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        index_pos = starts + np.arange(total)
+
+        diff = np.abs(centres[peak_idx] - self.energies[index_pos])
+        keep = diff <= limits[peak_idx]
+        peak_idx, index_pos, diff = peak_idx[keep], index_pos[keep], diff[keep]
+
+        # lexsort sorts by last key first: difference, then search order, then database order
+        order = np.lexsort((self.db_order[index_pos], peak_idx, diff))
+
+        return peak_idx[order], index_pos[order], diff[order]
+
+    def search(
+        self, input_peaks: list[list[float]]
+    ) -> tuple[list[dict], list[dict], list[dict]]:
+        """
+        Searches for possible muonic X-ray transitions at multiple energies at once. See
+        ``get_match.search_muxrays()`` for a description of the inputs and outputs.
+
+        Args:
+            input_peaks: List of [search energy, search width] search parameters.
+
+        Returns:
+            Tuple of (all matches, primary matches, secondary matches).
+        """
+        all_matches = []
+        primary_matches = []
+        secondary_matches = []
+
+        if len(input_peaks) == 0 or len(self.energies) == 0:
+            return all_matches, primary_matches, secondary_matches
+
+        centres, widths = np.asarray(input_peaks, dtype=float).reshape(-1, 2).T
+        peak_idx, index_pos, diff = self.find(centres, widths)
+
+        for peak_i, pos, d in zip(peak_idx.tolist(), index_pos.tolist(), diff.tolist()):
+            sigma = widths[peak_i]
+            data = {
+                "element": self.elements[pos],
+                "energy": float(self.energies[pos]),
+                "error": math.ceil(d / sigma) * float(sigma),
+                "peak_centre": float(centres[peak_i]),
+                "transition": self.transitions[pos],
+                "diff": d,
+            }
+
+            all_matches.append(data)
+
+            if self.is_primary[pos]:
+                primary_matches.append(data)
+            else:
+                secondary_matches.append(data)
+
+        return all_matches, primary_matches, secondary_matches
@@ -0,0 +1,306 @@
+from collections.abc import Mapping
+import numpy as np
+
+
+class GammaDatabase(Mapping):
+    """
+    Column-oriented gamma transition database.
+
+    All gamma transitions are stored in NumPy arrays sorted by energy (``energies``, ``intensities``, ``lifetimes``
+    and ``isotopes``), so that energy range queries can be done with binary search. Transitions can also be looked
+    up by isotope or by element in constant time through precomputed slices.
+
+    For compatibility with code written for the old dictionary-based database, the class also behaves as a read-only
+    dict of {element: list of (isotope, energy, intensity, lifetime) tuples}, with transitions listed in the same
+    order as in the level files.
+    """
+
+    def __init__(
+        self,
+        element_names: list[str],
+        element_sizes: list[int],
+        isotopes: np.ndarray,
+        energies: np.ndarray,
+        intensities: np.ndarray,
+        lifetimes: np.ndarray,
+    ):
+        """
+        Args:
+            element_names: name of each element, in database order
+            element_sizes: number of gamma transitions stored for each element
+            isotopes: isotope of each transition, in database order (element by element)
+            energies: energy (keV) of each transition, in database order
+            intensities: intensity of each transition, in database order
+            lifetimes: half-life of the level each transition comes from, in database order
+        """
+        isotopes = np.asarray(isotopes, dtype=str)
+        energies = np.asarray(energies, dtype=float)
+        intensities = np.asarray(intensities, dtype=float)
+        lifetimes = np.asarray(lifetimes, dtype=str)
+
+        # sort all columns by energy - stable sort keeps database order for identical energies
+        energy_order = np.argsort(energies, kind="stable")
+
+        # position in the sorted arrays of each transition in database order
+        db_order = np.empty_like(energy_order)
+        db_order[energy_order] = np.arange(len(energy_order))
+
+        # transitions grouped by isotope (database order within each isotope)
+        isotope_names, isotope_codes = np.unique(
+            np.char.strip(isotopes), return_inverse=True
+        )
+        isotope_order = np.argsort(isotope_codes, kind="stable")
+        isotope_bounds = np.searchsorted(
+            isotope_codes[isotope_order], np.arange(len(isotope_names) + 1)
+        )
+
+        self._set_arrays(
+            {
+                "energies": energies[energy_order],
+                "intensities": intensities[energy_order],
+                "lifetimes": lifetimes[energy_order],
+                "isotopes": isotopes[energy_order],
+                "db_positions": energy_order,
+                "element_names": np.asarray(element_names, dtype=str),
+                "element_bounds": np.concatenate(
+                    ([0], np.cumsum(np.asarray(element_sizes, dtype=int)))
+                ),
+                "isotope_names": isotope_names,
+                "isotope_bounds": isotope_bounds,
+                "isotope_order": db_order[isotope_order],
+            }
+        )
+
+    def _set_arrays(self, arrays: dict[str, np.ndarray]):
+        """
+        Sets up the database from its internal arrays (see ``to_arrays()``).
+        """
+        self.energies = arrays["energies"]
+        self.intensities = arrays["intensities"]
+        self.lifetimes = arrays["lifetimes"]
+        self.isotopes = arrays["isotopes"]
+
+        # position in the database of each entry of the sorted arrays, used to keep database order when sorting
+        # matches
+        self.db_positions = arrays["db_positions"]
+
+        # _db_order[i] is the position in the sorted arrays of the i-th transition in database order
+        self._db_order = np.empty_like(self.db_positions)
+        self._db_order[self.db_positions] = np.arange(len(self.db_positions))
+
+        # element -> slice of database order
+        element_bounds = arrays["element_bounds"].tolist()
+        self._element_slices = {
+            str(name): slice(element_bounds[i], element_bounds[i + 1])
+            for i, name in enumerate(arrays["element_names"])
+        }
+
+        # isotope -> slice of _isotope_order, which lists transitions grouped by isotope
+        isotope_bounds = arrays["isotope_bounds"].tolist()
+        self._isotope_order = arrays["isotope_order"]
+        self._isotope_slices = {
+            str(name): slice(isotope_bounds[i], isotope_bounds[i + 1])
+            for i, name in enumerate(arrays["isotope_names"])
+        }
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """
+        Gets all internal arrays of the database, e.g. for saving to file using ``np.savez()``. The database can be
+        recreated from these arrays using ``from_arrays()``, which skips all sorting and grouping.
+
+        Returns:
+            Dict of {name: array}.
+        """
+        element_names = list(self._element_slices.keys())
+        element_bounds = [0] + [s.stop for s in self._element_slices.values()]
+
+        isotope_names = list(self._isotope_slices.keys())
+        isotope_bounds = [0] + [s.stop for s in self._isotope_slices.values()]
+
+        return {
+            "energies": self.energies,
+            "intensities": self.intensities,
+            "lifetimes": self.lifetimes,
+            "isotopes": self.isotopes,
+            "db_positions": self.db_positions,
+            "element_names": np.asarray(element_names, dtype=str),
+            "element_bounds": np.asarray(element_bounds, dtype=int),
+            "isotope_names": np.asarray(isotope_names, dtype=str),
+            "isotope_bounds": np.asarray(isotope_bounds, dtype=int),
+            "isotope_order": self._isotope_order,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "GammaDatabase":
+        """
+        Recreates a GammaDatabase from the arrays returned by ``to_arrays()``.
+
+        Args:
+            arrays: dict (or loaded .npz file) of internal arrays
+
+        Returns:
+            GammaDatabase.
+        """
+        database = cls.__new__(cls)
+        database._set_arrays({key: np.asarray(arrays[key]) for key in arrays})
+        return database
+
+    @classmethod
+    def from_element_lists(cls, gamma_data: dict[str, list[tuple]]) -> "GammaDatabase":
+        """
+        Builds a GammaDatabase from a dict of {element: list of (isotope, energy, intensity, lifetime) tuples}.
+
+        Args:
+            gamma_data: dict containing lists of gamma transitions for each element
+
+        Returns:
+            GammaDatabase containing the same transitions.
+        """
+        rows = [row for element_data in gamma_data.values() for row in element_data]
+
+        if rows:
+            isotopes, energies, intensities, lifetimes = zip(*rows)
+        else:
+            isotopes, energies, intensities, lifetimes = [], [], [], []
+
+        return cls(
+            element_names=list(gamma_data.keys()),
+            element_sizes=[len(element_data) for element_data in gamma_data.values()],
+            isotopes=isotopes,
+            energies=energies,
+            intensities=intensities,
+            lifetimes=lifetimes,
+        )
+
+    # Mapping interface (element -> list of tuples), kept for compatibility with the old database format
+    def __getitem__(self, element: str) -> list[tuple]:
+        positions = self._db_order[self._element_slices[element]]
+        return list(
+            zip(
+                self.isotopes[positions].tolist(),
+                self.energies[positions].tolist(),
+                self.intensities[positions].tolist(),
+                self.lifetimes[positions].tolist(),
+            )
+        )
+
+    def __iter__(self):
+        return iter(self._element_slices)
+
+    def __len__(self) -> int:
+        return len(self._element_slices)
+
+    @property
+    def size(self) -> int:
+        """
+        Total number of gamma transitions in the database.
+        """
+        return len(self.energies)
+
+    def isotope_positions(self, isotope: str) -> np.ndarray:
+        """
+        Gets positions (in the energy-sorted arrays) of all transitions for an isotope, in database order.
+
+        Args:
+            isotope: isotope name, e.g. "140Eu"
+
+        Returns:
+            Array of positions. Empty if isotope is not in the database.
+        """
+        isotope_slice = self._isotope_slices.get(str(isotope).strip())
+
+        if isotope_slice is None:
+            return np.empty(0, dtype=int)
+
+        return self._isotope_order[isotope_slice]
+
+    def energy_range(self, low: float, high: float) -> slice:
+        """
+        Gets the slice of the energy-sorted arrays containing all transitions with low <= energy <= high.
+
+        Args:
+            low: lower energy limit
+            high: upper energy limit
+
+        Returns:
+            Slice of the energy-sorted arrays.
+        """
+        lo = np.searchsorted(self.energies, low, side="left")
+        hi = np.searchsorted(self.energies, high, side="right")
+        return slice(int(lo), int(hi))
+
+    def find(
+        self, centres: np.ndarray, widths: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Finds all transitions with energy E such that E - width <= centre <= E + width, for many search energies in
+        a single vectorised pass.
+
+        Args:
+            centres: array of search energies
+            widths: array of search widths (one per search energy)
+
+        Returns:
+            Tuple of (peak indices, positions, differences) with one entry per match. Peak indices refer to positions
+            in ``centres``, positions refer to the energy-sorted arrays and differences are ``centre - E``. Matches are
+            sorted by absolute difference, with ties kept in database order, then search order.
+        """
+        centres = np.asarray(centres, dtype=float)
+        widths = np.asarray(widths, dtype=float)
+
+        # widen search window slightly so that rounding never drops a match - exact condition is checked below
+        tol = 1e-9 * (np.abs(centres) + widths)
+        lo = np.searchsorted(self.energies, centres - widths - tol, side="left")
+        hi = np.searchsorted(self.energies, centres + widths + tol, side="right")
+
+        counts = hi - lo
+        peak_idx = np.repeat(np.arange(len(centres)), counts)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        positions = starts + np.arange(int(counts.sum()))
+
+        energies = self.energies[positions]
+        peaks = centres[peak_idx]
+        sigmas = widths[peak_idx]
+
+        keep = ((energies - sigmas) <= peaks) & (peaks <= (energies + sigmas))
+        peak_idx, positions = peak_idx[keep], positions[keep]
+        diff = centres[peak_idx] - self.energies[positions]
+
+        # lexsort sorts by last key first: |difference|, then database order, then search order
+        order = np.lexsort((peak_idx, self.db_positions[positions], np.abs(diff)))
+
+        return peak_idx[order], positions[order], diff[order]
+
+    def to_dicts(self, positions: np.ndarray) -> list[dict]:
+        """
+        Converts transitions at given positions to the list-of-dicts format returned by the ``get_match`` search
+        functions.
+
+        Args:
+            positions: positions in the energy-sorted arrays
+
+        Returns:
+            List of dictionaries, one for each position, with keys
+
+            * **isotope** (str)
+
+            * **energy** (float)
+
+            * **intensity** (float)
+
+            * **lifetime** (str)
+        """
+        return [
+            {
+                "isotope": isotope,
+                "energy": energy,
+                "intensity": intensity,
+                "lifetime": lifetime,
+            }
+            for isotope, energy, intensity, lifetime in zip(
+                self.isotopes[positions].tolist(),
+                self.energies[positions].tolist(),
+                self.intensities[positions].tolist(),
+                self.lifetimes[positions].tolist(),
+            )
+        ]
@@ -1,16 +1,107 @@
 import logging
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
 from copy import deepcopy
+from dataclasses import replace
+import numpy as np
 from PyQt6.QtCore import QObject, pyqtSignal
 from EVA.core.data_structures.spectrum import Spectrum
 from EVA.core.physics import rebin
-from EVA.core.physics.normalisation import normalise_events, normalise_counts
+from EVA.core.physics.calibration import (
+    CalibrationCurveCache,
+    apply_calibration,
+    calibration_from_settings,
+)
+from EVA.core.physics.normalisation import normalise_counts
 
 logger = logging.getLogger(__name__)
 
 normalisation_types = ("none", "counts", "events")
 
 
+class StageCache:
+    """
+    Small least-recently-used cache for the outputs of correction stages, keyed on the inputs of each stage. Keys of
+    later stages should include the key of the stage they are computed from, so that changing a setting only
+    recomputes the stages downstream of it.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        """
+        Args:
+            max_entries: maximum number of stage outputs to keep
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key: tuple, compute):
+        """
+        Gets the cached output for a key, computing and storing it if it is not cached.
+
+        Args:
+            key: hashable key describing all inputs of the stage, starting with the name of the stage
+            compute: function to call (with no arguments) to compute the output
+
+        Returns:
+            Output of the stage.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        output = compute()
+        self._entries[key] = output
+
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return output
+
+    def clear(self):
+        """
+        Removes all cached outputs.
+        """
+        self._entries.clear()
+
+
+class BufferPool:
+    """
+    Preallocated output arrays for corrections which are applied in place, e.g. energy correction and normalisation.
+    A buffer is reused for as long as the shape and dtype of the data written to it stay the same, so repeated
+    corrections (e.g. while dragging a binning slider) do not allocate new arrays.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, key: tuple, like: np.ndarray) -> np.ndarray:
+        """
+        Gets the buffer for a key, allocating a new one if the data has changed shape.
+
+        Args:
+            key: hashable key of the buffer, e.g. (detector, "x")
+            like: array the buffer will hold a corrected copy of. Buffers are float32 for float32 data and float64
+                otherwise.
+
+        Returns:
+            Uninitialised array with the shape of like.
+        """
+        dtype = np.result_type(like.dtype, np.float32)
+        buffer = self._buffers.get(key)
+
+        if buffer is None or buffer.shape != like.shape or buffer.dtype != dtype:
+            buffer = np.empty(like.shape, dtype=dtype)
+            self._buffers[key] = buffer
+
+        return buffer
+
+    def clear(self):
+        """
+        Releases all buffers.
+        """
+        self._buffers.clear()
+
+
 class MetaQObjectABC(type(QObject), ABCMeta):
     """Metaclass combining QObject and ABC compatibility."""
 
@@ -21,6 +112,10 @@ class Run(QObject, metaclass=MetaQObjectABC):
     """
     Abstract base class for experiment runs.
     Provides shared logic and enforces a consistent interface for RunNexus and RunBiriani.
+
+    The corrected spectra of each detector are stored in ``data``. Corrections are written to arrays which are reused
+    every time corrections are applied, so the x and y arrays of a spectrum in ``data`` are overwritten by the next
+    call to ``set_corrections()``. Use ``get_spectrum()`` to get a spectrum which is kept after corrections change.
     """
 
     corrections_updated_s = pyqtSignal()
@@ -46,6 +141,19 @@ class Run(QObject, metaclass=MetaQObjectABC):
         self.default_bin = 8192  # subclasses may override
         self.bin_method = ""  # subclass must set
 
+        # optional signal (e.g. WorkerSignals.progress) to report progress of slow corrections to
+        self.progress_callback = None
+
+        # memoised outputs of correction stages, used by subclasses with staged corrections
+        self._stage_cache = StageCache()
+
+        # output arrays of corrections applied in place - corrected data in self.data may share memory with these, so
+        # it is overwritten the next time corrections are applied
+        self._buffers = BufferPool()
+
+        # evaluated non-linear calibration curves, keyed on the detector and the binning of the calibrated data
+        self._curve_cache = CalibrationCurveCache(max_entries=16)
+
     # =================================================================
     # ABSTRACT INTERFACE
     # =================================================================
@@ -72,15 +180,25 @@ class Run(QObject, metaclass=MetaQObjectABC):
 
     # Shared functions
     def _set_energy_correction(self, energy_corrections: dict):
-        """Apply per-detector linear energy corrections."""
+        """
+        Apply per-detector energy calibrations (see ``calibration.calibration_from_settings()``), writing the
+        calibrated bin centres to reused buffers. Calibrations are applied to the raw bin centres, before binning.
+        """
         if energy_corrections is None:
             energy_corrections = self.energy_corrections
 
         for detector, spectrum in self.data.items():
             try:
-                if energy_corrections[detector]["use_e_corr"]:
-                    gradient, offset = energy_corrections[detector]["e_corr_coeffs"]
-                    self.data[detector].x = self.data[detector].x * gradient + offset
+                calibration = calibration_from_settings(energy_corrections[detector])
+                if calibration is not None:
+                    x = self.data[detector].x
+                    self.data[detector].x = apply_calibration(
+                        calibration,
+                        x,
+                        out=self._buffers.get((detector, "x"), x),
+                        cache=self._curve_cache,
+                        key=(detector, "raw"),
+                    )
             except KeyError:
                 logger.warning(
                     f"No energy correction information found for detector {detector}. Automatically skipping correction."
@@ -117,7 +235,10 @@ class Run(QObject, metaclass=MetaQObjectABC):
         """Normalise detector spectra by total counts."""
         for detector, spectrum in self._raw.items():
             if detector in normalise_which:
-                self.data[detector].y = normalise_counts(self.data[detector].y)
+                y = self.data[detector].y
+                self.data[detector].y = normalise_counts(
+                    y, out=self._buffers.get((detector, "y"), y)
+                )
 
         self.normalisation = "counts"
         self.normalise_which = normalise_which
@@ -128,8 +249,6 @@ class Run(QObject, metaclass=MetaQObjectABC):
         """Dispatch to the appropriate binning method."""
         if self.bin_method == "prebinned":
             self._set_binning_prebinned(binning_rate)
-        elif self.bin_method == "raw":
-            self._set_binning_raw(binning_rate, default_bin)
         elif self.bin_method == "hist":
             pass
         else:
@@ -156,30 +275,6 @@ class Run(QObject, metaclass=MetaQObjectABC):
                 self._raw[detector].bin_range,
             )
 
-    def _set_binning_raw(
-        self, binning_rate: float | None = None, default_bin: int | None = None
-    ):
-        """Rebin unbinned (event) data."""
-        if binning_rate is None:
-            binning_rate = self.bin_rate
-        else:
-            self.bin_rate = binning_rate
-
-        if default_bin is None:
-            default_bin = self.default_bin
-        else:
-            self.default_bin = default_bin
-
-        bin_num = int(default_bin / binning_rate)
-        for detector, spectrum in self._raw.items():
-            if getattr(spectrum, "energy", None) is None or spectrum.energy.size == 0:
-                continue
-            else:
-                spectrum.x, spectrum.y = rebin.nxs_rebin(
-                    spectrum.cut_data, bin_num, bin_range=spectrum.bin_range
-                )
-                self.data[detector].x, self.data[detector].y = spectrum.x, spectrum.y
-
     # Utility methods
     def is_empty(self) -> bool:
         """Return True if all detectors have no data."""
@@ -189,6 +284,19 @@ class Run(QObject, metaclass=MetaQObjectABC):
         """Return list of non-empty Spectrum objects."""
         return [spectrum for spectrum in self.data.values() if spectrum.x.size != 0]
 
+    def get_spectrum(self, detector: str) -> Spectrum:
+        """
+        Gets a copy of the corrected spectrum of a detector, which is not changed when corrections are applied again.
+
+        Args:
+            detector: detector name, e.g. "GE1"
+
+        Returns:
+            Copy of ``data[detector]`` with its own x and y arrays.
+        """
+        spectrum = self.data[detector]
+        return replace(spectrum, x=np.copy(spectrum.x), y=np.copy(spectrum.y))
+
     def get_raw(self) -> dict[Spectrum]:
-        """Return a deep copy of raw data."""
+        """Return a deep copy of raw data. This is the only place raw data is copied - corrections never change it."""
         return deepcopy(self._raw)
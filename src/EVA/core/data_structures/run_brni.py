@@ -1,4 +1,4 @@
-from copy import deepcopy
+from dataclasses import replace
 from EVA.core.physics.normalisation import normalise_counts, normalise_events
 from EVA.core.data_structures.run import Run
 
@@ -32,7 +32,10 @@ class RunBiriani(Run):
         if normalise_which is None:
             normalise_which = self.normalise_which
 
-        self.data = deepcopy(self._raw)
+        # corrections write to new arrays (or reused buffers), so the raw spectra only need a shallow copy
+        self.data = {
+            detector: replace(spectrum) for detector, spectrum in self._raw.items()
+        }
         self._set_energy_correction(energy_corrections)
         self._set_normalisation(normalisation, normalise_which)
         self._set_binning(bin_rate)
@@ -46,7 +49,9 @@ class RunBiriani(Run):
         """Normalise detector spectra by total counts."""
         for detector, spectrum in self._raw.items():
             if detector in normalise_which:
-                self.data[detector].y = normalise_counts(spectrum.y)
+                self.data[detector].y = normalise_counts(
+                    spectrum.y, out=self._buffers.get((detector, "y"), spectrum.y)
+                )
             else:
                 self.data[detector].y = self.data[detector].y
         self.normalisation = "counts"
@@ -57,7 +62,11 @@ class RunBiriani(Run):
             spills = int(self.events_str[19:])
             for detector, spectrum in self._raw.items():
                 if detector in normalise_which:
-                    self.data[detector].y = normalise_events(spectrum.y, spills)
+                    self.data[detector].y = normalise_events(
+                        spectrum.y,
+                        spills,
+                        out=self._buffers.get((detector, "y"), spectrum.y),
+                    )
             self.normalisation = "events"
             self.normalise_which = normalise_which
         except ValueError:
@@ -1,9 +1,18 @@
-import numpy as np
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from EVA.core.data_structures.spectrum_nexus import SpectrumNexus
-from EVA.core.physics import rebin
-from EVA.core.physics.normalisation import normalise_events, normalise_counts
+from EVA.core.physics import event_binning, rebin
+from EVA.core.physics.calibration import apply_calibration, calibration_from_settings
+from EVA.core.physics.normalisation import normalise_events
 from EVA.core.data_structures.run import Run
 
+logger = logging.getLogger(__name__)
+
+# binning of the time plot
+TIME_PLOT_BIN_NUM = 100
+TIME_PLOT_RANGE = (0, 2000)
+
 
 class RunNexus(Run):
     """Run class for Nexus data."""
@@ -26,6 +35,14 @@ class RunNexus(Run):
         self.prompt_limit = prompt_limit
         self.delayed_limit = delayed_limit
         self.bin_method = self._bin_method_from_plotmode(plot_mode)
+
+        # on-disk cache of event histograms, see histogram_cache.HistogramCache - set by the loader if enabled
+        self.histogram_cache = None
+
+        # keys of the most recently used output of each correction stage, see set_corrections()
+        self._stage_keys = {}
+        self._applied_corrections = None
+
         self.data = {
             key: SpectrumNexus(
                 detector=nexus_obj.detector, run_number=nexus_obj.run_number
@@ -43,19 +60,40 @@ class RunNexus(Run):
         plot_mode=None,
         prompt_limit=None,
         delayed_limit=None,
+        progress_callback=None,
     ):
-        self.data = {
-            key: SpectrumNexus(
-                detector=nexus_obj.detector, run_number=nexus_obj.run_number
-            )
-            for key, nexus_obj in self._raw.items()
-        }
+        """
+        Applies plot mode, binning, energy correction and normalisation, in that order. The output of each stage is
+        memoised on its inputs, so only the stages downstream of a changed setting are recomputed, e.g. changing only
+        the normalisation reuses the binned and energy corrected spectra. Any argument which is None keeps its
+        current value. corrections_updated_s is only emitted if the corrected data changed.
+        """
+        self.progress_callback = progress_callback
 
         self._set_mode(plot_mode, prompt_limit, delayed_limit)
-        self._set_energy_correction(energy_corrections)
         self._set_binning(bin_rate, default_bin)
+        self._set_energy_correction(energy_corrections)
+
+        self.data = {
+            detector: SpectrumNexus(
+                detector=self._raw[detector].detector,
+                run_number=self._raw[detector].run_number,
+                x=x,
+                y=y,
+                bin_range=self._mode_spectra[detector]["bin_range"],
+            )
+            for detector, (x, y) in self._corrected_spectra.items()
+        }
         self._set_normalisation(normalisation, normalise_which)
-        self.corrections_updated_s.emit()
+
+        applied = (
+            self._stage_keys["energy_correction"],
+            self.normalisation,
+            tuple(self.normalise_which),
+        )
+        if applied != self._applied_corrections:
+            self._applied_corrections = applied
+            self.corrections_updated_s.emit()
 
     def _set_normalisation_events(self, normalise_which):
         """Normalise spectra by event count using comment metadata."""
@@ -80,8 +118,9 @@ class RunNexus(Run):
 
         for detector, spectrum in self._raw.items():
             if detector in normalise_which:
+                y = self.data[detector].y
                 self.data[detector].y = normalise_events(
-                    self.data[detector].y, spills
+                    y, spills, out=self._buffers.get((detector, "y"), y)
                 )
 
         self.normalisation = "events"
@@ -109,78 +148,358 @@ class RunNexus(Run):
         else:
             self.delayed_limit = int(delayed_limit)
 
+        key = ("mode", plot_mode, self.prompt_limit, self.delayed_limit)
+        self._mode_spectra = self._stage_cache.get(
+            key, lambda: self._get_mode_spectra(plot_mode)
+        )
+        self._stage_keys["mode"] = key
+
         for detector, spectrum in self._raw.items():
-            if plot_mode == "IBEX Prompt Spectrum":
-                spectrum.x = self._raw[detector].prompt_energy[:]
-                spectrum.y = self._raw[detector].prompt_count[:]
+            mode_spectrum = self._mode_spectra[detector]
+            self.bin_method = mode_spectrum["bin_method"]
+
+            # events are filtered by time when binned, see _set_binning()
+            spectrum.time_window = mode_spectrum["time_window"]
+
+            if self.bin_method == "prebinned":
+                spectrum.x, spectrum.y = mode_spectrum["x"], mode_spectrum["y"]
+
+    def _get_mode_spectra(self, plot_mode: str) -> dict[str, dict]:
+        """
+        Gets the data of each detector for a plot mode. Pre-binned data is read from file, while for event data only
+        the time window to select events with is set up.
 
-                self.data[detector].x = spectrum.x
-                self.data[detector].y = spectrum.y
-                self.data[detector].bin_range = self._raw[detector].bin_range
-                self.bin_method = "prebinned"
+        Args:
+            plot_mode: plot mode
+
+        Returns:
+            Dict of {detector: {"bin_method", "x", "y", "time_window", "bin_range"}}.
+        """
+        mode_spectra = {}
+
+        if plot_mode == "Time Plot":
+            self._fill_event_histograms()
+
+        for detector, spectrum in self._raw.items():
+            mode_spectrum = {
+                "bin_method": "prebinned",
+                "x": None,
+                "y": None,
+                "time_window": None,
+                "bin_range": spectrum.bin_range,
+            }
+
+            if plot_mode == "IBEX Prompt Spectrum":
+                mode_spectrum["x"] = spectrum.prompt_energy[:]
+                mode_spectrum["y"] = spectrum.prompt_count[:]
 
             elif plot_mode == "IBEX Delayed Spectrum":
-                spectrum.x = self._raw[detector].delayed_energy[:]
-                spectrum.y = self._raw[detector].delayed_count[:]
-                self.data[detector].x = spectrum.x
-                self.data[detector].y = spectrum.y
-                self.data[detector].bin_range = self._raw[detector].bin_range
-                self.bin_method = "prebinned"
+                mode_spectrum["x"] = spectrum.delayed_energy[:]
+                mode_spectrum["y"] = spectrum.delayed_count[:]
 
             elif plot_mode == "Manual Delayed Spectrum":
-                time_data = self._raw[detector].time[:]
-                energy_data = self._raw[detector].energy[:]
-                mask = (time_data > self.prompt_limit) & (
-                    time_data < self.delayed_limit
-                )
-                self._raw[detector].cut_data = energy_data[mask]
-                self.data[detector].bin_range = self._raw[detector].bin_range
-                self.bin_method = "raw"
+                mode_spectrum["bin_method"] = "raw"
+                mode_spectrum["time_window"] = (self.prompt_limit, self.delayed_limit)
 
             elif plot_mode == "Manual Prompt Spectrum":
-                time_data = self._raw[detector].time[:]
-                energy_data = self._raw[detector].energy[:]
-                mask = (time_data > 0) & (time_data < self.prompt_limit)
-                self._raw[detector].cut_data = energy_data[mask]
-                self.data[detector].bin_range = self._raw[detector].bin_range
-                self.bin_method = "raw"
+                mode_spectrum["bin_method"] = "raw"
+                mode_spectrum["time_window"] = (0, self.prompt_limit)
 
             elif plot_mode == "Efficiency Spectrum":
-                if (
-                    self._raw[detector].efficiency_hist_counts
-                    and self._raw[detector].efficiency_hist_energy
-                ):
-                    self.data[detector].x = self._raw[detector].efficiency_hist_energy[
-                        :
-                    ]
-                    self.data[detector].y = self._raw[detector].efficiency_hist_counts[
-                        :
-                    ]
-                    self.bin_method = "prebinned"
+                if spectrum.efficiency_hist_counts and spectrum.efficiency_hist_energy:
+                    mode_spectrum["x"] = spectrum.efficiency_hist_energy[:]
+                    mode_spectrum["y"] = spectrum.efficiency_hist_counts[:]
                 else:
-                    time_data = self._raw[detector].time[:]
-                    energy_data = self._raw[detector].energy[:]
-                    mask = time_data > 0
-                    self._raw[detector].cut_data = energy_data[mask]
-                    self.bin_method = "raw"
-
-                self.data[detector].bin_range = self._raw[detector].bin_range
+                    mode_spectrum["bin_method"] = "raw"
+                    mode_spectrum["time_window"] = (0, None)
 
             elif plot_mode == "Time Plot":
-                time_data = self._raw[detector].time[:]
-                mask = (time_data > 0) & (time_data < 2000)
-                filtered_time_data = self._raw[detector].time[mask]
-                spectrum.x, spectrum.y = rebin.nxs_rebin(
-                    filtered_time_data, bin_num=100, bin_range=(0, 2000)
-                )
-
-                self.data[detector].x = spectrum.x
-                self.data[detector].y = spectrum.y
-                self.bin_method = "prebinned"
+                histograms = self._get_event_histograms(detector)
+                if histograms is not None:
+                    mode_spectrum["x"] = histograms.time_centres
+                    mode_spectrum["y"] = histograms.time_counts
+                else:
+                    mode_spectrum["x"], mode_spectrum["y"] = (
+                        event_binning.histogram_events(
+                            spectrum.time,
+                            bin_num=TIME_PLOT_BIN_NUM,
+                            bin_range=TIME_PLOT_RANGE,
+                            time=spectrum.time,
+                            time_window=TIME_PLOT_RANGE,
+                            progress_callback=self.progress_callback,
+                        )
+                    )
+                mode_spectrum["bin_range"] = TIME_PLOT_RANGE
 
             else:
                 raise ValueError(f"Invalid plot mode: '{plot_mode}'")
 
+            mode_spectra[detector] = mode_spectrum
+
+        return mode_spectra
+
+    def _fill_event_histograms(self):
+        """
+        Fills the event histograms of all detectors which need it in parallel, one thread per detector. HDF5 reads
+        are serialised by h5py, but the masking and histogramming of one detector overlaps with reading the next
+        block of another.
+        """
+        detectors = [
+            detector
+            for detector, spectrum in self._raw.items()
+            if getattr(spectrum, "energy", None) is not None
+            and spectrum.energy.size
+            and spectrum.bin_range is not None
+            and self._event_histograms_outdated(detector)
+        ]
+
+        if len(detectors) < 2:
+            return
+
+        progress = event_binning.CombinedProgress(self.progress_callback)
+        max_workers = min(len(detectors), os.cpu_count() or 1)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self._get_event_histograms, detector, progress.task(detector)
+                )
+                for detector in detectors
+            ]
+            for future in futures:
+                future.result()  # re-raise any error from the worker threads
+
+    def _event_histograms_outdated(self, detector: str) -> bool:
+        """
+        Checks whether the event histograms of a detector need to be (re)filled.
+
+        Args:
+            detector: name of detector
+
+        Returns:
+            True if histograms are missing or were filled with different limits or binning.
+        """
+        spectrum = self._raw[detector]
+        histograms = spectrum.event_histograms
+
+        return (
+            histograms is None
+            or histograms.bin_num != self.default_bin
+            or tuple(histograms.bin_range) != tuple(spectrum.bin_range)
+            or any(
+                window not in histograms.energy_counts
+                for window in self._event_time_windows()
+            )
+        )
+
+    def _event_time_windows(self) -> list[tuple]:
+        """
+        Gets the time windows events are selected with in the manual plot modes.
+
+        Returns:
+            List of (low, high) time windows.
+        """
+        return [
+            (0, self.prompt_limit),  # prompt
+            (self.prompt_limit, self.delayed_limit),  # delayed
+            (0, None),  # efficiency
+        ]
+
+    def _get_event_histograms(self, detector: str, progress_callback=None):
+        """
+        Gets histograms of the event data of a detector for all manual plot modes, which are filled in a single pass
+        over the events the first time they are needed. The histograms are only filled again if the prompt/delayed
+        limits or the default binning change. If the run has a histogram cache, histograms filled before (in this or an
+        earlier session) are loaded from it instead.
+
+        Args:
+            detector: name of detector
+            progress_callback: signal to report progress to, defaults to the progress_callback of the run
+
+        Returns:
+            EventHistograms for the detector, or None if the detector has no energy range to bin events in.
+        """
+        spectrum = self._raw[detector]
+        if spectrum.bin_range is None:
+            return None
+
+        if progress_callback is None:
+            progress_callback = self.progress_callback
+
+        if self._event_histograms_outdated(detector):
+            time_windows = self._event_time_windows()
+
+            cache_key = None
+            if self.histogram_cache is not None:
+                cache_key = self.histogram_cache.make_key(
+                    spectrum.energy,
+                    spectrum.time,
+                    time_windows,
+                    self.default_bin,
+                    spectrum.bin_range,
+                    TIME_PLOT_BIN_NUM,
+                    TIME_PLOT_RANGE,
+                )
+
+            histograms = None
+            if cache_key is not None:
+                histograms = self.histogram_cache.get(cache_key, time_windows)
+
+            if histograms is None:
+                histograms = event_binning.histogram_event_windows(
+                    spectrum.energy,
+                    spectrum.time,
+                    time_windows,
+                    self.default_bin,
+                    spectrum.bin_range,
+                    time_bin_num=TIME_PLOT_BIN_NUM,
+                    time_range=TIME_PLOT_RANGE,
+                    progress_callback=progress_callback,
+                )
+                if cache_key is not None:
+                    self.histogram_cache.put(cache_key, histograms)
+
+            spectrum.event_histograms = histograms
+
+        return spectrum.event_histograms
+
+    def _set_binning(
+        self, binning_rate: float | None = None, default_bin: int | None = None
+    ):
+        """Rebin the data of the current plot mode. Event data is rebinned from the stored event histograms where
+        possible, and only streamed from file if not (e.g. bin rate below 1)."""
+        if binning_rate is None:
+            binning_rate = self.bin_rate
+        else:
+            self.bin_rate = binning_rate
+
+        if default_bin is None:
+            default_bin = self.default_bin
+        else:
+            self.default_bin = default_bin
+
+        key = ("binning", self._stage_keys["mode"], binning_rate, default_bin)
+        self._binned_spectra = self._stage_cache.get(
+            key, lambda: self._get_binned_spectra(binning_rate, default_bin)
+        )
+        self._stage_keys["binning"] = key
+
+        for detector, spectrum in self._raw.items():
+            if self._mode_spectra[detector]["bin_method"] == "raw":
+                spectrum.x, spectrum.y = self._binned_spectra[detector]
+
+    def _get_binned_spectra(
+        self, binning_rate: float, default_bin: int
+    ) -> dict[str, tuple]:
+        """
+        Rebins the data of each detector for the current plot mode.
+
+        Args:
+            binning_rate: bin rate
+            default_bin: number of bins at bin rate 1 for event data
+
+        Returns:
+            Dict of {detector: (x, y)}.
+        """
+        binned_spectra = {}
+        bin_num = int(default_bin / binning_rate)
+
+        if any(m["bin_method"] == "raw" for m in self._mode_spectra.values()):
+            self._fill_event_histograms()
+
+        for detector, spectrum in self._raw.items():
+            mode_spectrum = self._mode_spectra[detector]
+            x, y = mode_spectrum["x"], mode_spectrum["y"]
+
+            if mode_spectrum["bin_method"] == "prebinned":
+                if binning_rate != 1.0 and x.size != 0:
+                    x, y = rebin.numpy_rebin(
+                        x, y, binning_rate, mode_spectrum["bin_range"]
+                    )
+
+            elif getattr(spectrum, "energy", None) is not None and spectrum.energy.size:
+                histograms = self._get_event_histograms(detector)
+                binned = None
+                if histograms is not None:
+                    binned = histograms.energy_histogram(
+                        mode_spectrum["time_window"], bin_num
+                    )
+
+                if binned is None:
+                    binned = event_binning.histogram_events(
+                        spectrum.energy,
+                        bin_num,
+                        bin_range=spectrum.bin_range,
+                        time=spectrum.time,
+                        time_window=mode_spectrum["time_window"],
+                        progress_callback=self.progress_callback,
+                    )
+
+                x, y = binned
+
+            binned_spectra[detector] = (x, y)
+
+        return binned_spectra
+
+    def _set_energy_correction(self, energy_corrections: dict | None = None):
+        """Apply per-detector energy calibrations to the bin centres of the binned data."""
+        if energy_corrections is None:
+            energy_corrections = self.energy_corrections
+
+        calibrations = {}
+        for detector in self._raw.keys():
+            try:
+                calibration = calibration_from_settings(energy_corrections[detector])
+                if calibration is not None:
+                    calibrations[detector] = calibration
+            except KeyError:
+                logger.warning(
+                    f"No energy correction information found for detector {detector}. Automatically skipping correction."
+                )
+        self.energy_corrections = energy_corrections
+
+        key = (
+            "energy_correction",
+            self._stage_keys["binning"],
+            tuple(
+                sorted(
+                    (detector, calibration.key)
+                    for detector, calibration in calibrations.items()
+                )
+            ),
+        )
+        self._corrected_spectra = self._stage_cache.get(
+            key, lambda: self._get_corrected_spectra(calibrations)
+        )
+        self._stage_keys["energy_correction"] = key
+
+    def _get_corrected_spectra(self, calibrations: dict) -> dict[str, tuple]:
+        """
+        Applies energy calibrations to the binned data of each detector.
+
+        Args:
+            calibrations: dict of {detector: Calibration} for detectors to calibrate
+
+        Returns:
+            Dict of {detector: (x, y)}.
+        """
+        corrected_spectra = {}
+
+        for detector, (x, y) in self._binned_spectra.items():
+            if detector in calibrations and x is not None:
+                # non-linear curves are cached for each binning, so changing the calibration of one detector does not
+                # evaluate the others again
+                x = apply_calibration(
+                    calibrations[detector],
+                    x,
+                    cache=self._curve_cache,
+                    key=(detector, self._stage_keys["binning"]),
+                )
+
+            corrected_spectra[detector] = (x, y)
+
+        return corrected_spectra
+
     def _bin_method_from_plotmode(self, plot_mode: str) -> str:
         if plot_mode in ["IBEX Prompt Spectrum", "IBEX Delayed Spectrum", "Time Plot"]:
             return "prebinned"
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 import h5py
 import numpy as np
+from EVA.core.physics.event_binning import EventHistograms
 
 
 @dataclass
@@ -17,7 +18,8 @@ class SpectrumNexus:
     delayed_count: h5py.Dataset = None
     ibex_hist_2d: h5py.Dataset = None
     manual_hist_2d: h5py.Dataset = None
-    cut_data: h5py.Dataset = None
+    time_window: tuple = None
+    event_histograms: EventHistograms = None
     bin_range: list = None
     efficiency_hist_counts: h5py.Dataset = None
     efficiency_hist_energy: h5py.Dataset = None
@@ -1,22 +1,266 @@
+from scipy.ndimage import maximum_filter1d, minimum_filter1d, uniform_filter1d
 from scipy.signal import find_peaks
 from scipy.signal import find_peaks_cwt
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
+# default settings of the mean filter background estimate (Keith's peak finder)
+FSIZE = 20
+NFILTER = 9
+HIGH_CLIP = 25
 
-def meanfilter(data: np.ndarray | list, filter_size: int = 9) -> np.ndarray:
+# default half-width (in bins) of the largest clipping window of the SNIP background estimate
+SNIP_ITERATIONS = 12
+
+# default width (in bins) of the rolling ball background estimate
+ROLLING_BALL_WIDTH = 21
+
+# default width (in bins) of the mean filter spectra are smoothed with before estimating the SNIP or rolling ball
+# background - without it both follow the bottom of the noise rather than its middle
+BACKGROUND_SMOOTHING = 9
+
+
+def meanfilter(
+    data: np.ndarray | list, filter_size: int = 9, axis: int = -1
+) -> np.ndarray:
     """
-    Applies mean pass filter using np.convolve() by convolving ``data`` and ``np.ones(filter_size)/filter_size``
+    Applies mean pass filter, giving the same result as convolving ``data`` with
+    ``np.ones(filter_size)/filter_size`` using ``np.convolve(..., mode="same")`` - points beyond the ends of the data
+    count as zeros. The filter is applied along one axis, so a whole stack of spectra can be filtered at once.
 
     Args:
         data: input array
-        filter_size: size of filter array for convolution
+        filter_size: size of filter
+        axis: axis to filter along
 
     Returns:
         Copy of data with mean filter applied
     """
-    return np.convolve(data, np.ones(filter_size) / filter_size, mode="same")
+    return uniform_filter1d(
+        np.asarray(data, dtype=np.float64), filter_size, axis=axis, mode="constant"
+    )
+
+
+def repeated_meanfilter(
+    data: np.ndarray | list, filter_size: int, passes: int, axis: int = -1
+) -> np.ndarray:
+    """
+    Applies the mean pass filter several times, see ``meanfilter()``.
+
+    Args:
+        data: input array
+        filter_size: size of filter
+        passes: number of times to apply the filter
+        axis: axis to filter along
+
+    Returns:
+        Copy of data with mean filter applied.
+    """
+    result = meanfilter(data, filter_size, axis)
+    for i in range(passes - 1):
+        uniform_filter1d(result, filter_size, axis=axis, mode="constant", output=result)
+
+    return result
+
+
+def interpolate_nans(data: np.ndarray, axis: int = -1) -> np.ndarray:
+    """
+    Fills NaNs by linear interpolation between the valid points either side of them, along one axis. NaNs before the
+    first or after the last valid point are set to that point. Rows with no valid points are left as NaN.
+
+    Args:
+        data: input array
+        axis: axis to interpolate along
+
+    Returns:
+        Copy of data with NaNs filled.
+    """
+    data = np.moveaxis(np.array(data, dtype=np.float64), axis, -1)
+    valid = ~np.isnan(data)
+
+    if valid.all():
+        return np.moveaxis(data, -1, axis)
+
+    n = data.shape[-1]
+    index = np.arange(n)
+
+    # index of the closest valid point at or before, and at or after, each point
+    before = np.maximum.accumulate(np.where(valid, index, -1), axis=-1)
+    after = np.flip(
+        np.minimum.accumulate(np.flip(np.where(valid, index, n), -1), axis=-1), -1
+    )
+
+    # extend the end points outwards
+    before, after = (
+        np.where(before < 0, after, before),
+        np.where(after >= n, before, after),
+    )
+    before = np.clip(before, 0, n - 1)
+    after = np.clip(after, 0, n - 1)
+
+    y0 = np.take_along_axis(data, before, -1)
+    y1 = np.take_along_axis(data, after, -1)
+    span = after - before
+    fraction = np.divide(index - before, span, out=np.zeros(data.shape), where=span > 0)
+
+    return np.moveaxis(y0 + (y1 - y0) * fraction, -1, axis)
+
+
+def estimate_background_meanfilter(
+    y: np.ndarray,
+    axis: int = -1,
+    filter_size: int = FSIZE,
+    passes: int = NFILTER + 1,
+    high_clip: float = HIGH_CLIP,
+) -> np.ndarray:
+    """
+    Estimates the background of spectra with repeated mean pass filters. A rough background is subtracted from the
+    spectrum, points more than ``high_clip`` above it (i.e. peaks) are replaced by interpolating between their
+    neighbours, and the result is filtered again to give the background.
+
+    Args:
+        y: spectrum, or stack of spectra
+        axis: axis of the bins
+        filter_size: size of filter for the rough background. The final background uses half this size.
+        passes: number of times each filter is applied
+        high_clip: counts above the rough background above which points are treated as peaks
+
+    Returns:
+        Background of each spectrum.
+    """
+    ## Create smooth backgroud
+    rough_base = repeated_meanfilter(y, filter_size, passes, axis)
+
+    ## Look for points more than high_clip above the background -> convert to NaN
+    clipped = np.where(y - rough_base > high_clip, np.nan, y)
+
+    ## Interpolate between dropped points
+    interpd = interpolate_nans(clipped, axis)
+
+    ## Get baseline from the interpd signal
+    return repeated_meanfilter(interpd, filter_size // 2, passes, axis)
+
+
+def smooth(y: np.ndarray, filter_size: int, axis: int = -1) -> np.ndarray:
+    """
+    Smooths spectra with a mean filter. Unlike ``meanfilter()``, points beyond the ends of the data count as copies
+    of the end points, so the ends are not pulled down.
+
+    Args:
+        y: spectrum, or stack of spectra
+        filter_size: size of filter, 1 for no smoothing
+        axis: axis to filter along
+
+    Returns:
+        Smoothed copy of y.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if filter_size <= 1:
+        return y.copy()
+
+    return uniform_filter1d(y, filter_size, axis=axis, mode="nearest")
+
+
+def estimate_background_snip(
+    y: np.ndarray,
+    axis: int = -1,
+    iterations: int = SNIP_ITERATIONS,
+    smoothing: int = BACKGROUND_SMOOTHING,
+) -> np.ndarray:
+    """
+    Estimates the background of spectra with the SNIP (statistics-sensitive non-linear iterative peak-clipping)
+    algorithm. The spectrum is compressed with a log-log-square root transform, then each point is repeatedly
+    replaced by the mean of the points ``p`` bins either side of it if that is lower, for p = 1 ... iterations. Peaks
+    narrower than the final window are clipped away, while the background follows curves and steps which the mean
+    filter estimate smooths over.
+
+    Args:
+        y: spectrum, or stack of spectra
+        axis: axis of the bins
+        iterations: half-width in bins of the largest clipping window - should be around the full width of the widest
+            peaks
+        smoothing: width of mean filter to smooth spectra with first, see ``smooth()``
+
+    Returns:
+        Background of each spectrum.
+    """
+    y = np.moveaxis(smooth(y, smoothing, axis), axis, -1)
+
+    # log-log-square root transform, so that large peaks do not dominate
+    v = np.log(np.log(np.sqrt(np.clip(y, 0, None) + 1) + 1) + 1)
+
+    iterations = min(iterations, (v.shape[-1] - 1) // 2)
+    for p in range(1, iterations + 1):
+        clipped = v[..., p:-p]
+        np.minimum(clipped, (v[..., : -2 * p] + v[..., 2 * p :]) / 2, out=clipped)
+
+    background = (np.exp(np.exp(v) - 1) - 1) ** 2 - 1
+    return np.moveaxis(background, -1, axis)
+
+
+def estimate_background_rolling_ball(
+    y: np.ndarray,
+    axis: int = -1,
+    width: int = ROLLING_BALL_WIDTH,
+    smoothing: int = BACKGROUND_SMOOTHING,
+) -> np.ndarray:
+    """
+    Estimates the background of spectra by rolling a ball underneath them (Kneen and Annegarn, 1996): the spectrum
+    is eroded with a minimum filter, dilated with a maximum filter of the same width, and smoothed with a mean filter
+    of the same width. Peaks narrower than the ball are removed.
+
+    Args:
+        y: spectrum, or stack of spectra
+        axis: axis of the bins
+        width: width of ball in bins - should be wider than the widest peaks
+        smoothing: width of mean filter to smooth spectra with first, see ``smooth()``
+
+    Returns:
+        Background of each spectrum.
+    """
+    y = smooth(y, smoothing, axis)
+
+    background = minimum_filter1d(y, width, axis=axis, mode="nearest")
+    maximum_filter1d(background, width, axis=axis, mode="nearest", output=background)
+    uniform_filter1d(background, width, axis=axis, mode="nearest", output=background)
+
+    return background
+
+
+# background estimators which can be used for peak finding
+background_estimators = {
+    "mean filter": estimate_background_meanfilter,
+    "snip": estimate_background_snip,
+    "rolling ball": estimate_background_rolling_ball,
+}
+
+
+def remove_background(
+    y: np.ndarray, method: str = "mean filter", axis: int = -1, **kwargs
+) -> np.ndarray:
+    """
+    Removes the background from spectra, and smooths the result slightly.
+
+    Args:
+        y: spectrum, or stack of spectra
+        method: background estimator, see ``background_estimators``
+        axis: axis of the bins
+        **kwargs: settings of the background estimator, e.g. ``iterations`` for "snip"
+
+    Returns:
+        Background removed spectra.
+
+    Raises:
+        ValueError: If the background estimator is unknown.
+    """
+    if method not in background_estimators:
+        raise ValueError(f"Unknown background estimator '{method}'.")
+
+    y = np.asarray(y, dtype=np.float64)
+    background = background_estimators[method](y, axis, **kwargs)
+
+    ## Subract background from spectrum to get a backgroud removed signal
+    return meanfilter(y - background, FSIZE // 10, axis)
 
 
 # Keith's peak finder
@@ -36,47 +280,89 @@ def findpeak_with_bck_removed(
     Returns:
         SciPy find_peaks() result and ndarray of the x-values where peaks were detected.
     """
-    spectrum = y
+    return find_peaks_batch(x, np.asarray(y)[np.newaxis], h, t, d, "mean filter")[0]
 
-    FSIZE = 20
-    NFILTER = 9
-    HIGH_CLIP = 25
 
-    ## Create smooth backgroud
-    rough_base = meanfilter(spectrum, FSIZE)
-    for i in range(NFILTER):
-        rough_base = meanfilter(rough_base, FSIZE)
+def find_peaks_batch(
+    x: np.ndarray,
+    y: np.ndarray,
+    h: float,
+    t: float,
+    d: float,
+    background: str | None = "mean filter",
+    background_settings: dict | None = None,
+) -> list[tuple[tuple[np.ndarray, dict], np.ndarray]]:
+    """
+    Finds the peaks in a stack of spectra (e.g. detectors x bins, or runs x bins) with the same number of bins. The
+    background of every spectrum is removed at once, then SciPy's find_peaks() is called on each spectrum.
+
+    Args:
+        x: x-data, either shared by all spectra (1-D) or for each spectrum (2-D, same shape as y)
+        y: 2-D array of y-data, one spectrum per row
+        h: height threshold
+        t: threshold for number of peaks within region
+        d: minimum distance between peaks
+        background: background estimator to remove background with before finding peaks (see
+            ``background_estimators``), or None to find peaks in the spectra as they are
+        background_settings: optional keyword arguments of the background estimator
+
+    Returns:
+        List of (SciPy find_peaks() result, ndarray of the x-values where peaks were detected) for each spectrum.
+    """
+    y = np.asarray(y)
+    x = np.broadcast_to(x, y.shape)
+    if background is None:
+        signal = y
+    else:
+        signal = remove_background(y, background, **(background_settings or {}))
 
-    ## Subtract from main signal result smooth1
-    smooth1 = spectrum - rough_base
+    result = []
+    for row_x, row in zip(x, signal):
+        peaks = find_peaks(row, height=h, threshold=t, distance=d)
+        result.append((peaks, row_x[peaks[0]]))
 
-    ## Look for points in smooth1 more than MAX_HEIGHT -> convert to NaN
-    cond_high_clip = smooth1 > HIGH_CLIP
-    clipped = np.where(cond_high_clip, np.nan, spectrum)
+    return result
 
-    ## Interpolate between dropped points
-    interpd = pd.Series(clipped).interpolate().tolist()
 
-    ## Get baseline from the interpd signal
-    rough_base = meanfilter(interpd, FSIZE // 2)
-    for i in range(NFILTER):
-        rough_base = meanfilter(interpd, FSIZE // 2)
+def find_peaks_in_spectra(
+    spectra: list[tuple[np.ndarray, np.ndarray]],
+    h: float,
+    t: float,
+    d: float,
+    background: str | None = "mean filter",
+    background_settings: dict | None = None,
+) -> list[tuple[tuple[np.ndarray, dict], np.ndarray]]:
+    """
+    Finds the peaks in a list of spectra, e.g. every detector of a set of runs. Spectra with the same number of bins
+    are stacked, so that their backgrounds are removed in one go - see ``find_peaks_batch()``.
 
-    ## Subract rough_base from spectrum to get a backgroud removed signal
-    bg_removed = meanfilter(spectrum - rough_base, FSIZE // 10)
+    Args:
+        spectra: list of (x, y) of each spectrum
+        h: height threshold
+        t: threshold for number of peaks within region
+        d: minimum distance between peaks
+        background: background estimator, or None to find peaks without removing the background
+        background_settings: optional keyword arguments of the background estimator
 
-    ## Pick peaks on bg removed signal - scipy method
-    peaks = find_peaks(bg_removed, h, t, d)
+    Returns:
+        List of (SciPy find_peaks() result, ndarray of the x-values where peaks were detected), in the order of
+        spectra.
+    """
+    groups = {}
+    for i, (x, y) in enumerate(spectra):
+        groups.setdefault(len(y), []).append(i)
 
-    """strong_pos, params = find_peaks(bg_removed, height=10)
-    peaks = np.zeros(shape=len(spectrum))
-    peaks[pos] = 30
-    strong_peaks = np.zeros(shape=len(spectrum))
-    strong_peaks[strong_pos] = 50"""
+    result = [None] * len(spectra)
+    for indices in groups.values():
+        x = np.stack([spectra[i][0] for i in indices])
+        y = np.stack([spectra[i][1] for i in indices])
 
-    peak_pos = x[peaks[0]]
+        for i, peaks in zip(
+            indices, find_peaks_batch(x, y, h, t, d, background, background_settings)
+        ):
+            result[i] = peaks
 
-    return peaks, peak_pos
+    return result
 
 
 def findpeaks(
@@ -0,0 +1,419 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import numpy as np
+
+from EVA.core.context import get_context
+from EVA.core.physics.energy_correction import lincorr
+
+logger = logging.getLogger(__name__)
+
+# calibration models which can be selected with the "e_corr_model" detector setting
+calibration_models = ("polynomial", "piecewise")
+
+
+class Calibration(ABC):
+    """
+    Energy calibration of a detector, mapping measured bin centres to calibrated energies. Calibrations are
+    immutable, and two calibrations with the same ``key`` always give the same energies, so evaluated calibration
+    curves can be cached (see ``CalibrationCurveCache``).
+    """
+
+    @property
+    @abstractmethod
+    def key(self) -> tuple:
+        """Hashable description of the calibration."""
+        pass
+
+    @property
+    def is_linear(self) -> bool:
+        """Whether the calibration is a straight line, i.e. can be written as (gradient, offset)."""
+        return False
+
+    @property
+    def linear_coefficients(self) -> tuple[float, float] | None:
+        """(gradient, offset) of a linear calibration, or None if the calibration is not linear."""
+        return None
+
+    @abstractmethod
+    def evaluate(self, x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Evaluates the calibration.
+
+        Args:
+            x: measured bin centres
+            out: optional preallocated float array (same shape as x, must not be x) to write the result to
+
+        Returns:
+            Calibrated bin centres (out, if given).
+        """
+        pass
+
+    @abstractmethod
+    def to_settings(self) -> dict:
+        """
+        Gets the detector settings describing the calibration, see ``calibration_from_settings()``.
+
+        Returns:
+            Dict of detector settings.
+        """
+        pass
+
+    def __eq__(self, other):
+        return isinstance(other, Calibration) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+
+class PolynomialCalibration(Calibration):
+    """
+    Polynomial calibration, E = c[0] * x^n + c[1] * x^(n-1) + ... + c[n]. Coefficients are in the same order as for
+    ``np.polyval()``, so the linear correction (gradient, offset) is a polynomial of degree 1.
+    """
+
+    def __init__(self, coefficients):
+        """
+        Args:
+            coefficients: polynomial coefficients, highest power first
+        """
+        coefficients = tuple(float(c) for c in coefficients)
+        if not coefficients:
+            raise ValueError("Polynomial calibration needs at least one coefficient.")
+
+        self.coefficients = coefficients
+
+    @property
+    def degree(self) -> int:
+        return len(self.coefficients) - 1
+
+    @property
+    def key(self) -> tuple:
+        return "polynomial", self.coefficients
+
+    @property
+    def is_linear(self) -> bool:
+        return self.degree <= 1
+
+    @property
+    def linear_coefficients(self) -> tuple[float, float] | None:
+        if not self.is_linear:
+            return None
+        return (
+            (self.coefficients[0], self.coefficients[1])
+            if self.degree == 1
+            else (0.0, self.coefficients[0])
+        )
+
+    def evaluate(self, x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        x = np.asarray(x)
+        if out is None:
+            out = np.empty(x.shape, dtype=np.result_type(x.dtype, np.float32))
+
+        # Horner's method, evaluated in place so that no temporary arrays are made for any degree
+        out.fill(self.coefficients[0])
+        for coefficient in self.coefficients[1:]:
+            out *= x
+            out += coefficient
+
+        return out
+
+    def to_settings(self) -> dict:
+        return {"e_corr_model": "polynomial", "e_corr_coeffs": list(self.coefficients)}
+
+    def __repr__(self):
+        return f"PolynomialCalibration({list(self.coefficients)})"
+
+
+class PiecewiseLinearCalibration(Calibration):
+    """
+    Piecewise-linear calibration through a list of (measured, calibrated) energy points. Energies outside the range
+    of the points are extrapolated along the first and last segments.
+    """
+
+    def __init__(self, points):
+        """
+        Args:
+            points: list of (measured energy, calibrated energy) pairs, in any order
+        """
+        points = sorted((float(measured), float(true)) for measured, true in points)
+        measured = [point[0] for point in points]
+
+        if len(points) < 2:
+            raise ValueError("Piecewise calibration needs at least two points.")
+        if len(set(measured)) != len(measured):
+            raise ValueError(
+                "Piecewise calibration points must have distinct energies."
+            )
+
+        self.points = tuple(points)
+        self._measured = np.array(measured)
+        self._true = np.array([point[1] for point in points])
+
+    @property
+    def key(self) -> tuple:
+        return "piecewise", self.points
+
+    @property
+    def is_linear(self) -> bool:
+        return len(self.points) == 2
+
+    @property
+    def linear_coefficients(self) -> tuple[float, float] | None:
+        if not self.is_linear:
+            return None
+        (x0, y0), (x1, y1) = self.points
+        gradient = (y1 - y0) / (x1 - x0)
+        return gradient, y0 - gradient * x0
+
+    def evaluate(self, x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        x = np.asarray(x)
+        xp, fp = self._measured, self._true
+        if out is None:
+            out = np.empty(x.shape, dtype=np.result_type(x.dtype, np.float32))
+
+        # np.interp() clamps to the end points - extrapolate along the end segments instead
+        below = x < xp[0]
+        above = x > xp[-1]
+        x_below = x[below] if below.any() else None
+        x_above = x[above] if above.any() else None
+
+        out[...] = np.interp(x, xp, fp)
+        if x_below is not None:
+            slope = (fp[1] - fp[0]) / (xp[1] - xp[0])
+            out[below] = fp[0] + (x_below - xp[0]) * slope
+        if x_above is not None:
+            slope = (fp[-1] - fp[-2]) / (xp[-1] - xp[-2])
+            out[above] = fp[-1] + (x_above - xp[-1]) * slope
+
+        return out
+
+    def to_settings(self) -> dict:
+        return {
+            "e_corr_model": "piecewise",
+            "e_corr_points": [list(point) for point in self.points],
+        }
+
+    def __repr__(self):
+        return f"PiecewiseLinearCalibration({[list(point) for point in self.points]})"
+
+
+def calibration_from_settings(settings: dict) -> Calibration | None:
+    """
+    Gets the calibration of a detector from its settings (e.g. ``config["detector_specific"]["GE1"]``). Detectors
+    without an "e_corr_model" setting use a polynomial with the coefficients in "e_corr_coeffs", so the original
+    (gradient, offset) settings are a linear calibration.
+
+    Args:
+        settings: dict of detector settings, with keys "use_e_corr", "e_corr_coeffs" and optionally "e_corr_model"
+            ("polynomial" or "piecewise") and "e_corr_points" (list of (measured, calibrated) energies)
+
+    Returns:
+        Calibration, or None if the detector is not calibrated ("use_e_corr" is False).
+
+    Raises:
+        KeyError: If a setting needed by the calibration model is missing.
+        ValueError: If the calibration model is unknown or its settings are invalid.
+    """
+    if not settings["use_e_corr"]:
+        return None
+
+    model = settings.get("e_corr_model", "polynomial")
+
+    if model == "polynomial":
+        return PolynomialCalibration(settings["e_corr_coeffs"])
+    if model == "piecewise":
+        return PiecewiseLinearCalibration(settings["e_corr_points"])
+
+    raise ValueError(f"Unknown energy calibration model '{model}'.")
+
+
+def fit_calibration(
+    measured, true, model: str = "polynomial", degree: int = 1
+) -> Calibration:
+    """
+    Fits a calibration to measured energies of lines with known energies.
+
+    Args:
+        measured: measured energies of lines
+        true: known energies of the same lines
+        model: "polynomial" (least squares fit) or "piecewise" (linear interpolation between lines)
+        degree: degree of polynomial calibration
+
+    Returns:
+        Fitted calibration.
+
+    Raises:
+        ValueError: If there are not enough lines to fit the calibration, or the model is unknown.
+    """
+    measured = np.asarray(measured, dtype=float)
+    true = np.asarray(true, dtype=float)
+
+    if measured.shape != true.shape:
+        raise ValueError("Need one known energy for each measured energy.")
+
+    if model == "polynomial":
+        if len(np.unique(measured)) <= degree:
+            raise ValueError(
+                f"Need at least {degree + 1} lines to fit a calibration of degree {degree}."
+            )
+        return PolynomialCalibration(np.polyfit(measured, true, degree))
+
+    if model == "piecewise":
+        return PiecewiseLinearCalibration(zip(measured, true))
+
+    raise ValueError(f"Unknown energy calibration model '{model}'.")
+
+
+def get_line_energies(
+    lines: list[tuple[str, str]], database: dict | None = None
+) -> np.ndarray:
+    """
+    Looks up the energies of muonic X-ray lines.
+
+    Args:
+        lines: list of (element, transition), e.g. [("Au", "2p3/2-1s1/2")]
+        database: muonic X-ray database, defaults to the muon database of ``get_context()``
+
+    Returns:
+        Array of line energies.
+
+    Raises:
+        KeyError: If a line is not in the database.
+    """
+    if database is None:
+        database = get_context().muon_database
+
+    all_energies = database["All energies"]
+    energies = []
+
+    for element, transition in lines:
+        try:
+            energies.append(all_energies[element][transition]["E"])
+        except KeyError:
+            raise KeyError(
+                f"Muonic X-ray {element} {transition} not found in database."
+            )
+
+    return np.array(energies, dtype=float)
+
+
+def fit_calibration_to_lines(
+    peaks: list[tuple[float, str, str]],
+    model: str = "polynomial",
+    degree: int = 1,
+    database: dict | None = None,
+) -> Calibration:
+    """
+    Fits a calibration to peaks identified as known muonic X-ray lines.
+
+    Args:
+        peaks: list of (measured energy, element, transition), e.g. [(5761.2, "Au", "2p3/2-1s1/2")]
+        model: calibration model, see ``fit_calibration()``
+        degree: degree of polynomial calibration
+        database: muonic X-ray database, defaults to the muon database of ``get_context()``
+
+    Returns:
+        Fitted calibration.
+    """
+    measured = [peak[0] for peak in peaks]
+    true = get_line_energies([(peak[1], peak[2]) for peak in peaks], database)
+    calibration = fit_calibration(measured, true, model, degree)
+
+    logger.info("Fitted energy calibration %s to %s lines.", calibration, len(peaks))
+    return calibration
+
+
+class CalibrationCurveCache:
+    """
+    Least-recently-used cache of evaluated calibration curves, keyed on the calibration and a key describing the bin
+    centres it was evaluated at (e.g. the detector and the key of the binning stage of a run), so that the bin centres
+    never need to be hashed. Only non-linear calibrations are worth caching - linear ones are applied directly, see
+    ``apply_calibration()``. Cached curves are read-only, as they are shared.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        """
+        Args:
+            max_entries: maximum number of curves to keep
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, calibration: Calibration, x: np.ndarray, key) -> np.ndarray:
+        """
+        Gets a calibration curve, evaluating it if it is not cached.
+
+        Args:
+            calibration: calibration to evaluate
+            x: bin centres to evaluate calibration at
+            key: hashable key which is the same only for the same bin centres
+
+        Returns:
+            Read-only array of calibrated bin centres.
+        """
+        key = (calibration.key, key)
+
+        with self._lock:
+            curve = self._entries.get(key)
+            if curve is not None:
+                self._entries.move_to_end(key)
+                return curve
+
+        curve = calibration.evaluate(x)
+        curve.flags.writeable = False
+
+        with self._lock:
+            self._entries[key] = curve
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return curve
+
+    def clear(self):
+        """
+        Removes all cached curves.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+def apply_calibration(
+    calibration: Calibration,
+    x: np.ndarray,
+    out: np.ndarray | None = None,
+    cache: CalibrationCurveCache | None = None,
+    key=None,
+) -> np.ndarray:
+    """
+    Calibrates bin centres. Linear calibrations are computed with a single multiply-add straight into out, which is
+    faster than looking up a cached curve. Non-linear calibrations are taken from the cache, if one is given.
+
+    Args:
+        calibration: calibration to apply
+        x: bin centres to calibrate
+        out: optional preallocated array (same shape as x, may be x itself) to write the result to
+        cache: optional cache of non-linear calibration curves
+        key: key of the bin centres in the cache, see ``CalibrationCurveCache.get()``
+
+    Returns:
+        Calibrated bin centres (out, if given). Curves taken from the cache are read-only if out is not given.
+    """
+    coefficients = calibration.linear_coefficients
+    if coefficients is not None:
+        return lincorr(x, *coefficients, out=out)
+
+    if cache is not None and key is not None:
+        curve = cache.get(calibration, x, key)
+    elif out is not None and out is not x:
+        return calibration.evaluate(x, out=out)
+    else:
+        curve = calibration.evaluate(x)
+
+    if out is None:
+        return curve
+
+    np.copyto(out, curve)
+    return out
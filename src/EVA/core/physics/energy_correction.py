@@ -16,5 +16,19 @@ def Energy_Corrections(data):
 """
 
 
-def lincorr(x, m, c):
-    return x * float(m) + float(c)
+def lincorr(x, m, c, out=None):
+    """
+    Linear energy correction, x * m + c, computed as a single multiply-add into one output array.
+
+    Args:
+        x: bin centres to correct
+        m: gradient
+        c: offset
+        out: optional preallocated array (same shape as x, may be x itself) to write the result to
+
+    Returns:
+        Corrected bin centres (out, if given).
+    """
+    out = np.multiply(x, float(m), out=out)
+    out += float(c)
+    return out
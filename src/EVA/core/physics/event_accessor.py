@@ -0,0 +1,157 @@
+import logging
+import h5py
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# HDF5 file drivers which store datasets at their offset in a single file on disk
+MEMORY_MAPPABLE_DRIVERS = ("sec2", "stdio")
+
+
+def memory_map_dataset(dataset: h5py.Dataset) -> np.memmap | None:
+    """
+    Memory-maps the data of an HDF5 dataset, so it can be read directly from the file without copying. Only possible
+    for contiguous (not chunked or compressed) datasets of plain numbers which have been written to disk.
+
+    Args:
+        dataset: h5py dataset
+
+    Returns:
+        Read-only memory-mapped array, or None if the dataset can not be memory-mapped.
+    """
+    if dataset.chunks is not None or dataset.dtype.kind not in "biuf":
+        return None
+
+    if dataset.file.driver not in MEMORY_MAPPABLE_DRIVERS or dataset.size == 0:
+        return None
+
+    offset = dataset.id.get_offset()
+    if offset is None:  # data not allocated in file, e.g. compact dataset
+        return None
+
+    try:
+        return np.memmap(
+            dataset.file.filename,
+            dtype=dataset.dtype,
+            mode="r",
+            offset=offset,
+            shape=dataset.shape,
+        )
+    except (OSError, ValueError) as e:
+        logger.debug("Could not memory-map %s: %s", dataset.name, e)
+        return None
+
+
+class EventAccessor:
+    """
+    Reads blocks of event data (e.g. event energies or times) from an HDF5 dataset with as little copying as
+    possible. Contiguous datasets are memory-mapped, so blocks are views of the file. Chunked or compressed datasets
+    are read with ``read_direct()`` into a buffer which is reused for every block. Events can optionally be converted
+    to a smaller dtype while they are read (e.g. float64 energies to float32), halving the memory used by each block.
+
+    Blocks returned by ``read()`` may share memory with the buffer, so are only valid until the next call to
+    ``read()``. Numpy arrays can be wrapped as well, which is useful for testing.
+    """
+
+    def __init__(self, dataset, dtype=None):
+        """
+        Args:
+            dataset: h5py dataset or numpy array of events
+            dtype: dtype to convert events to as they are read, or None to keep the dtype of the dataset
+        """
+        self.dataset = dataset
+        self.dtype = np.dtype(dtype) if dtype is not None else dataset.dtype
+        self._buffer = None
+
+        if isinstance(dataset, h5py.Dataset):
+            self._memmap = memory_map_dataset(dataset)
+        else:
+            self._memmap = None
+
+    @classmethod
+    def wrap(cls, dataset):
+        """
+        Gets an EventAccessor for a dataset, unless it already is one.
+
+        Args:
+            dataset: h5py dataset, numpy array or EventAccessor
+
+        Returns:
+            EventAccessor of dataset.
+        """
+        return dataset if isinstance(dataset, cls) else cls(dataset)
+
+    @property
+    def mode(self) -> str:
+        """How events are read - "memmap", "direct" (HDF5 reads into a reused buffer) or "array"."""
+        if self._memmap is not None:
+            return "memmap"
+        if isinstance(self.dataset, h5py.Dataset):
+            return "direct"
+        return "array"
+
+    @property
+    def file(self):
+        """h5py file the events are stored in, or None for numpy arrays."""
+        return getattr(self.dataset, "file", None)
+
+    @property
+    def chunks(self):
+        """Chunk shape of the dataset, or None if it is not chunked."""
+        return getattr(self.dataset, "chunks", None)
+
+    @property
+    def size(self) -> int:
+        return self.dataset.size
+
+    @property
+    def shape(self) -> tuple:
+        return self.dataset.shape
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+    def __getitem__(self, key) -> np.ndarray:
+        # a new array which is not shared with the buffer, e.g. event_accessor[:]
+        source = self._memmap if self._memmap is not None else self.dataset
+        return np.array(source[key], dtype=self.dtype)
+
+    def _get_buffer(self, n: int) -> np.ndarray:
+        if self._buffer is None or len(self._buffer) < n:
+            self._buffer = np.empty(n, dtype=self.dtype)
+        return self._buffer[:n]
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """
+        Reads a block of events.
+
+        Args:
+            start: index of first event
+            stop: index of last event + 1
+
+        Returns:
+            Array of events, only valid until the next call to ``read()``.
+        """
+        stop = min(stop, len(self))
+        n = max(stop - start, 0)
+
+        if self.mode == "direct":
+            buffer = self._get_buffer(n)
+            if n:
+                self.dataset.read_direct(buffer, np.s_[start:stop], np.s_[0:n])
+            return buffer
+
+        source = self._memmap if self._memmap is not None else self.dataset
+        block = source[start:stop]
+
+        if block.dtype == self.dtype:
+            return np.asarray(block)
+
+        buffer = self._get_buffer(n)
+        np.copyto(buffer, block, casting="unsafe")
+        return buffer
+
+    def close(self):
+        """Releases the memory map and buffer. The accessor can still be used, but will read through h5py."""
+        self._memmap = None
+        self._buffer = None
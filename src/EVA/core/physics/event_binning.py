@@ -0,0 +1,324 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+import numpy as np
+from EVA.core.physics.event_accessor import EventAccessor
+from EVA.core.physics.histogram_pyramid import HistogramPyramid
+
+logger = logging.getLogger(__name__)
+
+# approximate number of events read from file at a time
+DEFAULT_BLOCK_SIZE = 1 << 22
+
+
+class CombinedProgress:
+    """
+    Combines progress reports from several tasks running in parallel (e.g. one per detector) into a single progress
+    report, which is emitted to a progress signal such as WorkerSignals.progress. Each task is given its own
+    callback by ``task()``.
+    """
+
+    def __init__(self, progress_callback):
+        """
+        Args:
+            progress_callback: signal to emit combined progress to, as {"current": n, "total": N}
+        """
+        self.progress_callback = progress_callback
+        self._progress = {}
+        self._lock = threading.Lock()
+
+    def task(self, name: str):
+        """
+        Gets a progress callback for a single task.
+
+        Args:
+            name: unique name of task
+
+        Returns:
+            Object with an ``emit(progress)`` method, like a pyqtSignal.
+        """
+        combined = self
+
+        class TaskProgress:
+            def emit(self, progress: dict):
+                combined._update(name, progress)
+
+        return TaskProgress()
+
+    def _update(self, name: str, progress: dict):
+        with self._lock:
+            self._progress[name] = (progress["current"], progress["total"])
+            current = sum(p[0] for p in self._progress.values())
+            total = sum(p[1] for p in self._progress.values())
+
+        if self.progress_callback is not None:
+            self.progress_callback.emit({"current": current, "total": total})
+
+
+def get_block_size(dataset, block_size: int | None = None) -> int:
+    """
+    Gets the number of events to read at a time from a dataset. For chunked HDF5 datasets the block size is rounded to
+    a whole number of chunks, so that no chunk is read (and decompressed) more than once.
+
+    Args:
+        dataset: h5py dataset, EventAccessor or numpy array of events
+        block_size: approximate number of events to read at a time, defaults to DEFAULT_BLOCK_SIZE
+
+    Returns:
+        Number of events to read at a time.
+    """
+    if block_size is None:
+        block_size = DEFAULT_BLOCK_SIZE
+
+    chunks = getattr(dataset, "chunks", None)
+    if chunks:
+        chunk_len = chunks[0]
+        return max(1, block_size // chunk_len) * chunk_len
+
+    return max(1, block_size)
+
+
+def iter_event_blocks(datasets: list, block_size: int | None = None):
+    """
+    Iterates over one or more equally long event datasets in blocks, reading only one block of each dataset into
+    memory at a time. Datasets are read through an ``EventAccessor``, so blocks may be views of a memory-mapped file
+    or of a buffer which is reused for the next block - they must not be kept after moving on to the next block.
+
+    Args:
+        datasets: list of h5py datasets, EventAccessors (or numpy arrays) of the same length
+        block_size: approximate number of events to read at a time
+
+    Yields:
+        Tuple of (index of last event read + 1, list of arrays with one block of each dataset).
+    """
+    accessors = [EventAccessor.wrap(dataset) for dataset in datasets]
+    n_events = len(accessors[0])
+    step = get_block_size(accessors[0], block_size)
+
+    for start in range(0, n_events, step):
+        stop = min(start + step, n_events)
+        yield stop, [accessor.read(start, stop) for accessor in accessors]
+
+
+def time_mask(time: np.ndarray, time_window: tuple[float | None, float | None]):
+    """
+    Gets a mask selecting events inside a time window.
+
+    Args:
+        time: event times
+        time_window: (low, high) - selects events with low < time < high. Either limit can be None to leave that side
+            of the window open.
+
+    Returns:
+        Boolean mask array.
+    """
+    low, high = time_window
+    mask = np.ones(len(time), dtype=bool)
+    if low is not None:
+        mask &= time > low
+    if high is not None:
+        mask &= time < high
+    return mask
+
+
+def histogram_events(
+    values,
+    bin_num: int,
+    bin_range: tuple[float, float] | None = None,
+    time=None,
+    time_window: tuple[float | None, float | None] | None = None,
+    block_size: int | None = None,
+    progress_callback=None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Histograms event data block by block, optionally only keeping events whose time lies inside a window. Gives the
+    same result as ``rebin.nxs_rebin(values[mask], bin_num, bin_range)``, but never holds more than one block of
+    events in memory, so can be used on runs with hundreds of millions of events.
+
+    Args:
+        values: h5py dataset (or numpy array) of values to histogram, e.g. event energies
+        bin_num: number of bins
+        bin_range: (min, max) range of histogram. If None, the range of the selected events is used, which requires
+            an extra pass over the data.
+        time: h5py dataset (or numpy array) of event times, same length as values. Required if time_window is given.
+        time_window: (low, high) - only events with low < time < high are kept. Either limit can be None to leave
+            that side of the window open.
+        block_size: approximate number of events to read at a time
+        progress_callback: optional signal (e.g. WorkerSignals.progress) to emit progress to, as
+            {"current": events processed, "total": total number of events}
+
+    Returns:
+        Bin centres and counts in each bin.
+    """
+    if time_window is not None and time is None:
+        raise ValueError("Event times must be given to filter events by time.")
+
+    # only read each dataset once, e.g. when histogramming event times filtered by time
+    if time_window is None or time is values:
+        datasets = [values]
+    else:
+        datasets = [values, time]
+
+    n_events = len(values)
+
+    def selected(blocks):
+        if time_window is None:
+            return blocks[0]
+
+        return blocks[0][time_mask(blocks[-1], time_window)]
+
+    if bin_range is None:
+        # find range of selected events first, as np.histogram() would
+        lo, hi = np.inf, -np.inf
+        for _, blocks in iter_event_blocks(datasets, block_size):
+            block = selected(blocks)
+            if block.size:
+                lo = min(lo, block.min())
+                hi = max(hi, block.max())
+
+        bin_range = (0, 1) if lo > hi else (lo, hi)
+
+    # binning with the same number of bins and range gives identical bins for every block
+    counts = np.zeros(bin_num, dtype=np.int64)
+    bin_edges = np.histogram_bin_edges([], bins=bin_num, range=bin_range)
+
+    for stop, blocks in iter_event_blocks(datasets, block_size):
+        counts += np.histogram(selected(blocks), bins=bin_num, range=bin_range)[0]
+
+        if progress_callback is not None:
+            progress_callback.emit({"current": stop, "total": n_events})
+
+    logger.debug("Histogrammed %s events into %s bins.", n_events, bin_num)
+
+    bin_centres = bin_edges[:-1] + (bin_edges[1] - bin_edges[0]) / 2
+    return bin_centres, counts
+
+
+@dataclass
+class EventHistograms:
+    """
+    Histograms of the events of one detector, filled in a single pass over the event data by
+    ``histogram_event_windows()``. Energy histograms are stored at the finest binning for each time window, so that
+    switching between plot modes and bin rates only needs to select a stored histogram and look up (or build) the
+    level of its histogram pyramid with the requested binning.
+
+    Args:
+        bin_num: number of energy bins at the finest binning
+        bin_range: (min, max) range of the energy histograms
+        energy_centres: energy bin centres at the finest binning
+        energy_counts: dict of {time window: counts at the finest binning}
+        time_centres: time bin centres of the time histogram
+        time_counts: counts of the time histogram
+    """
+
+    bin_num: int
+    bin_range: tuple
+    energy_centres: np.ndarray = None
+    energy_counts: dict = field(default_factory=dict)
+    time_centres: np.ndarray = None
+    time_counts: np.ndarray = None
+    pyramids: dict = field(default_factory=dict)
+
+    def energy_histogram(
+        self, time_window: tuple, bin_num: int
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        """
+        Gets the energy histogram for a time window with the given number of bins from the histogram pyramid of the
+        stored histogram (see ``HistogramPyramid.rebin()``).
+
+        Args:
+            time_window: time window the events were selected with
+            bin_num: number of bins
+
+        Returns:
+            Bin centres and counts, or None if the time window has not been stored or more bins are requested than
+            have been stored.
+        """
+        if time_window not in self.energy_counts:
+            return None
+
+        if time_window not in self.pyramids:
+            self.pyramids[time_window] = HistogramPyramid(
+                self.energy_centres, self.energy_counts[time_window]
+            )
+
+        return self.pyramids[time_window].rebin(bin_num, self.bin_range)
+
+
+def histogram_event_windows(
+    energy,
+    time,
+    time_windows: list[tuple],
+    bin_num: int,
+    bin_range: tuple[float, float],
+    time_bin_num: int | None = None,
+    time_range: tuple[float, float] | None = None,
+    block_size: int | None = None,
+    progress_callback=None,
+) -> EventHistograms:
+    """
+    Histograms event energies for several time windows, and optionally event times, in a single pass over the event
+    data. Each histogram is the same as the one given by ``histogram_events()`` for that time window.
+
+    Args:
+        energy: h5py dataset (or numpy array) of event energies
+        time: h5py dataset (or numpy array) of event times
+        time_windows: list of (low, high) time windows to histogram energies for, see ``time_mask()``
+        bin_num: number of energy bins
+        bin_range: (min, max) range of energy histograms
+        time_bin_num: number of bins in time histogram. If None, event times are not histogrammed.
+        time_range: (min, max) range of time histogram. Only events inside this range are counted.
+        block_size: approximate number of events to read at a time
+        progress_callback: optional signal (e.g. WorkerSignals.progress) to emit progress to, as
+            {"current": events processed, "total": total number of events}
+
+    Returns:
+        EventHistograms containing all histograms.
+    """
+    n_events = len(energy)
+    time_windows = list(dict.fromkeys(time_windows))  # remove duplicates
+
+    energy_counts = {
+        window: np.zeros(bin_num, dtype=np.int64) for window in time_windows
+    }
+    if time_bin_num is not None:
+        time_counts = np.zeros(time_bin_num, dtype=np.int64)
+
+    for stop, (energy_block, time_block) in iter_event_blocks(
+        [energy, time], block_size
+    ):
+        for window, counts in energy_counts.items():
+            counts += np.histogram(
+                energy_block[time_mask(time_block, window)],
+                bins=bin_num,
+                range=bin_range,
+            )[0]
+
+        if time_bin_num is not None:
+            time_counts += np.histogram(
+                time_block[time_mask(time_block, time_range)],
+                bins=time_bin_num,
+                range=time_range,
+            )[0]
+
+        if progress_callback is not None:
+            progress_callback.emit({"current": stop, "total": n_events})
+
+    logger.debug(
+        "Histogrammed %s events for %s time windows in a single pass.",
+        n_events,
+        len(time_windows),
+    )
+
+    histograms = EventHistograms(bin_num=bin_num, bin_range=bin_range)
+
+    bin_edges = np.histogram_bin_edges([], bins=bin_num, range=bin_range)
+    histograms.energy_centres = bin_edges[:-1] + (bin_edges[1] - bin_edges[0]) / 2
+    histograms.energy_counts = energy_counts
+
+    if time_bin_num is not None:
+        time_edges = np.histogram_bin_edges([], bins=time_bin_num, range=time_range)
+        histograms.time_centres = time_edges[:-1] + (time_edges[1] - time_edges[0]) / 2
+        histograms.time_counts = time_counts
+
+    return histograms
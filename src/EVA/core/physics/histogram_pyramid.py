@@ -0,0 +1,83 @@
+import numpy as np
+from EVA.core.physics import rebin
+
+# factors to keep rebinned levels for, in addition to any factor that has been requested directly
+LEVEL_FACTORS = (2, 3, 4, 5, 8, 10, 16, 32, 64)
+
+
+class HistogramPyramid:
+    """
+    Multi-resolution copies of a histogram, derived from the finest histogram by summing neighbouring bins. Levels
+    are built lazily the first time they are needed, each from the coarsest existing level it can be built from, and
+    kept so that changing the binning back and forth does not recompute anything.
+
+    Args:
+        x: bin centres of the finest histogram (uniform bin width)
+        y: counts of the finest histogram
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        self.bin_num = len(x)
+        self.levels = {1: (np.asarray(x), np.asarray(y))}
+
+    def level(self, factor: int) -> tuple[np.ndarray, np.ndarray] | None:
+        """
+        Gets the histogram with every ``factor`` neighbouring bins of the finest histogram summed together.
+
+        Args:
+            factor: number of finest bins in each bin of the level
+
+        Returns:
+            Bin centres and counts of the level, or None if factor does not divide the number of bins.
+        """
+        if factor < 1 or self.bin_num % factor != 0:
+            return None
+
+        if factor not in self.levels:
+            # build from the coarsest existing level which can be summed into this one
+            base = max(f for f in self.levels if factor % f == 0)
+            x, y = self.levels[base]
+            self.levels[factor] = rebin.simple_rebin(x, y, factor // base)
+
+        return self.levels[factor]
+
+    def nearest_level(self, factor: float) -> int:
+        """
+        Gets the coarsest level which is at least as fine as the requested factor.
+
+        Args:
+            factor: requested number of finest bins per bin (need not be a whole number)
+
+        Returns:
+            Factor of the nearest level.
+        """
+        candidates = set(LEVEL_FACTORS) | set(self.levels)
+        return max(
+            (f for f in candidates if f <= factor and self.bin_num % f == 0),
+            default=1,
+        )
+
+    def rebin(
+        self, bin_num: int, bin_range: tuple[float, float]
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        """
+        Gets the histogram with the given number of bins over the range of the finest histogram. If the number of bins
+        divides the number of finest bins the result is exact. Otherwise counts are split between output bins in
+        proportion to their overlap with the bins of the nearest level (see ``rebin.overlap_rebin()``).
+
+        Args:
+            bin_num: number of bins
+            bin_range: (min, max) range of the finest histogram
+
+        Returns:
+            Bin centres and counts, or None if more bins are requested than the finest histogram has.
+        """
+        if bin_num < 1 or bin_num > self.bin_num:
+            return None
+
+        if self.bin_num % bin_num == 0:
+            return self.level(self.bin_num // bin_num)
+
+        x, y = self.level(self.nearest_level(self.bin_num / bin_num))
+        bin_edges = np.histogram_bin_edges([], bins=bin_num, range=bin_range)
+        return rebin.overlap_rebin(x, y, bin_edges)
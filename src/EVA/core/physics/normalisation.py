@@ -2,31 +2,39 @@ import numpy as np
 
 
 # Normalisation by 100000 counts
-def normalise_counts(ydata: np.ndarray) -> np.ndarray:
+def normalise_counts(ydata: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
     """
     Normalise data to 10,000 counts.
 
     Args:
         ydata: input array
+        out: optional preallocated float array (same shape as ydata) to write the result to
     Returns:
-        Normalised array
+        Normalised array (out, if given)
 
     """
-    return ydata / np.sum(ydata) * pow(10, 5)
+    out = np.divide(ydata, np.sum(ydata), out=out)
+    out *= pow(10, 5)
+    return out
 
 
-def normalise_events(ydata: np.ndarray, spills: int) -> np.ndarray:
+def normalise_events(
+    ydata: np.ndarray, spills: int, out: np.ndarray | None = None
+) -> np.ndarray:
     """
     Normalise data by number of spill events in comment.dat file.
 
     Args:
         ydata: input array
         spills: number of spill events
+        out: optional preallocated float array (same shape as ydata) to write the result to
 
     Returns:
-        Normalised array
+        Normalised array (out, if given)
 
     Raises:
         ValueError:  If spills is empty (not loaded)
     """
-    return ydata / spills * pow(10, 5)
+    out = np.divide(ydata, spills, out=out)
+    out *= pow(10, 5)
+    return out
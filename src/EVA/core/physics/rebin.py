@@ -7,28 +7,34 @@ def numpy_rebin(
     """
     Rebins pre-binned data using numpy's histogram() function. Will use linear interpolation if bin rate is less than 1.
 
+    The counts in each input bin are placed at the input bin centre and histogrammed as weights, so the run time only
+    depends on the number of bins, not on the number of counts. Fractional counts (e.g. normalised data) are kept.
+    Bins with negative counts are ignored.
+
     Args:
         x0: input x-data
         y0: input y-data
         bin_size: bin size, must be positive.
-        bin_range: tuple specifying min and max range for binning. If none, full range of x_0 used for range.
+        bin_range: tuple specifying min and max range for binning. If none, range of x0 where y0 > 0 used for range.
     Returns:
         Rebinned data using numpy's 'histogram' function. If binning rate is greater than 1, the data will be rebinned
         according to numpy's 'histogram()'. If binning rate is less than 1, bin positions will be calculated from
         numpy's 'histogram()', while the counts will be linearly interpolated using numpy's 'interp()' to increase
         the number of datapoints.
     """
-
-    # un-histogram the data to re-bin it with numpy
-    energies = np.array(
-        [x_val for i, x_val in enumerate(x0) for _ in range(int(y0[i]))]
-    )
+    x0 = np.asarray(x0)
+    weights = np.clip(np.asarray(y0, dtype=float), 0, None)
 
     n_init = len(x0)
     n_bins = int(n_init / bin_size)
 
+    # default to range of bins containing counts, as np.histogram() does for unweighted data
+    if bin_range is None:
+        filled = x0[weights > 0]
+        bin_range = (filled.min(), filled.max()) if filled.size else (0, 1)
+
     # get the histogram (y-values) and bin edges (x-values) which are of size len(hist) + 1
-    hist, bin_edges = np.histogram(energies, n_bins, range=bin_range)
+    hist, bin_edges = np.histogram(x0, n_bins, range=bin_range, weights=weights)
 
     hist = hist / bin_size
 
@@ -42,6 +48,53 @@ def numpy_rebin(
     return bin_centres, hist
 
 
+def overlap_rebin(
+    x0: np.ndarray, y0: np.ndarray, bin_edges: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Rebins pre-binned data onto arbitrary bin edges by splitting the counts in each input bin between the output bins
+    it overlaps, in proportion to the overlap. Unlike ``numpy_rebin()``, which places all counts of an input bin at its
+    centre, this does not produce aliasing artefacts when the output bin width is not a whole multiple of the input
+    bin width. Total counts inside the output range are conserved.
+
+    Args:
+        x0: input x-data (bin centres, in ascending order)
+        y0: input y-data (counts per bin)
+        bin_edges: output bin edges, in ascending order
+
+    Returns:
+        Output bin centres and counts in each output bin.
+    """
+    x0 = np.asarray(x0, dtype=float)
+    y0 = np.asarray(y0, dtype=float)
+    bin_edges = np.asarray(bin_edges, dtype=float)
+
+    bin_centres = (bin_edges[1:] + bin_edges[:-1]) / 2
+
+    if len(x0) == 0:
+        return bin_centres, np.zeros(len(bin_centres))
+
+    # input bin edges halfway between bin centres, first and last bins are assumed symmetric about their centres
+    if len(x0) > 1:
+        midpoints = (x0[1:] + x0[:-1]) / 2
+        edges0 = np.concatenate(
+            (
+                [x0[0] - (midpoints[0] - x0[0])],
+                midpoints,
+                [x0[-1] + (x0[-1] - midpoints[-1])],
+            )
+        )
+    else:
+        edges0 = np.array([x0[0] - 0.5, x0[0] + 0.5])
+
+    # counts are spread uniformly across each input bin, so the cumulative counts are piecewise linear between input
+    # bin edges and the counts in any output bin follow from interpolating them at the output bin edges
+    cumulative = np.concatenate(([0], np.cumsum(y0)))
+    counts = np.diff(np.interp(bin_edges, edges0, cumulative))
+
+    return bin_centres, counts
+
+
 def nxs_rebin(x_data: np.ndarray, bin_num: int, bin_range: tuple[float, float] = None):
     """
     Rebin raw data into desired bin sizes.
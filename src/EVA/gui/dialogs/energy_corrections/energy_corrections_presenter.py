@@ -22,20 +22,49 @@ class EnergyCorrectionsPresenter:
 
     def populate_table(self):
         current_corrections = self.model.corrections
-        table_contents = [
-            [detector, *settings["e_corr_coeffs"]]
-            for detector, settings in current_corrections.items()
-        ]
+        table_contents = []
+        locked_rows = []
+
+        for row, (detector, settings) in enumerate(current_corrections.items()):
+            model = settings.get("e_corr_model", "polynomial")
+
+            # piecewise calibrations have no coefficients, e.g. when fitted with fit_calibration_to_lines()
+            coefficients = (
+                settings.get("e_corr_coeffs", ()) if model == "polynomial" else ()
+            )
+
+            if len(coefficients) == 2:
+                table_contents.append([detector, *coefficients])
+            else:
+                # only linear corrections can be edited in the table - others are kept as they are
+                table_contents.append(
+                    [detector, self.describe_calibration(settings), "-"]
+                )
+                locked_rows.append(row)
+
         use_corrections = [
             settings["use_e_corr"] for settings in current_corrections.values()
         ]
 
         self.view.correction_table.update_contents(table_contents)
         self.view.setup_table_checkboxes(use_corrections)
+        self.view.lock_rows(locked_rows)
+
+    @staticmethod
+    def describe_calibration(settings: dict) -> str:
+        if settings.get("e_corr_model", "polynomial") == "piecewise":
+            return f"Piecewise ({len(settings['e_corr_points'])} points)"
+        return f"Polynomial (degree {len(settings.get('e_corr_coeffs', ())) - 1})"
 
     def on_apply(self):
         try:
-            self.model.corrections = self.view.get_energy_correction_selections()
+            selections = self.view.get_energy_correction_selections()
+
+            # keep settings which are not in the table, e.g. non-linear calibrations
+            self.model.corrections = {
+                detector: {**self.model.corrections.get(detector, {}), **selection}
+                for detector, selection in selections.items()
+            }
             self.model.apply_corrections()
             self.view.energy_corrections_applied_s.emit(self.model.corrections)
 
@@ -1,4 +1,4 @@
-from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtCore import pyqtSignal, Qt
 from PyQt6.QtGui import QCloseEvent
 from PyQt6.QtWidgets import QDialog, QMessageBox, QCheckBox, QDialogButtonBox
 
@@ -16,6 +16,7 @@ class EnergyCorrectionsView(QDialog, Ui_Energycorrections):
         self.apply_button = self.buttonBox.button(QDialogButtonBox.StandardButton.Apply)
 
         self.checkboxes = []
+        self.locked_rows = set()
 
         self.correction_table.stretch_horizontal_header()
 
@@ -30,17 +31,32 @@ class EnergyCorrectionsView(QDialog, Ui_Energycorrections):
             self.correction_table.setCellWidget(row, col, checkbox)
             self.checkboxes.append(checkbox)
 
+    def lock_rows(self, rows: list[int]):
+        """Makes the coefficients in rows read-only, e.g. for calibrations which are not linear."""
+        self.locked_rows = set(rows)
+
+        for row in rows:
+            for col in (1, 2):
+                item = self.correction_table.item(row, col)
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+
     def get_energy_correction_selections(self):
         rows = self.correction_table.rowCount()
 
         result = {}
         for row in range(rows):
             detector = self.correction_table.item(row, 0).text()
+            apply = self.checkboxes[row].isChecked()
+
+            if row in self.locked_rows:
+                result[detector] = {"use_e_corr": apply}
+                continue
+
             gradient = float(self.correction_table.item(row, 1).text())
             offset = float(self.correction_table.item(row, 2).text())
-            apply = self.checkboxes[row].isChecked()
 
             result[detector] = {
+                "e_corr_model": "polynomial",
                 "e_corr_coeffs": (gradient, offset),
                 "use_e_corr": apply,
             }
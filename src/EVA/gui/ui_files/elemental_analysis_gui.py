@@ -711,7 +711,7 @@ class Ui_elemental_analysis(object):
         item.setText(_translate("elemental_analysis", "Detector"))
         item = self.peakfind_results_table.horizontalHeaderItem(1)
         item.setText(
-            _translate("elemental_analysis", "Most frequently detected elements")
+            _translate("elemental_analysis", "Most likely elements (confidence)")
         )
         self.label_2.setText(_translate("elemental_analysis", "Detailed report"))
         self.peakfind_results_tree.headerItem().setText(
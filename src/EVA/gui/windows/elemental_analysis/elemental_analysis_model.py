@@ -5,10 +5,11 @@ import numpy as np
 from PyQt6.QtCore import QObject
 from matplotlib import pyplot as plt
 
-from EVA.core.data_searching import get_match, sort_match
+from EVA.core.data_searching import element_scoring, get_match
 from EVA.core.data_structures.run import Run
 from EVA.core.peak_finding import find_peaks
 from EVA.core.app import get_config
+from EVA.core.context import EvaContext, get_context
 from EVA.core.plot.plotting import plot_run, Plot_Peak_Location, replot_run
 
 logger = logging.getLogger(__name__)
@@ -17,14 +18,16 @@ logger = logging.getLogger(__name__)
 class ElementalAnalysisModel(QObject):
     """Model to handle the logic in the elemental analysis window"""
 
-    def __init__(self, run: Run):
+    def __init__(self, run: Run, context: EvaContext | None = None):
         """
         Args:
             run: run number to load data for
+            context: context to search the databases of, defaults to ``get_context()``
         """
 
         super().__init__()
         self.run = run
+        self.context = context or get_context()
 
         self.mu_xray_search_width = 2
         self.gamma_search_width = 0.5
@@ -33,14 +36,18 @@ class ElementalAnalysisModel(QObject):
         self.default_threshold = 15
         self.default_distance = 1
 
-        self.peakfind_functions = [
-            "SciPy find_peaks()",
-            "SciPy find_peaks() w/ background filter",
-        ]
-        self.peakfind_selected_function = self.peakfind_functions[1]
+        # peak finding methods, with the background estimator each uses (None to not remove the background)
+        self.peakfind_functions = {
+            "SciPy find_peaks()": None,
+            "SciPy find_peaks() w/ background filter": "mean filter",
+            "SciPy find_peaks() w/ SNIP background": "snip",
+            "SciPy find_peaks() w/ rolling ball background": "rolling ball",
+        }
+        self.peakfind_selected_function = "SciPy find_peaks() w/ background filter"
 
         self.peakfind_result = []
         self.peakfind_simplified_result = []
+        self.element_scores = {}
 
         self.plotted_gamma_lines = {}
         self.plotted_mu_xray_lines = {}
@@ -95,7 +102,7 @@ class ElementalAnalysisModel(QObject):
         if name in self.plotted_gamma_lines.keys():
             return  # skip if element has already been plotted
 
-        res = get_match.search_gammas_single_isotope(isotope)
+        res = get_match.search_gammas_single_isotope(isotope, context=self.context)
 
         next_colour = (
             self.axs[0]._get_lines.get_next_color()
@@ -139,7 +146,9 @@ class ElementalAnalysisModel(QObject):
         if name in self.plotted_gamma_lines.keys():
             return  # ignore if it's already been plotted
 
-        res = get_match.search_gammas_single_transition(isotope, energy)
+        res = get_match.search_gammas_single_transition(
+            isotope, energy, context=self.context
+        )
         for match in res:
             rowres = [
                 match["isotope"],
@@ -172,7 +181,7 @@ class ElementalAnalysisModel(QObject):
         if name in self.plotted_mu_xray_lines.keys():
             return None  # ignore if it's already been plotted
 
-        res = get_match.search_muxrays_single_element(element)
+        res = get_match.search_muxrays_single_element(element, context=self.context)
 
         energies = [
             float([match["element"], match["energy"], match["transition"]][1])
@@ -206,7 +215,9 @@ class ElementalAnalysisModel(QObject):
         if name in self.plotted_mu_xray_lines.keys():
             return None  # ignore if it's already been plotted
 
-        res = get_match.search_muxrays_single_transition(element, transition)
+        res = get_match.search_muxrays_single_transition(
+            element, transition, context=self.context
+        )
         next_colour = self.axs[0]._get_lines.get_next_color()
 
         for match in res:
@@ -320,7 +331,7 @@ class ElementalAnalysisModel(QObject):
 
         input_data = list(zip(default_peaks, default_sigma))
 
-        return get_match.search_gammas(input_data)
+        return get_match.search_gammas(input_data, context=self.context)
 
     def search_mu_xrays(self, x: float) -> tuple[list[dict], list[dict], list[dict]]:
         """
@@ -336,7 +347,7 @@ class ElementalAnalysisModel(QObject):
         default_sigma = [self.mu_xray_search_width] * len(default_peaks)
 
         input_data = list(zip(default_peaks, default_sigma))
-        return get_match.search_muxrays(input_data)
+        return get_match.search_muxrays(input_data, context=self.context)
 
     def find_peaks(self):
         """
@@ -353,75 +364,75 @@ class ElementalAnalysisModel(QObject):
         )
 
         # get selected function
-        if (
-            self.peakfind_selected_function == self.peakfind_functions[0]
-        ):  # scipy version
-            func = find_peaks.findpeaks
-        elif (
-            self.peakfind_selected_function == self.peakfind_functions[1]
-        ):  # custom function
-            func = find_peaks.findpeak_with_bck_removed
-        else:
+        if self.peakfind_selected_function not in self.peakfind_functions:
             raise ValueError("Invalid peak find method specified!")
+        background = self.peakfind_functions[self.peakfind_selected_function]
 
         i = 0
 
         peakfind_res = {}
         result_simplified = []
+        element_scores = {}
         config = get_config()
         show_plot = config.get_run_save(
             config["general"]["working_directory"], self.run.run_num
         )["show_plot"]
-        for dataset in self.run.data.values():
-            # only find peaks in data which is plotted
-
-            if show_plot[dataset.detector]:
-                peakfind_res[dataset.detector] = {}
-                peaks, peaks_pos = func(
-                    dataset.x,
-                    dataset.y,
-                    self.default_height,
-                    self.default_threshold,
-                    self.default_distance,
-                )
 
-                peak_indices = peaks[0]
-                peak_positions = dataset.x[peak_indices]
-
-                # search first once to get all transitions
-                default_peaks = peak_positions
-                default_sigma = [1] * len(default_peaks)
-                input_data = list(zip(default_peaks, default_sigma))
-                (
-                    res_all,
-                    _,
-                    _,
-                ) = get_match.search_muxrays(input_data)
-
-                out = sort_match.sort_match(res_all)
-                result_simplified.append(
-                    [dataset.detector, str(dict(list(out.items())))]
-                )
+        # only find peaks in data which is plotted - all detectors are done in one go
+        datasets = [
+            dataset for dataset in self.run.data.values() if show_plot[dataset.detector]
+        ]
+        all_peaks = find_peaks.find_peaks_in_spectra(
+            [(dataset.x, dataset.y) for dataset in datasets],
+            self.default_height,
+            self.default_threshold,
+            self.default_distance,
+            background,
+        )
+
+        for dataset, (peaks, peaks_pos) in zip(datasets, all_peaks):
+            peakfind_res[dataset.detector] = {}
+
+            peak_indices = peaks[0]
+            peak_positions = dataset.x[peak_indices]
+
+            # search once for all peaks to get all transitions
+            default_peaks = peak_positions
+            default_sigma = [1] * len(default_peaks)
+            input_data = list(zip(default_peaks, default_sigma))
+            (
+                res_all,
+                _,
+                _,
+            ) = get_match.search_muxrays(input_data, context=self.context)
+
+            # score every element against all peaks of the detector at once
+            scores = element_scoring.score_elements(
+                peak_positions,
+                peaks[1].get("peak_heights"),
+                dataset.detector,
+                (dataset.x[0], dataset.x[-1]),
+                context=self.context,
+            )
+            element_scores[dataset.detector] = scores
+            result_simplified.append(
+                [dataset.detector, str(element_scoring.summarise_scores(scores))]
+            )
 
-                # search then for each peak
-                for peak in peak_positions:
-                    default_peaks = [peak]
+            # then split the matches by peak (matches stay sorted by diff within each peak)
+            for peak in peak_positions:
+                peakfind_res[dataset.detector][peak] = []
 
-                    default_sigma = [1] * len(default_peaks)
-                    input_data = list(zip(default_peaks, default_sigma))
-                    (
-                        res_all,
-                        _,
-                        _,
-                    ) = get_match.search_muxrays(input_data)
-                    peakfind_res[dataset.detector][peak] = res_all
+            for match in res_all:
+                peakfind_res[dataset.detector][match["peak_centre"]].append(match)
 
-                Plot_Peak_Location(self.axs[i], dataset.x, dataset.y, peak_indices)
+            Plot_Peak_Location(self.axs[i], dataset.x, dataset.y, peak_indices)
 
-                i += 1
+            i += 1
 
         self.peakfind_result = peakfind_res
         self.peakfind_simplified_result = result_simplified
+        self.element_scores = element_scores
 
     def remove_plot_markers(self):
         """
@@ -54,7 +54,7 @@ class ElementalAnalysisPresenter(object):
         self.view.height_line_edit.setText(str(self.model.default_height))
         self.view.threshold_line_edit.setText(str(self.model.default_threshold))
         self.view.distance_line_edit.setText(str(self.model.default_distance))
-        self.view.routine_select_combo.addItems(self.model.peakfind_functions)
+        self.view.routine_select_combo.addItems(list(self.model.peakfind_functions))
         self.view.routine_select_combo.setCurrentText(
             self.model.peakfind_selected_function
         )
@@ -467,6 +467,7 @@ class ElementalAnalysisPresenter(object):
         self.model.remove_plot_markers()
         self.model.peakfind_result = []
         self.model.peakfind_simplified_result = []
+        self.model.element_scores = {}
 
         self.view.peakfind_results_tree.clear()
         self.view.peakfind_results_table.setRowCount(0)
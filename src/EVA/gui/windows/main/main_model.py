@@ -2,40 +2,201 @@ import logging
 from PyQt6.QtCore import QObject
 
 from EVA.core.app import get_config, get_app
-from EVA.core.data_loading import load_data
+from EVA.core.context import EvaContext, get_context
+from EVA.core.data_loading import batch_load, load_data
+from EVA.core.data_loading.run_cache import (
+    RunCache,
+    make_run_key,
+    DEFAULT_RUN_CACHE_MEMORY_MB,
+)
 
 logger = logging.getLogger(__name__)
 
 
 class MainModel(QObject):
-    def __init__(self):
+    def __init__(self, context: EvaContext | None = None):
         super().__init__()
+        self.context = context or get_context()
         self.run = None
+        self.cancel_load = False
 
-    def load_run(self, run_num):
-        config = get_config()
+        # runs which have been prefetched but not yet opened in a workspace, and the raw data of runs which have
+        # been opened, so they can be opened again without reading their files
+        memory_mb = self.context.config["general"].get(
+            "run_cache_memory_mb", DEFAULT_RUN_CACHE_MEMORY_MB
+        )
+        self.run_cache = RunCache(max_bytes=int(memory_mb * 1024**2))
 
-        # create new record for the run if it has never been loaded before
+    def load_run(self, run_num):
+        """
+        Loads a run on the calling thread.
+
+        Args:
+            run_num: run number to load
+
+        Returns:
+            Tuple of (flags, run), see ``load_data.load_run()``.
+        """
+        result = self.read_run(run_num, self.get_load_settings(run_num))
+        return self.set_loaded_run(run_num, result["run"], result["flags"])
+
+    def get_load_settings(self, run_num, create_record: bool = True) -> dict:
+        """
+        Gets the settings to load a run with from the config. Must be called on the gui thread, as a new record is
+        added to the config for runs which have never been loaded before.
+
+        Args:
+            run_num: run number to load
+            create_record: whether to add a record to the config if the run has never been loaded before. If False,
+                the default corrections are used for new runs without changing the config, e.g. for prefetching.
+
+        Returns:
+            Dict of keyword arguments for ``load_data.load_run()``.
+        """
+        config = self.context.config
         working_directory = config["general"]["working_directory"]
-        corrections = config.get_run_save(working_directory, run_num)
-        energy_corrections = corrections["detector_specific"]
-        normalisation = corrections["normalisation"]
-        binning = corrections["binning"]
-        plot_mode = corrections["plot_mode"]
-        prompt_limit = corrections["prompt_limit"]
-        delayed_limit = corrections["delayed_limit"]
-
-        run, flags = load_data.load_run(
-            run_num,
-            working_directory,
-            energy_corrections,
-            normalisation,
-            binning,
-            plot_mode,
-            prompt_limit,
-            delayed_limit,
+
+        if create_record:
+            # create new record for the run if it has never been loaded before
+            corrections = config.get_run_save(working_directory, run_num)
+        else:
+            saved = config["saved_corrections"].get(working_directory, {})
+            corrections = saved.get(run_num, config["default_corrections"])
+
+        return load_data.get_load_settings(
+            corrections, working_directory, context=self.context
         )
 
+    def read_run(self, run_num, settings: dict, progress_callback=None) -> dict:
+        """
+        Reads a run from file, or takes it from the run cache if it has been prefetched. Can be run on a worker
+        thread, in which case the loaded run is moved to the gui thread before being returned. Loading stops early if
+        cancel_load is set to True.
+
+        Args:
+            run_num: run number to load
+            settings: settings to load run with, from ``get_load_settings()``
+            progress_callback: optional signal to report loading progress to, see ``load_data.LoadProgress``
+
+        Returns:
+            Dict with key "status" - "cancelled" if loading was cancelled, otherwise "done", in which case the loaded
+            run and flags are stored under "run" and "flags".
+        """
+        # the run may be being prefetched already - wait for it rather than reading the file twice
+        if not self.run_cache.wait(
+            make_run_key(run_num, settings), is_cancelled=lambda: self.cancel_load
+        ):
+            logger.info("Loading of run %s was cancelled.", run_num)
+            self.cancel_load = False
+            return {"status": "cancelled"}
+
+        cached = self.take_cached_run(run_num, settings)
+        if cached is not None:
+            self.cancel_load = False
+            return cached
+
+        try:
+            run, flags = load_data.load_run(
+                run_num,
+                progress_callback=progress_callback,
+                is_cancelled=lambda: self.cancel_load,
+                **settings,
+            )
+        except load_data.LoadCancelled:
+            logger.info("Loading of run %s was cancelled.", run_num)
+            return {"status": "cancelled"}
+        finally:
+            self.cancel_load = False
+
+        if not flags.get("no_files_found"):
+            self.run_cache.put(
+                make_run_key(run_num, settings), batch_load.get_run_arrays(run), flags
+            )
+
+        self.move_to_gui_thread(run)
+        return {"status": "done", "run": run, "flags": flags}
+
+    @staticmethod
+    def move_to_gui_thread(run):
+        """QObjects belong to the thread which created them - hands a run created on a worker thread to the gui."""
+        app = get_app()
+        if app is not None:
+            run.moveToThread(app.thread())
+
+    def take_cached_run(self, run_num, settings: dict) -> dict | None:
+        """
+        Takes a run out of the run cache, if it has been loaded with the same settings before. A prefetched run is
+        handed over as it is, as the workspace it is opened in can change its corrections, and only its raw data is
+        kept in the cache. Runs which have only their raw data cached are built again from it without reading their
+        files.
+
+        Args:
+            run_num: run number to load
+            settings: settings to load run with, from ``get_load_settings()``
+
+        Returns:
+            Result dict as returned by ``read_run()``, or None if the run is not cached.
+        """
+        key = make_run_key(run_num, settings)
+        cached = self.run_cache.get(key)
+        if cached is None:
+            return None
+
+        logger.info("Using cached data for run %s.", run_num)
+        run, flags = cached
+
+        if isinstance(run, dict):
+            run, flags = load_data.load_run(run_num, preloaded=run, **settings)
+            self.move_to_gui_thread(run)
+        else:
+            self.run_cache.put(key, batch_load.get_run_arrays(run), flags)
+
+        return {"status": "done", "run": run, "flags": flags}
+
+    def prefetch_run(self, run_num, settings: dict, progress_callback=None):
+        """
+        Loads a run into the run cache ahead of it being requested, e.g. the runs either side of the current run.
+        Meant to be run on a worker thread. Runs which are cached, already being loaded or not found are skipped.
+
+        Args:
+            run_num: run number to load
+            settings: settings to load run with, from ``get_load_settings(run_num, create_record=False)``
+            progress_callback: unused, passed in by Worker
+        """
+        key = make_run_key(run_num, settings)
+        if not self.run_cache.claim(key):
+            return
+
+        try:
+            run, flags = load_data.load_run(run_num, **settings)
+
+            if flags.get("no_files_found"):
+                return
+
+            self.move_to_gui_thread(run)
+            self.run_cache.put(key, run, flags)
+            logger.debug("Prefetched run %s.", run_num)
+
+        # prefetching is speculative - never report errors to the user
+        except Exception as e:
+            logger.debug("Failed to prefetch run %s: %s", run_num, e)
+
+        finally:
+            self.run_cache.release(key)
+
+    def set_loaded_run(self, run_num, run, flags: dict):
+        """
+        Stores a newly read run and logs any issues found when loading it. Must be called on the gui thread.
+
+        Args:
+            run_num: run number which was loaded
+            run: loaded run
+            flags: error flags from ``load_data.load_run()``
+
+        Returns:
+            Tuple of (flags, run), where run is None if no files were found.
+        """
+        config = get_config()
         all_detectors = config["general"]["enabled_detectors"]
 
         if flags["no_files_found"]:  # no data was loaded - return now
@@ -1,6 +1,6 @@
 import logging
 
-from EVA.core.app import get_config
+from EVA.core.app import get_config, get_app
 from EVA.core.data_structures.run import Run
 from EVA.gui.dialogs.general_settings.settings_dialog import SettingsDialog
 from EVA.gui.windows.main.main_model import MainModel
@@ -16,6 +16,7 @@ from EVA.gui.windows.periodic_table.periodic_table_widget import PeriodicTableWi
 from EVA.gui.windows.srim.trim_window import TrimWindow
 from EVA.gui.windows.workspace.workspace_window import WorkspaceWindow
 from EVA.util.path_handler import get_path
+from EVA.util.worker import Worker
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,7 @@ class MainPresenter:
         """
         self.view = view
         self.model = model
+        self.load_worker = None
 
         self.view.set_run_num_line_edit(get_config()["general"]["default_run_num"])
 
@@ -58,6 +60,7 @@ class MainPresenter:
             lambda: self.decrement_run_num(load=True)
         )
         self.view.load_button.clicked.connect(self.load_run_num)
+        self.view.cancel_load_button.clicked.connect(self.cancel_load)
 
     def save_settings(self):
         """
@@ -146,15 +149,90 @@ class MainPresenter:
 
     def load_run_num(self):
         """
-        Loads current run number and launched workspace.
+        Starts loading the current run number on a worker thread, so that the gui stays responsive while large
+        files are read. The workspace is opened by on_run_loaded() once loading has finished.
         """
+        if self.load_worker is not None:  # only load one run at a time
+            return
+
         try:
             run_num = self.view.get_run_num_line_edit()
         except (ValueError, AttributeError):
             self.view.show_error_box("Invalid run number!")
             return
 
-        flags, run = self.model.load_run(run_num)
+        # config must only be accessed from the gui thread
+        settings = self.model.get_load_settings(run_num)
+
+        # open straight away if the run has been prefetched
+        cached = self.model.take_cached_run(run_num, settings)
+        if cached is not None:
+            self.on_run_loaded(run_num, cached)
+            return
+
+        # a cancel clicked after the previous load had finished must not cancel this one
+        self.model.cancel_load = False
+        self.view.set_loading(True)
+        self.view.set_load_progress(f"Loading run {run_num}", 0, 1)
+
+        self.load_worker = Worker(self.model.read_run, run_num, settings)
+        self.load_worker.signals.progress.connect(self.on_load_progress)
+        self.load_worker.signals.result.connect(
+            lambda result: self.on_run_loaded(run_num, result)
+        )
+        self.load_worker.signals.error.connect(
+            lambda error: self.on_load_error(run_num, error)
+        )
+        self.load_worker.signals.finished.connect(self.on_load_finished)
+
+        get_app().threadpool.start(self.load_worker)
+
+    def cancel_load(self):
+        """Asks the run currently being loaded to stop loading."""
+        self.model.cancel_load = True
+        self.view.cancel_load_button.setEnabled(False)
+        self.view.set_load_progress("Cancelling...", 0, 1)
+
+    def on_load_progress(self, progress: dict):
+        """
+        Updates the loading progress bar. Is called every time the load worker emits a progress signal.
+
+        Args:
+            progress: dict with keys 'stage' - description of loading stage, 'current' - progress within stage,
+                'total' - total progress of stage
+        """
+        if self.model.cancel_load:
+            return
+
+        self.view.set_load_progress(
+            progress["stage"], progress["current"], progress["total"]
+        )
+
+    def on_load_error(self, run_num, error: tuple):
+        _, value, _ = error
+        logger.error("Failed to load run %s: %s", run_num, value)
+        self.view.show_error_box(f"Failed to load run {run_num}:\n{value}")
+
+    def on_load_finished(self):
+        self.load_worker = None
+        self.view.set_loading(False)
+        self.view.cancel_load_button.setEnabled(False)
+
+    def on_run_loaded(self, run_num, result: dict):
+        """
+        Updates the gui with the metadata of a newly loaded run and opens a workspace for it.
+
+        Args:
+            run_num: run number which was loaded
+            result: result of ``MainModel.read_run()``
+        """
+        # the run has been read, so there is nothing left to cancel
+        self.view.cancel_load_button.setEnabled(False)
+
+        if result["status"] == "cancelled":
+            return
+
+        flags, run = self.model.set_loaded_run(run_num, result["run"], result["flags"])
 
         if flags["no_files_found"]:  #  no data was loaded - return now
             # Update GUI
@@ -187,6 +265,29 @@ class MainPresenter:
         # open workspace
         self.open_workspace(run)
 
+        self.prefetch_neighbouring_runs(run_num)
+
+    def prefetch_neighbouring_runs(self, run_num):
+        """
+        Starts loading the runs before and after the given run into the run cache on worker threads, so that
+        stepping to them with the +1/-1 buttons is near-instant.
+
+        Args:
+            run_num: run number to prefetch the neighbours of
+        """
+        try:
+            run_num = int(run_num)
+        except ValueError:
+            return
+
+        for neighbour in [run_num + 1, run_num - 1]:
+            if neighbour < 0:
+                continue
+
+            settings = self.model.get_load_settings(str(neighbour), create_record=False)
+            worker = Worker(self.model.prefetch_run, str(neighbour), settings)
+            get_app().threadpool.start(worker)
+
     def open_workspace(self, run: Run):
         """Opens a new workspace for the loaded run."""
         logger.info("Opening workspace.")
@@ -14,6 +14,7 @@ from PyQt6.QtWidgets import (
     QSizePolicy,
     QMainWindow,
     QApplication,
+    QProgressBar,
 )
 
 from EVA.core.app import get_config
@@ -55,7 +56,7 @@ class MainView(QMainWindow):
     def init_gui(self):
         # Set up action bar items
         self.setWindowTitle("EVA")
-        self.setFixedSize(QSize(650, 300))
+        self.setFixedSize(QSize(650, 330))
 
         self.bar = self.menuBar()
         self.file_menu = self.bar.addMenu("File")
@@ -154,6 +155,12 @@ class MainView(QMainWindow):
             QSizePolicy.Policy.MinimumExpanding, QSizePolicy.Policy.MinimumExpanding
         )
 
+        # progress of run being loaded, only shown while loading
+        self.load_progress_label = QLabel(self)
+        self.load_progress_bar = QProgressBar(self)
+        self.cancel_load_button = QPushButton(self)
+        self.cancel_load_button.setText("Cancel")
+
         self.layout.addWidget(self.run_number_label, 0, 0, 1, 3)
         self.layout.addWidget(self.comment_label, 1, 0, 1, 3)
         self.layout.addWidget(self.events_label, 2, 0, 1, 3)
@@ -166,6 +173,11 @@ class MainView(QMainWindow):
         self.layout.addWidget(self.get_prev_run_button, 5, 0)
         self.layout.addWidget(self.load_prev_run_button, 6, 0)
         self.layout.addWidget(self.load_button, 6, 1)
+        self.layout.addWidget(self.load_progress_label, 7, 0)
+        self.layout.addWidget(self.load_progress_bar, 7, 1)
+        self.layout.addWidget(self.cancel_load_button, 7, 2)
+
+        self.set_loading(False)
 
         self.setCentralWidget(self.container)
 
@@ -184,6 +196,33 @@ class MainView(QMainWindow):
         self.start_label.setText(f"Start Time\t{start} ")
         self.end_label.setText(f"End Time\t{end} ")
 
+    def set_loading(self, loading: bool):
+        """
+        Shows or hides the run loading progress bar. Load buttons are disabled while a run is loading.
+
+        Args:
+            loading: whether a run is being loaded
+        """
+        for button in [
+            self.load_button,
+            self.load_next_run_button,
+            self.load_prev_run_button,
+        ]:
+            button.setEnabled(not loading)
+
+        self.load_progress_label.setVisible(loading)
+        self.load_progress_bar.setVisible(loading)
+        self.cancel_load_button.setVisible(loading)
+        self.cancel_load_button.setEnabled(True)
+
+        self.load_progress_label.setText("")
+        self.load_progress_bar.setValue(0)
+
+    def set_load_progress(self, stage: str, current: int, total: int):
+        self.load_progress_label.setText(stage)
+        self.load_progress_bar.setMaximum(max(total, 1))
+        self.load_progress_bar.setValue(current)
+
     def get_dir(self):
         return QFileDialog.getExistingDirectory(self, "Choose Directory", "C:\\")
 
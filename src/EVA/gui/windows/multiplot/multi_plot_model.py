@@ -1,16 +1,19 @@
 import matplotlib.pyplot as plt
 
-from EVA.core.app import get_config
-from EVA.core.data_loading import load_data
-from EVA.core.data_structures.run import Run, normalisation_types
+from EVA.core.app import get_config, get_app
+from EVA.core.data_loading import load_data, batch_load
 from EVA.core.plot.plotting import get_ylabel
 
 
 class MultiPlotModel:
-    def _init__(self):
+    def __init__(self):
         self.fig, self.ax = None, None
         self.offset = 1
         self.loaded_runs = []
+        self.cancel_load = False
+
+        # detectors of the figure runs are drawn in while they are loaded
+        self.incremental_detectors = []
 
     @staticmethod
     def multi_plot(runs, offset, plot_detectors):
@@ -26,21 +29,9 @@ class MultiPlotModel:
             if plot_detectors[detector_data[0].detector]
         ]
 
-        numplots = len(data)
-
-        if numplots > 1:
-            fig, axs = plt.subplots(nrows=numplots, figsize=(16, 7))
-
-        else:
-            # annoying matplotlib fix for one figure in a subplot
-            fig, temp = plt.subplots(nrows=1, figsize=(16, 7), squeeze=False)
-            axs = [temp[0][0]]
-
-        # labels figures
-        fig.suptitle(f"{runs[0].plot_mode} - MultiPlot")
-        fig.supxlabel("Energy (keV)")
-
-        fig.supylabel(get_ylabel(runs[0].normalisation))
+        fig, axs = MultiPlotModel.create_figure(
+            len(data), runs[0].plot_mode, runs[0].normalisation
+        )
 
         # loop through each detector
         for i, detector_data in enumerate(data):
@@ -67,11 +58,85 @@ class MultiPlotModel:
             axs[i].legend()
             # axs[i].legend(loc="center left", bbox_to_anchor=(1, 0.5))
 
+        return fig, axs
+
+    @staticmethod
+    def create_figure(numplots, plot_mode, normalisation):
+        """
+        Creates an empty multiplot figure.
+
+        Args:
+            numplots: number of subplots (one per detector)
+            plot_mode: plot mode of runs, shown in title
+            normalisation: normalisation of runs, used for y label
+
+        Returns:
+            Figure and list of axes.
+        """
+        if numplots > 1:
+            fig, axs = plt.subplots(nrows=numplots, figsize=(16, 7))
+
+        else:
+            # annoying matplotlib fix for one figure in a subplot
+            fig, temp = plt.subplots(nrows=1, figsize=(16, 7), squeeze=False)
+            axs = [temp[0][0]]
+
+        # labels figures
+        fig.suptitle(f"{plot_mode} - MultiPlot")
+        fig.supxlabel("Energy (keV)")
+
+        fig.supylabel(get_ylabel(normalisation))
+
         plt.subplots_adjust(
             top=0.9, bottom=0.1, left=0.1, right=0.9, hspace=0.45, wspace=0.23
         )
         return fig, axs
 
+    def start_incremental_plot(self, run, plot_detectors):
+        """
+        Creates the figure runs are drawn in one by one while they are being loaded, see ``add_run_to_plot()``.
+
+        Args:
+            run: first run loaded, used to get detectors, plot mode and normalisation
+            plot_detectors: dict of {detector: whether to plot detector}
+        """
+        self.incremental_detectors = [
+            detector for detector in run.data if plot_detectors.get(detector, False)
+        ]
+        self.fig, self.axs = self.create_figure(
+            len(self.incremental_detectors), run.plot_mode, run.normalisation
+        )
+
+        for ax, detector in zip(self.axs, self.incremental_detectors):
+            ax.set_title(detector)
+
+    def add_run_to_plot(self, run, position: int, offset: float):
+        """
+        Draws a newly loaded run in the figure created by ``start_incremental_plot()``. Runs are offset by their
+        position in the run list, so they are drawn in the same place whichever order they finish loading in.
+
+        Args:
+            run: loaded run
+            position: position of run in run list
+            offset: y offset between consecutive runs
+        """
+        for ax, detector in zip(self.axs, self.incremental_detectors):
+            dataset = run.data.get(detector)
+            if dataset is None or dataset.x.size == 0:
+                continue
+
+            ax.step(
+                dataset.x,
+                dataset.y + position * offset,
+                where="mid",
+                label=dataset.run_number,
+            )
+            ax.relim()
+            ax.autoscale_view()
+            ax.set_ylim(0.0)
+            ax.set_xlim(0.0)
+            ax.legend()
+
     @staticmethod
     def GenReadList(line):
         # decodes the Table
@@ -95,31 +160,75 @@ class MultiPlotModel:
                             RunList.append(str(j))
         return RunList
 
-    @staticmethod
-    def load_multirun(run_list):
-        config = get_config()
-        working_directory = config["general"]["working_directory"]
-        corrections = config["default_corrections"]
-        energy_corrections = corrections["detector_specific"]
-        normalisation = corrections["normalisation"]
-        binning = corrections["binning"]
-        plot_mode = corrections["plot_mode"]
-        prompt_limit = corrections["prompt_limit"]
-        delayed_limit = corrections["delayed_limit"]
-
-        result = [
-            load_data.load_run(
-                run_num,
-                working_directory,
-                energy_corrections,
-                normalisation,
-                binning,
-                plot_mode,
-                prompt_limit,
-                delayed_limit,
+    def read_multirun(self, run_list, progress_callback=None) -> dict:
+        """
+        Loads a list of runs. Meant to be run on a worker thread - see ``load_multirun()``. Loading stops early if
+        cancel_load is set to True.
+
+        Args:
+            run_list: list of run numbers to load
+            progress_callback: optional signal to report progress to, see ``load_multirun()``
+
+        Returns:
+            Dict with key "status" - "cancelled" if loading was cancelled, otherwise "done", in which case the result
+            of ``load_multirun()`` is stored under "runs".
+        """
+        try:
+            runs = self.load_multirun(
+                run_list,
+                progress_callback=progress_callback,
+                is_cancelled=lambda: self.cancel_load,
             )
-            for run_num in run_list
-        ]
+        except load_data.LoadCancelled:
+            return {"status": "cancelled"}
+        finally:
+            self.cancel_load = False
+
+        return {"status": "done", "runs": runs}
+
+    @staticmethod
+    def load_multirun(
+        run_list, progress_callback=None, is_cancelled=None, context=None
+    ):
+        """
+        Loads a list of runs with the default corrections, in parallel for long lists (see
+        ``batch_load.iter_load_runs()``). Each run is moved to the gui thread as soon as it has been loaded.
+
+        Args:
+            run_list: list of run numbers to load
+            progress_callback: optional signal to report each loaded run to, as {"stage": str, "current": number of
+                runs loaded, "total": number of runs, "index": position of run in run_list, "run": Run, "flags": dict}
+            is_cancelled: optional function returning True if loading should stop
+            context: context to take the default corrections from, defaults to ``get_context()``
+
+        Returns:
+            Tuple of (good runs, runs with no files found, runs where normalisation failed), in run_list order.
+        """
+        settings = load_data.get_load_settings(context=context)
+
+        app = get_app()
+        result = [None] * len(run_list)
+
+        for n, (i, run, flags) in enumerate(
+            batch_load.iter_load_runs(run_list, settings, is_cancelled=is_cancelled)
+        ):
+            # QObjects belong to the thread which created them - hand the run over to the gui thread
+            if app is not None:
+                run.moveToThread(app.thread())
+
+            result[i] = (run, flags)
+
+            if progress_callback is not None:
+                progress_callback.emit(
+                    {
+                        "stage": f"Loaded run {run_list[i]}",
+                        "current": n + 1,
+                        "total": len(run_list),
+                        "index": i,
+                        "run": run,
+                        "flags": flags,
+                    }
+                )
 
         runs, flags = list(zip(*result))
 
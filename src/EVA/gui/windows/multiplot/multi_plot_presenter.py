@@ -1,19 +1,33 @@
-from EVA.core.app import get_config
+import time
+from EVA.core.app import get_config, get_app
 from EVA.core.data_structures.run import normalisation_types
 import logging
 from EVA.gui.windows.multiplot.multi_plot_model import MultiPlotModel
 from EVA.gui.windows.multiplot.multi_plot_view import MultiPlotView
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QCheckBox
+from EVA.util.worker import Worker
 
 # from EVA.core.data_structures.multirun import MultiRun
 logger = logging.getLogger(__name__)
 
+# runs are only drawn while loading if loading takes longer than this, in seconds - redrawing the figure is slow, and
+# would hold up short loads
+INCREMENTAL_PLOT_DELAY = 1.0
+
+# minimum time between redraws of the figure while runs are loading, in seconds
+INCREMENTAL_REDRAW_INTERVAL = 1.0
+
 
 class MultiPlotPresenter:
     def __init__(self, view: MultiPlotView, model: MultiPlotModel):
         self.view = view
         self.model = model
+        self.load_worker = None
+        self.incremental_plot_started = False
+        self.incremental_runs = []
+        self.load_start_time = 0
+        self.last_redraw_time = 0
         self.populate_settings_panel()
         self.view.load_multi.clicked.connect(self.load_multirun)
         self.view.plot_multi.clicked.connect(self.start_multiplot)
@@ -36,6 +50,12 @@ class MultiPlotPresenter:
         self.view.plot.update_plot(self.model.fig, self.model.axs)
 
     def load_multirun(self):
+        # load button doubles as cancel button while runs are loading
+        if self.load_worker is not None:
+            self.model.cancel_load = True
+            self.view.load_multi.setText("Cancelling...")
+            return
+
         try:
             offset, table_data = self.view.get_form_data()
         except (ValueError, AttributeError):
@@ -52,7 +72,99 @@ class MultiPlotPresenter:
             )
             return
 
-        runs, empty_runs, norm_failed_runs = self.model.load_multirun(run_list)
+        # load runs on separate thread to keep the gui responsive
+        self.load_button_text = self.view.load_multi.text()
+        self.view.load_multi.setText("Cancel")
+
+        self.model.loaded_runs = []
+        self.incremental_plot_started = False
+        self.incremental_runs = []
+        self.load_start_time = time.monotonic()
+
+        self.load_worker = Worker(self.model.read_multirun, run_list)
+        self.load_worker.signals.progress.connect(
+            lambda progress: self.on_load_progress(progress, offset)
+        )
+        self.load_worker.signals.result.connect(
+            lambda result: self.on_multirun_loaded(result, offset)
+        )
+        self.load_worker.signals.error.connect(self.on_load_error)
+        self.load_worker.signals.finished.connect(self.on_load_finished)
+
+        get_app().threadpool.start(self.load_worker)
+
+    def on_load_progress(self, progress: dict, offset):
+        """
+        Is called every time a run has been loaded. Reports runs which failed to load and, if loading is taking a
+        while, draws the runs which loaded successfully, so that the plot fills in while the remaining runs are
+        loading. The figure is redrawn at most every INCREMENTAL_REDRAW_INTERVAL seconds.
+
+        Args:
+            progress: progress dict, see ``MultiPlotModel.load_multirun()``
+            offset: y offset between runs
+        """
+        if self.model.cancel_load:
+            return
+
+        self.view.load_multi.setText(
+            f"Cancel (loaded {progress['current']} / {progress['total']})"
+        )
+
+        run, flags = progress["run"], progress["flags"]
+
+        if flags.get("no_files_found"):
+            logger.warning("No files found for run %s.", run.run_num)
+            return
+
+        if flags.get("norm_by_spills_error"):
+            logger.warning("Normalisation failed for run %s.", run.run_num)
+            return
+
+        self.incremental_runs.append((run, progress["index"]))
+
+        now = time.monotonic()
+        if now - self.load_start_time < INCREMENTAL_PLOT_DELAY:
+            return
+
+        if not self.incremental_plot_started:
+            # Assuming all runs have same detectors loaded.
+            self.model.loaded_runs = [self.incremental_runs[0][0]]
+            self.set_checkboxes()
+            self.model.start_incremental_plot(
+                self.incremental_runs[0][0], self.view.get_checked_detectors()
+            )
+            for loaded_run, index in self.incremental_runs:
+                self.model.add_run_to_plot(loaded_run, index, offset)
+
+            self.view.plot.update_plot(self.model.fig, self.model.axs)
+            self.incremental_plot_started = True
+            self.last_redraw_time = now
+            return
+
+        self.model.add_run_to_plot(run, progress["index"], offset)
+
+        if now - self.last_redraw_time >= INCREMENTAL_REDRAW_INTERVAL:
+            self.view.plot.canvas.draw_idle()
+            self.last_redraw_time = now
+
+    def on_load_error(self, error: tuple):
+        _, value, _ = error
+        logger.error("Failed to load runs for multiplot: %s", value)
+        self.view.display_error_message(
+            title="Multi-run plot error",
+            message=f"Error: Failed to load runs.\n{value}",
+        )
+
+    def on_load_finished(self):
+        self.load_worker = None
+        self.view.load_multi.setText(self.load_button_text)
+
+    def on_multirun_loaded(self, result: dict, offset):
+        if result["status"] == "cancelled":
+            logger.info("Loading of runs for multiplot was cancelled.")
+            return
+
+        runs, empty_runs, norm_failed_runs = result["runs"]
         # reads data and returns as each detector and as an array
         self.model.loaded_runs = runs
         self.model.offset = offset
@@ -77,7 +189,10 @@ class MultiPlotPresenter:
             logger.warning("No files found for runs %s.", run_numbers_str)
 
         # Assuming all runs have same detectors loaded.
-        self.set_checkboxes()
+        if not self.incremental_plot_started:
+            self.set_checkboxes()
+        else:
+            self.view.plot.canvas.draw_idle()  # draw runs loaded since the last redraw
         self.view.apply_run_settings_button.setEnabled(True)
 
     def detect_runs(self, table_data):
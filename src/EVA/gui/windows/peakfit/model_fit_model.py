@@ -22,9 +22,9 @@ class ModelFitModel(QObject):
     def __init__(self, run, detector, parent=None):
         super().__init__()
 
-        # Get loaded spectrum from app
+        # Get loaded spectrum from app - copied, as the run overwrites its corrected data when corrections change
         self.run = run
-        self.spectrum = self.run.data[detector]
+        self.spectrum = self.run.get_spectrum(detector)
         self.detector = detector
 
         # Set up containers to store initial and fitted parameters
@@ -130,6 +130,7 @@ class ModelFitModel(QObject):
         )
 
     def replot_spectrum_residual(self):
+        self.spectrum = self.run.get_spectrum(self.detector)
         replot_run_residual(
             self.run,
             self.fig,
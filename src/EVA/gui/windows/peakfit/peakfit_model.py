@@ -27,8 +27,9 @@ class PeakFitModel(QObject):
 	def __init__(self, run, detector, parent=None):
 			super().__init__()
 
-			# Get loaded spectrum from app
+			# Get loaded spectrum from app - copied, as the run overwrites its corrected data when corrections change
 			self.run = run
+			self.spectrum = self.run.get_spectrum(detector)
 			self.detector = detector
 
 			# Set up containers to store initial and fitted parameters
@@ -64,7 +65,7 @@ class PeakFitModel(QObject):
 			self.add_peak_mode = False
 
 			self.plot_settings = {"colour": get_config()["plot"]["fill_colour"]}
-			self.fig, self.axs = plotting.plot_spectrum_residual(self.run.data[self.detector], self.run.normalisation, **self.plot_settings)
+			self.fig, self.axs = plotting.plot_spectrum_residual(self.spectrum, self.run.normalisation, **self.plot_settings)
 			self.main_axs = self.axs[0]
 			self.residual_axs = self.axs[1]
 
@@ -82,7 +83,7 @@ class PeakFitModel(QObject):
 			logger.debug("Fitting range E = (%s, %s).", round(self.x_range[0], 2), round(self.x_range[1], 2))
 			logger.debug("Initial peak parameters %s", self.initial_peak_params)
 			logger.debug("Initial background parameters %s", self.initial_bg_params)
-			self.x_data,self.y_data = Trimdata(self.run.data[self.detector].x, self.run.data[self.detector].y, self.x_range[0], self.x_range[1])
+			self.x_data,self.y_data = Trimdata(self.spectrum.x, self.spectrum.y, self.x_range[0], self.x_range[1])
 			t0 = time.time_ns()
 			self.fit_result = fit_data.fit_gaussian_lmfit(self.x_data, self.y_data, self.initial_peak_params, self.initial_bg_params)
 			t1 = time.time_ns()
@@ -119,8 +120,8 @@ class PeakFitModel(QObject):
 
 	def add_initial_peak_params(self, x: float):
 			# find height of curve at specified x to give as initial peak height guess
-			ix = np.argmin(abs(self.run.data[self.detector].x - x))
-			height = self.run.data[self.detector].y[ix]
+			ix = np.argmin(abs(self.spectrum.x - x))
+			height = self.spectrum.y[ix]
 
 			center = x
 			sigma = 0.7 # estimated sigma based on measurements
@@ -178,7 +179,7 @@ class PeakFitModel(QObject):
 	def plot_initial_params(self, overwrite_old: bool=True):
 		bg = self.initial_bg_params["background"]
 
-		x = self.run.data[self.detector].x
+		x = self.spectrum.x
 
 		func = bg["a"]["value"] * x * x + bg["b"]["value"] * x + bg["c"]["value"]
 
@@ -237,7 +238,7 @@ class PeakFitModel(QObject):
 			self.main_axs.legend()
 
 		else:
-			x = self.run.data[self.detector].x
+			x = self.spectrum.x
 			bg = self.fitted_bg_params["background"]
 			bg_func = bg["a"]["value"] * x * x + bg["b"]["value"] * x + bg["c"]["value"]
 			self.main_axs.plot(x, bg_func, label="Fitted background")
@@ -294,7 +295,7 @@ class PeakFitModel(QObject):
 		return "".join(f"{row[0]}, {row[1]}\n" for row in array)
 	
 	def save_plot_points(self, path: str):
-		run_data = np.column_stack((self.run.data[self.detector].x, self.run.data[self.detector].y))
+		run_data = np.column_stack((self.spectrum.x, self.spectrum.y))
 		fit_data = np.column_stack((self.x_fit_high_res, self.y_fit_high_res))
 		residual_data = np.column_stack((self.x_data, self.fit_result.residual))
 
@@ -304,6 +305,7 @@ class PeakFitModel(QObject):
 			zf.writestr(f"EVA_{self.run.run_num}.res", self.array_to_string(residual_data))
 
 	def replot_spectrum_residual(self):
+			self.spectrum = self.run.get_spectrum(self.detector)
 			replot_run_residual(self.run, self.fig, self.axs, self.fit_result, colour=get_config()["plot"]["fill_colour"])
 
 	def save_fit_report(self, path: str):
@@ -1,6 +1,7 @@
 import os
 import sys
 import logging
+import multiprocessing
 from pathlib import Path
 
 from EVA.gui.windows.main.main_window import MainWindow
@@ -9,18 +10,10 @@ from EVA.gui.windows.main.main_window import MainWindow
 ROOT = Path(__file__).resolve().parent.parent.parent  # get root dir using pathlib
 os.chdir(ROOT)  # change cwd to root
 
-from EVA.gui.windows.main.main_view import MainView
 from EVA.core.app import App
 
 # set up logging and handling exceptions
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    filename="EVA.log",
-    encoding="utf-8",
-    level=logging.DEBUG,
-    filemode="w",
-    format="%(asctime)s %(levelname)s: %(message)s",
-)
 
 logging.getLogger("matplotlib.font_manager").disabled = True
 
@@ -39,6 +32,18 @@ def handle_exception(exc_type, exc_value, exc_traceback):
 sys.excepthook = handle_exception
 
 if __name__ == "__main__":
+    # worker processes (see batch_load.py) must not run the app - needed for frozen executables
+    multiprocessing.freeze_support()
+
+    # only set up the log file in the main process, as worker processes re-import this module
+    logging.basicConfig(
+        filename="EVA.log",
+        encoding="utf-8",
+        level=logging.DEBUG,
+        filemode="w",
+        format="%(asctime)s %(levelname)s: %(message)s",
+    )
+
     logging.info("Starting EVA...")
     logger.debug("Root directory: %s", ROOT)
 
@@ -47,4 +52,7 @@ if __name__ == "__main__":
     logger.info("Launching main window.")
 
     app.main_window.widget().show()
+
+    # load databases in the background while the user is getting started
+    app.prefetch_databases()
     sys.exit(app.exec())
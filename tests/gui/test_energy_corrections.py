@@ -0,0 +1,40 @@
+from pytestqt.plugin import qtbot
+
+from EVA.core.data_loading import load_data
+from EVA.core.physics.calibration import PiecewiseLinearCalibration
+from EVA.gui.dialogs.energy_corrections.energy_corrections_model import (
+    EnergyCorrectionsModel,
+)
+from EVA.gui.dialogs.energy_corrections.energy_corrections_presenter import (
+    EnergyCorrectionsPresenter,
+)
+from EVA.gui.dialogs.energy_corrections.energy_corrections_view import (
+    EnergyCorrectionsView,
+)
+
+
+class TestEnergyCorrections:
+    def test_piecewise_calibration_without_coefficients(self, qtbot):
+        run, _ = load_data.load_run("2630", **load_data.get_load_settings())
+
+        # settings of a fitted piecewise calibration, which has no "e_corr_coeffs"
+        calibration = PiecewiseLinearCalibration([(0, 0), (1000, 1010), (2000, 2030)])
+        corrections = {
+            detector: {"e_corr_coeffs": [1, 0], "use_e_corr": False}
+            for detector in run.loaded_detectors
+        }
+        corrections["GE1"] = {**calibration.to_settings(), "use_e_corr": True}
+        run.set_corrections(energy_corrections=corrections)
+
+        view = EnergyCorrectionsView()
+        qtbot.addWidget(view)
+        presenter = EnergyCorrectionsPresenter(view, EnergyCorrectionsModel(run))
+
+        # the piecewise calibration is described rather than edited in the table
+        assert view.correction_table.item(0, 1).text() == "Piecewise (3 points)"
+        assert view.locked_rows == {0}
+
+        presenter.on_apply()
+        assert run.energy_corrections["GE1"]["e_corr_points"] == [
+            list(point) for point in calibration.points
+        ]
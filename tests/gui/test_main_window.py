@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+from PyQt6.QtCore import Qt
+from pytestqt.plugin import qtbot
+
+from EVA.core.app import get_app
+from EVA.core.data_loading import brni_cache
+from EVA.core.data_loading.run_cache import make_run_key
+from EVA.gui.windows.main.main_model import MainModel
+from EVA.gui.windows.main.main_presenter import MainPresenter
+from EVA.gui.windows.main.main_view import MainView
+
+
+class TestMainWindow:
+    @pytest.fixture(autouse=True)
+    def setup(self, qtbot):
+        self.view = MainView()
+        self.model = MainModel()
+        self.presenter = MainPresenter(self.view, self.model)
+
+        # main window is not shown - closing it would ask to save the config and quit the app
+        yield
+
+        for workspace in list(self.view.workspaces):
+            self.presenter.close_workspace(workspace)
+        self.view.deleteLater()
+        get_app().reset()
+
+    def test_load_run_on_worker_thread(self, qtbot):
+        self.view.set_run_num_line_edit("2630")
+
+        qtbot.mouseClick(self.view.load_button, Qt.MouseButton.LeftButton)
+
+        # load buttons are disabled until the run has loaded
+        assert not self.view.load_button.isEnabled()
+
+        qtbot.waitUntil(lambda: len(self.view.workspaces) == 1, timeout=10000)
+        qtbot.waitUntil(lambda: self.view.load_button.isEnabled(), timeout=10000)
+
+        run = self.model.run
+        assert run.run_num == "2630"
+        assert run.thread() is get_app().thread(), "run was not moved to gui thread"
+        assert self.view.cancel_load_button.isHidden()
+
+    def test_cancel_load(self, qtbot):
+        self.view.set_run_num_line_edit("2630")
+
+        # pretend the run is being prefetched, so the load waits for it until it is cancelled
+        key = make_run_key("2630", self.model.get_load_settings("2630"))
+        assert self.model.run_cache.claim(key)
+
+        try:
+            self.presenter.load_run_num()
+            self.presenter.cancel_load()
+            qtbot.waitUntil(lambda: self.view.load_button.isEnabled(), timeout=10000)
+        finally:
+            self.model.run_cache.release(key)
+
+        assert len(self.view.workspaces) == 0
+        assert self.model.run is None
+        assert not self.model.cancel_load, "cancel flag was not reset"
+        assert not self.view.cancel_load_button.isEnabled()
+
+    def test_cancel_after_load_is_ignored(self, qtbot):
+        self.view.set_run_num_line_edit("2630")
+
+        # cancel clicked after the previous load had finished reading the run
+        self.model.cancel_load = True
+        self.presenter.load_run_num()
+
+        qtbot.waitUntil(lambda: len(self.view.workspaces) == 1, timeout=10000)
+        assert self.model.run.run_num == "2630"
+
+    def test_neighbouring_runs_prefetched(self, qtbot):
+        self.view.set_run_num_line_edit("3064")
+        self.presenter.load_run_num()
+        qtbot.waitUntil(lambda: self.view.load_button.isEnabled(), timeout=10000)
+
+        # runs either side are loaded in the background
+        keys = {
+            run_num: make_run_key(
+                run_num, self.model.get_load_settings(run_num, create_record=False)
+            )
+            for run_num in ["3063", "3065"]
+        }
+        qtbot.waitUntil(
+            lambda: all(key in self.model.run_cache for key in keys.values()),
+            timeout=10000,
+        )
+        prefetched, _ = self.model.run_cache.get(keys["3065"])
+
+        # stepping to the next run opens the prefetched run without loading it again
+        qtbot.mouseClick(self.view.load_next_run_button, Qt.MouseButton.LeftButton)
+
+        assert len(self.view.workspaces) == 2, "workspace was not opened immediately"
+        assert self.model.run is prefetched
+
+        # only the raw data of the run opened in a workspace is kept in the cache, as the workspace can change it
+        cached, _ = self.model.run_cache.get(keys["3065"])
+        assert cached is not prefetched
+
+    def test_previous_run_opened_from_cache(self, monkeypatch):
+        run_nums = ["3064", "3065"]
+        runs = {run_num: self.model.load_run(run_num)[1] for run_num in run_nums}
+
+        # stepping back to the previous run does not read its files again
+        def read_brni_spectrum(file_path, use_cache=True):
+            raise AssertionError(f"{file_path} was read again")
+
+        monkeypatch.setattr(brni_cache, "read_brni_spectrum", read_brni_spectrum)
+        flags, run = self.model.load_run("3064")
+
+        assert flags["no_files_found"] == 0
+        assert run is not runs["3064"], "run open in a workspace was handed out again"
+        assert run.loaded_detectors == runs["3064"].loaded_detectors
+        for detector in run.loaded_detectors:
+            assert np.array_equal(run.data[detector].y, runs["3064"].data[detector].y)
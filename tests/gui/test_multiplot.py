@@ -5,6 +5,7 @@ from PyQt6.QtWidgets import QWidget, QTableWidgetItem, QMessageBox
 from pytestqt.plugin import qtbot
 
 
+from EVA.gui.windows.multiplot import multi_plot_presenter
 from EVA.gui.windows.multiplot.multi_plot_window import MultiPlotWindow
 from EVA.core.app import get_config, get_app
 
@@ -232,3 +233,26 @@ class TestMultiPlotWindow:
         qtbot.wait(int(TIME_DELAY * 1.5))
 
         assert self.view.plot.canvas.axs is None, "incorrect number of runs were loaded"
+
+    def test_runs_plotted_while_loading(self, qtbot, monkeypatch):
+        # draw every run as soon as it has loaded, however quickly loading finishes
+        monkeypatch.setattr(multi_plot_presenter, "INCREMENTAL_PLOT_DELAY", 0)
+        monkeypatch.setattr(multi_plot_presenter, "INCREMENTAL_REDRAW_INTERVAL", 0)
+
+        self.view.RunListTable.setItem(0, 0, QTableWidgetItem("3063"))  # start
+        self.view.RunListTable.setItem(0, 1, QTableWidgetItem("3065"))  # stop
+        self.view.RunListTable.setItem(0, 2, QTableWidgetItem("1"))  # step
+
+        qtbot.mouseClick(self.view.load_multi, Qt.MouseButton.LeftButton)
+        qtbot.waitUntil(lambda: self.window._presenter.load_worker is None)
+
+        # runs are drawn without pressing plot
+        offset, _ = self.view.get_form_data()
+        axs = self.view.plot.canvas.axs
+        assert [line.get_label() for line in axs[0].lines] == ["3063", "3064", "3065"]
+
+        target_data = self.get_data(["3063", "3064", "3065"], ["GE1"])
+        for i, line in enumerate(axs[0].lines):
+            assert all(line.get_ydata() == target_data[i][0][:, 1] + i * offset), (
+                "incorrect data was plotted"
+            )
@@ -1,7 +1,10 @@
+import numpy as np
 import pytest
 from pytestqt.plugin import qtbot
 
-from EVA.core.app import get_app
+from EVA.core.app import get_app, get_config
+from EVA.core.data_loading import load_data
+from EVA.gui.windows.peakfit.peakfit_model import PeakFitModel
 
 
 class TestPeakFitWindow:
@@ -9,3 +12,26 @@ class TestPeakFitWindow:
     @pytest.fixture(autouse=True)
     def setup(self, qtbot):
         pass
+
+    def test_fit_data_kept_when_corrections_change(self, qapp):
+        corrections = get_config()["default_corrections"]
+        run, _ = load_data.load_run(
+            "2630",
+            get_config()["general"]["working_directory"],
+            corrections["detector_specific"],
+            "none",
+            corrections["binning"],
+            corrections["plot_mode"],
+            corrections["prompt_limit"],
+            corrections["delayed_limit"],
+        )
+        model = PeakFitModel(run, "GE1")
+        x = np.copy(model.spectrum.x)
+
+        # the model keeps the data it was opened with until it is replotted
+        e_corr = {"GE1": {"e_corr_coeffs": [2, 0], "use_e_corr": True}}
+        run.set_corrections(energy_corrections=e_corr)
+        assert np.array_equal(model.spectrum.x, x)
+
+        model.replot_spectrum_residual()
+        assert np.array_equal(model.spectrum.x, run.data["GE1"].x)
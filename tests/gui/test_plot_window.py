@@ -241,3 +241,20 @@ class TestPlotWindow:
         assert all([elem[0] == peaks_ax1[i][0] for i, elem in enumerate(data_ax1)]), \
             "Marker positions on figure after peakfit did not match expected results"
         """
+
+    @pytest.mark.parametrize(
+        "routine",
+        [
+            "SciPy find_peaks() w/ background filter",
+            "SciPy find_peaks() w/ SNIP background",
+            "SciPy find_peaks() w/ rolling ball background",
+        ],
+    )
+    def test_find_peaks_routines(self, qtbot, routine):
+        self.view.routine_select_combo.setCurrentText(routine)
+        qtbot.mouseClick(self.view.find_peaks_button, Qt.MouseButton.LeftButton)
+
+        model = self.presenter.model
+        assert model.peakfind_selected_function == routine
+        assert model.peakfind_result
+        assert any(peaks for peaks in model.peakfind_result.values())
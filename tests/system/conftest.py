@@ -0,0 +1,119 @@
+import h5py
+import numpy as np
+import pytest
+
+from EVA.core.app import get_config
+from EVA.core.data_structures.run_nxs import RunNexus
+from EVA.core.data_structures.spectrum_nexus import SpectrumNexus
+
+
+class ProgressRecorder:
+    """Stand-in for a pyqtSignal which records everything emitted to it."""
+
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, progress: dict):
+        self.emitted.append(progress)
+
+
+def make_nexus_run(event_file, detectors=("GE1",)) -> RunNexus:
+    raw = {
+        detector: SpectrumNexus(
+            detector=detector,
+            run_number="1",
+            energy=event_file["energy"],
+            time=event_file["time"],
+            bin_range=(0, 8000),
+        )
+        for detector in detectors
+    }
+    return RunNexus(
+        raw=raw,
+        loaded_detectors=list(detectors),
+        run_num="1",
+        plot_mode="Manual Prompt Spectrum",
+        prompt_limit=500,
+        delayed_limit=20000,
+        comment_data=[""] * 7,
+        momentum=0,
+    )
+
+
+def make_nexus_file(
+    path,
+    seed=0,
+    n_events=20_000,
+    detectors=4,
+    energy_dtype=np.float32,
+    time_range=(-100, 30000),
+    integer_times=False,
+    chunks=None,
+    compression=None,
+):
+    """
+    Writes a minimal MUX Nexus file with random events in the first detectors. Event datasets are contiguous unless
+    chunks or compression are given, and event times are rounded down to whole numbers if integer_times is set.
+
+    Returns:
+        Path of the file.
+    """
+    rng = np.random.default_rng(seed)
+    energies = np.arange(0, 8000, 2.0)
+
+    with h5py.File(path, "w") as f:
+        f["raw_data_1/title"] = b"synthetic run"
+        f["raw_data_1/notes"] = b""
+        f["raw_data_1/start_time"] = b"2024-01-01T00:00:00"
+        f["raw_data_1/end_time"] = b"2024-01-01T01:00:00"
+
+        for i in range(1, detectors + 1):
+            f[f"raw_data_1/instrument/detector_{i}/name"] = f"GE{i}".encode()
+            for part in "AB":
+                group = f"raw_data_1/detector_{i}_energy{part}"
+                f[f"{group}/energy"] = energies
+                f[f"{group}/counts"] = rng.poisson(5, energies.size)
+                f[f"{group}/num_events"] = n_events
+                f[f"{group}/event_time_min"] = 0
+                f[f"{group}/event_time_max"] = 500
+
+            energy = rng.uniform(0, 8000, n_events).astype(energy_dtype)
+            time = rng.uniform(*time_range, n_events)
+            if integer_times:
+                time = np.floor(time)
+
+            events = f.create_group(f"raw_data_1/detector_{i}_events")
+            for name, data in (("event_energy", energy), ("event_time_offset", time)):
+                events.create_dataset(
+                    name, data=data, chunks=chunks, compression=compression
+                )
+            f[f"raw_data_1/detector_{i}_energy2D/counts"] = np.zeros((4, 4))
+
+    return path
+
+
+@pytest.fixture
+def event_file(tmp_path):
+    # events of a single detector, read in chunks
+    path = make_nexus_file(
+        tmp_path / "events.nxs", seed=1, n_events=100_000, detectors=1, chunks=(4096,)
+    )
+
+    f = h5py.File(path, "r")
+    events = f["raw_data_1/detector_1_events"]
+    yield {"energy": events["event_energy"], "time": events["event_time_offset"]}
+    f.close()
+
+
+@pytest.fixture
+def load_settings():
+    # keyword arguments of load_data.load_run() for the default corrections in the config
+    corrections = get_config()["default_corrections"]
+    return {
+        "energy_corrections": corrections["detector_specific"],
+        "normalisation": corrections["normalisation"],
+        "binning": corrections["binning"],
+        "plot_mode": corrections["plot_mode"],
+        "prompt_limit": corrections["prompt_limit"],
+        "delayed_limit": corrections["delayed_limit"],
+    }
@@ -0,0 +1,124 @@
+import os
+import subprocess
+import sys
+import h5py
+import numpy as np
+import pytest
+from pytestqt.plugin import qapp
+
+from EVA.batch import output, pipeline
+from EVA.core.app import get_config
+
+
+@pytest.fixture
+def settings():
+    return pipeline.get_load_settings(get_config()["general"]["working_directory"])
+
+
+class TestBatchAnalysis:
+    def test_parse_run_list(self):
+        assert pipeline.parse_run_list(["3063-3065", "3070,3080-3084:2"]) == [
+            "3063",
+            "3064",
+            "3065",
+            "3070",
+            "3080",
+            "3082",
+            "3084",
+        ]
+
+        with pytest.raises(ValueError):
+            pipeline.parse_run_list(["3065-3063"])
+
+    def test_analyse_run(self, qapp, settings):
+        result = pipeline.analyse_run("2630", settings, pipeline.AnalysisOptions())
+
+        assert result.status == "done"
+        assert result.peaks and set(result.elements) <= {"GE1", "GE2", "GE3", "GE4"}
+        for scores in result.elements.values():
+            assert len(scores) <= pipeline.AnalysisOptions.max_elements
+            assert [score.score for score in scores] == sorted(
+                (score.score for score in scores), reverse=True
+            )
+
+        for peak in result.peaks:
+            assert peak.run_num == "2630"
+            if peak.element:
+                assert abs(peak.database_energy - peak.energy) <= 3
+
+        fitted = [peak for peak in result.peaks if np.isfinite(peak.fit_centre)]
+        assert fitted
+        for peak in fitted:
+            assert (
+                abs(peak.fit_centre - peak.energy) <= pipeline.AnalysisOptions.fit_width
+            )
+
+    def test_missing_run(self, qapp, settings):
+        result = pipeline.analyse_run("9999", settings, pipeline.AnalysisOptions())
+        assert result.status == "not found" and not result.peaks
+
+    @pytest.mark.parametrize("output_format", output.output_formats)
+    def test_write_results(self, qapp, settings, tmp_path, output_format):
+        options = pipeline.AnalysisOptions(fit=False)
+        results = list(
+            pipeline.iter_analyse_runs(
+                ["2630", "9999"], settings, options, max_workers=1
+            )
+        )
+        path = str(tmp_path / f"results.{'csv' if output_format == 'csv' else 'h5'}")
+        assert output.get_output_format(path, None) == output_format
+
+        paths = output.write_results(results, path, output_format)
+        n_peaks = len(results[0].peaks)
+
+        if output_format == "csv":
+            with open(paths[0]) as file:
+                assert len(file.readlines()) == n_peaks + 1
+            with open(output.get_output_paths(path)["runs"]) as file:
+                assert file.read().splitlines()[1:] == [
+                    "2630,done,,%s" % n_peaks,
+                    "9999,not found,,0",
+                ]
+        else:
+            with h5py.File(path) as file:
+                assert len(file["peaks/energy"]) == n_peaks
+                assert list(file["runs/status"].asstr()) == ["done", "not found"]
+
+    def test_command_line_without_display(self, tmp_path):
+        # run in a new process without a display - no QApplication may be created
+        env = {
+            key: value
+            for key, value in os.environ.items()
+            if key not in ("DISPLAY", "WAYLAND_DISPLAY", "QT_QPA_PLATFORM")
+        }
+        path = tmp_path / "results.csv"
+
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "EVA.batch",
+                "2630",
+                "9999",
+                "-d",
+                os.path.abspath("test_data"),
+                "-o",
+                str(path),
+                "-j",
+                "1",
+                "--no-fit",
+            ],
+            env=env,
+            cwd=tmp_path,
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+
+        assert process.returncode == 0, process.stderr
+        assert path.exists()
+        with open(tmp_path / "results_runs.csv") as file:
+            assert [line.split(",")[1] for line in file.read().splitlines()[1:]] == [
+                "done",
+                "not found",
+            ]
@@ -0,0 +1,114 @@
+import logging
+import numpy as np
+import pytest
+
+from EVA.core.app import get_config
+from EVA.core.data_loading import batch_load, load_data
+from EVA.gui.windows.multiplot.multi_plot_model import MultiPlotModel
+from tests.system.conftest import ProgressRecorder, make_nexus_file
+
+# 3069 is missing from the test data
+run_list = ["3063", "3064", "3065", "3066", "3067", "3068", "3069", "3070"]
+
+
+@pytest.fixture
+def settings(load_settings):
+    return {
+        "working_directory": get_config()["general"]["working_directory"],
+        **load_settings,
+        "normalisation": "none",
+    }
+
+
+class TestBatchLoad:
+    @pytest.mark.parametrize("use_processes", [False, True])
+    def test_batch_load_matches_loading_one_by_one(
+        self, qapp, monkeypatch, settings, use_processes
+    ):
+        if use_processes:
+            monkeypatch.setattr(batch_load, "PROCESS_POOL_MIN_RUNS", 2)
+
+        loaded = {
+            i: (run, flags)
+            for i, run, flags in batch_load.iter_load_runs(
+                run_list, settings, max_workers=2
+            )
+        }
+
+        assert sorted(loaded) == list(range(len(run_list))), "not all runs were loaded"
+
+        for i, run_num in enumerate(run_list):
+            expected_run, expected_flags = load_data.load_run(run_num, **settings)
+            run, flags = loaded[i]
+
+            assert flags == expected_flags
+            assert run.run_num == run_num
+            assert run.loaded_detectors == expected_run.loaded_detectors
+            for detector in run.loaded_detectors:
+                assert np.array_equal(
+                    run.data[detector].y, expected_run.data[detector].y
+                )
+
+    def test_read_run_arrays(self, qapp, settings):
+        arrays = batch_load.read_run_arrays("3064", settings)
+
+        # GE4 is missing for this run
+        assert sorted(arrays["spectra"]) == ["GE1", "GE2", "GE3"]
+        assert batch_load.read_run_arrays("3069", settings) == {}
+
+    def test_batch_load_nexus_runs(self, qapp, monkeypatch, settings, tmp_path, caplog):
+        nexus_runs = ["100", "101", "102", "103"]
+        for seed, run_num in enumerate(nexus_runs):
+            make_nexus_file(tmp_path / f"MUX{int(run_num):08d}.nxs", seed)
+
+        settings = settings | {
+            "working_directory": str(tmp_path),
+            "plot_mode": "Manual Prompt Spectrum",
+        }
+        monkeypatch.setattr(batch_load, "PROCESS_POOL_MIN_RUNS", 2)
+
+        assert list(
+            batch_load.read_run_arrays("100", settings)["event_histograms"]
+        ) == [
+            "GE1",
+            "GE2",
+            "GE3",
+            "GE4",
+        ]
+
+        with caplog.at_level(logging.WARNING, logger=batch_load.__name__):
+            loaded = {
+                i: run
+                for i, run, _ in batch_load.iter_load_runs(
+                    nexus_runs, settings, max_workers=2
+                )
+            }
+
+        # every run is histogrammed by a worker, rather than failing and being loaded again on this thread
+        assert not caplog.records
+        assert sorted(loaded) == list(range(len(nexus_runs)))
+
+        for i, run_num in enumerate(nexus_runs):
+            expected_run, _ = load_data.load_run(run_num, **settings)
+            for detector in expected_run.loaded_detectors:
+                assert np.array_equal(
+                    loaded[i].data[detector].y, expected_run.data[detector].y
+                )
+
+    def test_batch_load_cancelled(self, qapp, settings):
+        runs = batch_load.iter_load_runs(run_list, settings, is_cancelled=lambda: True)
+        with pytest.raises(load_data.LoadCancelled):
+            next(runs)
+
+    def test_multirun_reports_each_run(self, qapp):
+        progress = ProgressRecorder()
+        good, blank, norm_failed = MultiPlotModel.load_multirun(
+            run_list, progress_callback=progress
+        )
+
+        assert len(progress.emitted) == len(run_list)
+        assert progress.emitted[-1]["current"] == len(run_list)
+        assert [r.run_num for r in blank] == ["3069"]
+        assert [r.run_num for r in good + norm_failed] == [
+            r for r in run_list if r != "3069"
+        ]
@@ -0,0 +1,67 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from EVA.core.data_loading import brni_cache
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "ral02630.rooth2099.dat"
+    shutil.copy("./test_data/ral02630.rooth2099.dat", path)
+    return str(path)
+
+
+def cache_files(data_file):
+    cache_dir = os.path.join(
+        os.path.dirname(data_file), brni_cache.BRNI_CACHE_DIRECTORY
+    )
+    return sorted(os.listdir(cache_dir)) if os.path.isdir(cache_dir) else []
+
+
+class TestBrniCache:
+    def test_cached_copy_matches_text_file(self, data_file, monkeypatch):
+        expected = np.loadtxt(data_file, delimiter=" ", unpack=True)
+
+        x, y = brni_cache.read_brni_spectrum(data_file)
+        assert np.array_equal(x, expected[0]) and np.array_equal(y, expected[1])
+        assert len(cache_files(data_file)) == 1
+
+        # second read must not parse the text file
+        def fail(*args, **kwargs):
+            raise AssertionError("text file parsed again")
+
+        monkeypatch.setattr(np, "loadtxt", fail)
+        x, y = brni_cache.read_brni_spectrum(data_file)
+        assert np.array_equal(x, expected[0]) and np.array_equal(y, expected[1])
+
+    def test_cached_copy_replaced_when_file_changes(self, data_file):
+        brni_cache.read_brni_spectrum(data_file)
+        old_files = cache_files(data_file)
+
+        with open(data_file, "a") as f:
+            f.write("7999.5 12\n")
+
+        x, y = brni_cache.read_brni_spectrum(data_file)
+        assert x[-1] == 7999.5 and y[-1] == 12
+
+        new_files = cache_files(data_file)
+        assert len(new_files) == 1 and new_files != old_files, (
+            "copy of old file was not removed"
+        )
+
+    def test_unwritable_cache_directory(self, data_file):
+        # a file in place of the cache directory makes writing the copy fail
+        open(
+            os.path.join(os.path.dirname(data_file), brni_cache.BRNI_CACHE_DIRECTORY),
+            "w",
+        ).close()
+
+        x, y = brni_cache.read_brni_spectrum(data_file)
+        assert len(x) == len(y) == 8000
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            brni_cache.read_brni_spectrum(str(tmp_path / "ral00001.rooth2099.dat"))
@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+from pytestqt.plugin import qapp
+
+from EVA.core.app import get_app
+from EVA.core.physics.calibration import (
+    PolynomialCalibration,
+    PiecewiseLinearCalibration,
+    CalibrationCurveCache,
+    apply_calibration,
+    calibration_from_settings,
+    fit_calibration,
+    fit_calibration_to_lines,
+    get_line_energies,
+)
+
+
+class TestCalibration:
+    def test_polynomial_matches_polyval(self):
+        x = np.linspace(0, 8000, 1001)
+
+        for coefficients in ([2.0], [1.5, -10], [1e-6, 1.01, -2], [1e-10, -1e-6, 1, 3]):
+            calibration = PolynomialCalibration(coefficients)
+            assert np.allclose(calibration.evaluate(x), np.polyval(coefficients, x))
+
+    def test_piecewise_extrapolates_end_segments(self):
+        calibration = PiecewiseLinearCalibration([(1000, 1010), (0, 0), (2000, 2030)])
+        x = np.array([-100.0, 0, 500, 1500, 3000])
+
+        assert np.allclose(calibration.evaluate(x), [-101, 0, 505, 1520, 3050])
+
+    def test_from_settings(self):
+        linear = {"e_corr_coeffs": [1.5, -10], "use_e_corr": True}
+        assert calibration_from_settings(linear) == PolynomialCalibration([1.5, -10])
+        assert calibration_from_settings(linear).is_linear
+
+        assert calibration_from_settings({**linear, "use_e_corr": False}) is None
+
+        piecewise = {
+            "e_corr_model": "piecewise",
+            "e_corr_points": [[0, 0], [1000, 1010], [2000, 2030]],
+            "use_e_corr": True,
+        }
+        calibration = calibration_from_settings(piecewise)
+        assert not calibration.is_linear
+        assert (
+            calibration_from_settings({**calibration.to_settings(), "use_e_corr": True})
+            == calibration
+        )
+
+        with pytest.raises(ValueError):
+            calibration_from_settings({**linear, "e_corr_model": "spline"})
+
+    def test_fit_recovers_polynomial(self):
+        coefficients = [2e-6, 0.99, 3.5]
+        measured = np.array([100.0, 500, 1500, 3000, 6000])
+
+        calibration = fit_calibration(
+            measured, np.polyval(coefficients, measured), degree=2
+        )
+        assert np.allclose(calibration.coefficients, coefficients)
+
+        with pytest.raises(ValueError):
+            fit_calibration(measured[:2], measured[:2], degree=2)
+
+    def test_fit_to_muonic_xray_lines(self, qapp):
+        database = get_app().muon_database
+        lines = [
+            (element, transition)
+            for element in ("Cu", "Ag", "Au")
+            for transition in list(database["All energies"][element])[:2]
+        ]
+        true = get_line_energies(lines)
+
+        # peaks measured with a detector which is slightly non-linear
+        measured = (true - 1.5) / 1.002 - 1e-7 * true**2
+        peaks = [(energy, *line) for energy, line in zip(measured, lines)]
+
+        calibration = fit_calibration_to_lines(peaks, degree=2)
+        assert np.allclose(calibration.evaluate(measured), true, atol=0.05)
+
+        with pytest.raises(KeyError):
+            get_line_energies([("Cu", "not a transition")])
+
+    def test_curve_cache(self):
+        cache = CalibrationCurveCache(max_entries=2)
+        calibration = PolynomialCalibration([1e-6, 1, 0])
+        x = np.linspace(0, 8000, 100)
+
+        curve = cache.get(calibration, x, "GE1")
+        assert not curve.flags.writeable
+        assert cache.get(PolynomialCalibration([1e-6, 1, 0]), x, "GE1") is curve
+
+        # different keys or coefficients are evaluated separately
+        assert cache.get(calibration, x + 1, "GE2") is not curve
+        assert cache.get(PolynomialCalibration([1, 0]), x, "GE1") is not curve
+
+        # least recently used curve was removed
+        assert cache.get(calibration, x, "GE1") is not curve
+
+    @pytest.mark.parametrize(
+        "calibration",
+        [
+            PolynomialCalibration([1.5, -10]),
+            PolynomialCalibration([3]),
+            PiecewiseLinearCalibration([(0, -10), (1000, 1490)]),
+        ],
+    )
+    def test_linear_calibration_applied_directly(self, calibration):
+        x = np.linspace(0, 8000, 100)
+        out = np.empty_like(x)
+        cache = CalibrationCurveCache()
+
+        assert calibration.is_linear
+        assert apply_calibration(calibration, x, out, cache, "GE1") is out
+        assert np.allclose(out, calibration.evaluate(x))
+
+        # linear curves are not cached
+        assert not cache._entries
+
+    def test_non_linear_calibration_cached(self):
+        calibration = PiecewiseLinearCalibration([(0, 0), (1000, 1010), (2000, 2030)])
+        x = np.linspace(0, 8000, 100)
+        out = np.empty_like(x)
+        cache = CalibrationCurveCache()
+
+        assert apply_calibration(calibration, x, out, cache, "GE1") is out
+        assert np.allclose(out, calibration.evaluate(x))
+        assert len(cache._entries) == 1
+
+        # without a cache the curve is evaluated into out
+        out[:] = 0
+        assert apply_calibration(calibration, x, out) is out
+        assert np.allclose(out, calibration.evaluate(x))
@@ -0,0 +1,70 @@
+import os
+import pickle
+import subprocess
+import sys
+from pytestqt.plugin import qapp
+
+from EVA.core.context import EvaContext, get_context
+from EVA.core.data_loading import load_data
+from EVA.core.data_searching import get_match
+from EVA.core.settings.config_data import ConfigData
+from tests.system.test_util import load_legacy_test_db
+
+
+class TestContext:
+    def test_app_is_context(self, qapp):
+        assert get_context() is qapp
+
+    def test_pickle_context(self, qapp):
+        context = pickle.loads(pickle.dumps(get_context()))
+
+        # only the config is sent - the copy is a plain context which loads its own databases
+        assert type(context) is EvaContext
+        assert context.config.to_dict() == qapp.config.to_dict()
+        assert context.config is not qapp.config
+
+    def test_injected_context(self, qapp):
+        config = ConfigData(qapp.config.to_dict())
+        context = EvaContext(config)
+        database = load_legacy_test_db()
+        context.muon_database = database
+
+        res = get_match.search_muxrays_single_element("Aa", context=context)
+        assert len(res) == len(database["All energies"]["Aa"])
+
+        # the app's database is not touched
+        assert qapp.muon_database is not context.muon_database
+
+    def test_load_settings_from_context(self, qapp):
+        data = qapp.config.to_dict()
+        data["general"]["working_directory"] = "some/directory"
+        context = EvaContext(ConfigData(data))
+
+        settings = load_data.get_load_settings(context=context)
+        assert settings["working_directory"] == "some/directory"
+        assert (
+            settings["energy_corrections"]
+            == data["default_corrections"]["detector_specific"]
+        )
+
+    def test_search_without_qt(self):
+        # run in a new process - searching the databases must not import Qt
+        code = (
+            "import sys\n"
+            "from EVA.core.context import EvaContext\n"
+            "from EVA.core.data_searching import get_match\n"
+            "context = EvaContext()\n"
+            "context.use_legacy_muon_db()\n"
+            "matches, _, _ = get_match.search_muxrays([[1342, 2]], context=context)\n"
+            "assert matches\n"
+            "assert not any(module.startswith('PyQt6') for module in sys.modules)\n"
+        )
+        process = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.getcwd(),
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+
+        assert process.returncode == 0, process.stderr
@@ -163,3 +163,45 @@ class TestDatabasesGetMatch:
         print(res)
 
         assert res == target_result, "Data in gamma database did not match expected"
+
+    # Checks that the search index follows the muon database currently in use.
+    def test_muon_index_rebuilt_on_database_switch(self, qapp):
+        app = get_app()
+        app.use_mudirac_muon_db()
+        mudirac_index = app.muon_database_index
+
+        assert app.muon_database_index is mudirac_index, (
+            "Search index was rebuilt without the database changing"
+        )
+
+        app.use_legacy_muon_db()
+        legacy_index = app.muon_database_index
+        app.reset()
+
+        assert legacy_index is not mudirac_index, (
+            "Search index was not rebuilt after switching database"
+        )
+        assert len(legacy_index) == sum(
+            len(transitions)
+            for transitions in app.legacy_muon_database["All energies"].values()
+        ), "Search index does not contain every transition in the legacy database"
+
+    # Checks that primary and secondary matches partition the full set of matches.
+    def test_muon_primary_secondary_split(self, qapp):
+        app = get_app()
+        app.muon_database = load_legacy_test_db()
+
+        res, res_primary, res_secondary = get_match.search_muxrays(
+            [[1342, 2], [1742, 2]]
+        )
+        primaries = app.muon_database["Primary energies"]
+        app.reset()
+
+        assert len(res) == len(res_primary) + len(res_secondary)
+        assert all(
+            match["transition"] in primaries[match["element"]] for match in res_primary
+        ), "Secondary transition returned as primary match"
+        assert all(
+            match["transition"] not in primaries[match["element"]]
+            for match in res_secondary
+        ), "Primary transition returned as secondary match"
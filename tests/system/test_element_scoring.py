@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from pytestqt.plugin import qapp
+
+from EVA.core.context import EvaContext
+from EVA.core.data_searching import element_scoring
+from EVA.core.settings.config_data import ConfigData
+
+
+def make_database():
+    # two elements with lines close together, and one element far away
+    return {
+        "All energies": {
+            "Aa": {"a1": {"E": 100, "I": 1}, "a2": {"E": 200, "I": 0.5}},
+            "Bb": {"b1": {"E": 102, "I": 1}, "b2": {"E": 300, "I": 1}},
+            "Cc": {"c1": {"E": 1000, "I": 1}},
+        },
+        "Primary energies": {
+            "Aa": {"a1": {}, "a2": {}},
+            "Bb": {"b1": {}, "b2": {}},
+            "Cc": {"c1": {}},
+        },
+        "Capture ratios": {},
+    }
+
+
+class TestElementScoring:
+    def test_score(self):
+        scorer = element_scoring.ElementScorer(make_database())
+        scores = scorer.score([100.2, 199.5], energy_range=(0, 500))
+
+        # Aa explains both peaks, Bb is missing its line at 300, and Cc is out of range
+        assert [score.element for score in scores] == ["Aa", "Bb"]
+        assert scores[0].score > 0 > scores[1].score
+        assert scores[0].confidence > 0.5 > scores[1].confidence
+        assert scores[0].lines_expected == 2
+        assert scores[0].peaks == [100.2, 199.5]
+        assert [match.transition for match in scores[0].matches] == ["a1", "a2"]
+
+    def test_no_peaks(self):
+        scorer = element_scoring.ElementScorer(make_database())
+
+        assert scorer.score([]) == []
+
+        # with an energy range, every element in it is scored down
+        scores = scorer.score([], energy_range=(0, 500))
+        assert all(score.score < 0 and not score.matches for score in scores)
+
+    def test_peak_heights(self):
+        scorer = element_scoring.ElementScorer(make_database())
+
+        # heights which follow the intensities of the lines of Aa score higher than heights which do not
+        consistent = scorer.score([100, 200], [100, 50], energy_range=(0, 500))[0]
+        inconsistent = scorer.score([100, 200], [10, 500], energy_range=(0, 500))[0]
+        assert consistent.element == inconsistent.element == "Aa"
+        assert consistent.score > inconsistent.score
+
+    def test_resolution(self):
+        energies = np.array([100.0, 1000.0, 5000.0])
+        sigma = element_scoring.get_resolution_sigma(energies, "GE1")
+
+        # peaks get wider with energy
+        assert sigma.shape == energies.shape
+        assert np.all(np.diff(sigma) > 0)
+
+        assert element_scoring.get_resolution_sigma(energies, "unknown") is None
+        with pytest.raises(ValueError):
+            element_scoring.get_resolution_sigma(energies, "GE1", "unknown")
+
+        # detectors without a resolution model use the default width
+        scorer = element_scoring.ElementScorer(make_database())
+        options = element_scoring.ScoringOptions(tolerance=0, default_sigma=2)
+        assert np.allclose(scorer.get_sigma("unknown", options=options), 2)
+
+    def test_score_elements(self, qapp):
+        context = EvaContext(ConfigData(qapp.config.to_dict()))
+        database = context.mudirac_muon_database_with_intensity
+        lines = database["Primary energies"]["Au"]
+        peaks = [lines[transition]["E"] + 0.3 for transition in lines]
+
+        scores = element_scoring.score_elements(
+            peaks, detector="GE1", energy_range=(0, 8000), context=context
+        )
+
+        assert scores[0].element == "Au"
+        assert scores[0].confidence > 0.99
+        assert len(scores[0].peaks) == len(peaks)
+        assert list(element_scoring.summarise_scores(scores, 3)) == [
+            score.element for score in scores[:3]
+        ]
+
+        # the scorer of a database is only built once
+        assert element_scoring.get_scorer(database) is element_scoring.get_scorer(
+            database
+        )
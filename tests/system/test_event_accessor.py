@@ -0,0 +1,95 @@
+import h5py
+import numpy as np
+import pytest
+
+from EVA.core.physics.event_accessor import EventAccessor
+from EVA.core.physics import event_binning, rebin
+from tests.system.conftest import make_nexus_file
+
+
+@pytest.fixture
+def event_datasets(tmp_path):
+    # the same events written contiguously and chunked with compression
+    files = [
+        h5py.File(
+            make_nexus_file(
+                tmp_path / f"{name}.nxs",
+                seed=2,
+                n_events=50_000,
+                detectors=1,
+                energy_dtype=np.float64,
+                time_range=(0, 30000),
+                integer_times=True,
+                **options,
+            ),
+            "r",
+        )
+        for name, options in (
+            ("contiguous", {}),
+            ("chunked", {"chunks": (4096,), "compression": "gzip"}),
+        )
+    ]
+    contiguous, chunked = (f["raw_data_1/detector_1_events"] for f in files)
+    datasets = {
+        "contiguous": contiguous["event_energy"],
+        "chunked": chunked["event_energy"],
+        "time": chunked["event_time_offset"],
+    }
+
+    yield datasets, datasets["contiguous"][:], datasets["time"][:]
+    for f in files:
+        f.close()
+
+
+class TestEventAccessor:
+    @pytest.mark.parametrize(
+        "name, mode", [("contiguous", "memmap"), ("chunked", "direct")]
+    )
+    def test_blocks_match_dataset(self, event_datasets, name, mode):
+        f, energy, _ = event_datasets
+        accessor = EventAccessor(f[name])
+
+        assert accessor.mode == mode
+        assert len(accessor) == len(energy)
+
+        for start in range(0, len(energy), 12_000):
+            block = accessor.read(start, start + 12_000)
+            assert np.array_equal(block, energy[start : start + 12_000])
+
+        assert np.array_equal(accessor[:], energy)
+
+    def test_buffer_reused(self, event_datasets):
+        f, energy, _ = event_datasets
+        accessor = EventAccessor(f["chunked"])
+
+        first = accessor.read(0, 4096)
+        second = accessor.read(4096, 8192)
+        assert np.shares_memory(first, second), "new buffer allocated for each block"
+        assert np.array_equal(second, energy[4096:8192])
+
+    @pytest.mark.parametrize("name", ["contiguous", "chunked"])
+    def test_downcast(self, event_datasets, name):
+        f, energy, _ = event_datasets
+        accessor = EventAccessor(f[name], dtype="float32")
+
+        block = accessor.read(0, 10_000)
+        assert block.dtype == np.float32
+        assert np.array_equal(block, energy[:10_000].astype(np.float32))
+
+    def test_histogram_with_downcast_times(self, event_datasets):
+        f, energy, time = event_datasets
+        mask = (time > 0) & (time < 500)
+        expected = rebin.nxs_rebin(energy[mask], 2048, (0, 8000))
+
+        # integer event times are unchanged by converting to uint32
+        x, y = event_binning.histogram_events(
+            EventAccessor(f["contiguous"]),
+            2048,
+            (0, 8000),
+            time=EventAccessor(f["time"], dtype="uint32"),
+            time_window=(0, 500),
+            block_size=5000,
+        )
+
+        assert np.array_equal(x, expected[0])
+        assert np.array_equal(y, expected[1])
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from EVA.core.physics import event_binning, rebin
+from tests.system.conftest import ProgressRecorder, make_nexus_run
+
+
+class TestEventBinning:
+    @pytest.mark.parametrize("time_window", [None, (0, 500), (500, 20000), (0, None)])
+    def test_streamed_histogram_matches_nxs_rebin(self, event_file, time_window):
+        energy, time = event_file["energy"], event_file["time"]
+
+        mask = np.ones(len(energy), dtype=bool)
+        if time_window is not None:
+            low, high = time_window
+            mask &= time[:] > low
+            if high is not None:
+                mask &= time[:] < high
+
+        expected_x, expected_y = rebin.nxs_rebin(energy[:][mask], 2048, (0, 8000))
+
+        progress = ProgressRecorder()
+        x, y = event_binning.histogram_events(
+            energy,
+            2048,
+            (0, 8000),
+            time=time,
+            time_window=time_window,
+            block_size=10_000,
+            progress_callback=progress,
+        )
+
+        assert np.array_equal(x, expected_x)
+        assert np.array_equal(y, expected_y), "streamed histogram differs from full"
+
+        # blocks are aligned to whole chunks, last progress report is for all events
+        assert progress.emitted[0]["current"] % event_file["energy"].chunks[0] == 0
+        assert progress.emitted[-1] == {"current": len(energy), "total": len(energy)}
+
+    def test_manual_modes_binned_from_events(self, event_file):
+        run = make_nexus_run(event_file)
+        energy, time = event_file["energy"][:], event_file["time"][:]
+
+        run.set_corrections(normalisation="none", bin_rate=1)
+        expected = rebin.nxs_rebin(energy[(time > 0) & (time < 500)], 8192, (0, 8000))
+        assert np.array_equal(run.data["GE1"].y, expected[1])
+
+        run.set_corrections(plot_mode="Manual Delayed Spectrum")
+        expected = rebin.nxs_rebin(
+            energy[(time > 500) & (time < 20000)], 8192, (0, 8000)
+        )
+        assert np.array_equal(run.data["GE1"].y, expected[1])
+
+    def test_mode_switches_reuse_single_pass(self, event_file):
+        run = make_nexus_run(event_file)
+        energy, time = event_file["energy"][:], event_file["time"][:]
+
+        run.set_corrections(normalisation="none", bin_rate=1)
+        histograms = run._raw["GE1"].event_histograms
+
+        # switching mode and coarsening must not go through the events again
+        run.set_corrections(plot_mode="Efficiency Spectrum", bin_rate=2)
+        expected = rebin.nxs_rebin(energy[time > 0], 4096, (0, 8000))
+        assert np.allclose(run.data["GE1"].x, expected[0])
+        assert np.array_equal(run.data["GE1"].y, expected[1])
+
+        run.set_corrections(plot_mode="Time Plot", bin_rate=1)
+        expected = rebin.nxs_rebin(time[(time > 0) & (time < 2000)], 100, (0, 2000))
+        assert np.array_equal(run.data["GE1"].y, expected[1])
+
+        assert run._raw["GE1"].event_histograms is histograms, (
+            "event data was histogrammed more than once"
+        )
+
+        # changing the time windows requires a new pass
+        run.set_corrections(
+            plot_mode="Manual Prompt Spectrum", prompt_limit=800, bin_rate=2
+        )
+        assert run._raw["GE1"].event_histograms is not histograms
+        expected = rebin.nxs_rebin(energy[(time > 0) & (time < 800)], 4096, (0, 8000))
+        assert np.array_equal(run.data["GE1"].y, expected[1])
+
+    def test_non_integer_bin_rate_uses_stored_histograms(self, event_file):
+        run = make_nexus_run(event_file)
+        time = event_file["time"][:]
+
+        run.set_corrections(normalisation="none", bin_rate=1)
+        histograms = run._raw["GE1"].event_histograms
+
+        run.set_corrections(bin_rate=2.5)
+
+        assert run._raw["GE1"].event_histograms is histograms
+        assert len(run.data["GE1"].y) == int(8192 / 2.5)
+        assert np.isclose(
+            np.sum(run.data["GE1"].y), np.sum((time > 0) & (time < 500))
+        ), "counts were lost when resampling stored histogram"
+
+    def test_detectors_histogrammed_in_parallel(self, event_file):
+        detectors = ("GE1", "GE2", "GE3", "GE4")
+        run = make_nexus_run(event_file, detectors)
+        energy, time = event_file["energy"][:], event_file["time"][:]
+        progress = ProgressRecorder()
+
+        run.set_corrections(normalisation="none", progress_callback=progress)
+
+        expected = rebin.nxs_rebin(energy[(time > 0) & (time < 500)], 8192, (0, 8000))
+        for detector in detectors:
+            assert np.array_equal(run.data[detector].y, expected[1])
+
+        # progress of all detectors is combined into one report
+        assert progress.emitted[-1]["current"] == progress.emitted[-1]["total"]
+        assert max(p["total"] for p in progress.emitted) == 4 * len(energy)
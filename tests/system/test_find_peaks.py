@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from EVA.core.peak_finding import find_peaks
+
+
+def make_spectrum(n_bins=2000, centres=(400, 900, 1500), seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 8000, n_bins)
+    y = 50 * np.exp(-x / 3000)
+    for centre in centres:
+        y = y + 200 * np.exp(-0.5 * ((np.arange(n_bins) - centre) / 3) ** 2)
+    return x, rng.poisson(y).astype(float)
+
+
+def make_high_background_spectrum(n_bins=4000, seed=None):
+    # germanium-like spectrum - steeply falling background with a Compton edge, and peaks on top of it
+    i = np.arange(n_bins)
+    background = 3000 * np.exp(-i / 800) + 300 + 200 / (1 + np.exp((i - 2500) / 8))
+    centres = np.array([300, 800, 1400, 2000, 2490, 3200])
+    y = background.copy()
+    for centre in centres:
+        y += 3 * np.sqrt(background[centre]) * np.exp(-0.5 * ((i - centre) / 3) ** 2)
+
+    if seed is not None:
+        y = np.random.default_rng(seed).poisson(y).astype(float)
+
+    return i.astype(float), y, background, centres
+
+
+def convolve_background(y):
+    # the background of Keith's peak finder, as it was calculated with np.convolve()
+    def meanfilter(data, size):
+        return np.convolve(data, np.ones(size) / size, mode="same")
+
+    rough_base = y
+    for i in range(10):
+        rough_base = meanfilter(rough_base, 20)
+
+    clipped = np.where(y - rough_base > 25, np.nan, y)
+    interpd = pd.Series(clipped).interpolate().bfill().to_numpy()
+
+    rough_base = interpd
+    for i in range(10):
+        rough_base = meanfilter(rough_base, 10)
+
+    return meanfilter(y - rough_base, 2)
+
+
+class TestFindPeaks:
+    @pytest.mark.parametrize("size", [2, 9, 10, 20])
+    def test_meanfilter_matches_convolve(self, size):
+        _, y = make_spectrum()
+        expected = np.convolve(y, np.ones(size) / size, mode="same")
+
+        assert np.allclose(find_peaks.meanfilter(y, size), expected)
+
+        # every row of a stack is filtered the same
+        stack = find_peaks.meanfilter(np.stack([y, 2 * y]), size)
+        assert np.allclose(stack[0], expected)
+        assert np.allclose(stack[1], 2 * expected)
+
+    def test_interpolate_nans(self):
+        data = np.array(
+            [
+                [np.nan, 1, np.nan, 3, np.nan, np.nan],
+                [0, np.nan, np.nan, 6, 7, 8],
+            ]
+        )
+
+        result = find_peaks.interpolate_nans(data)
+        assert np.array_equal(result, [[1, 1, 2, 3, 3, 3], [0, 2, 4, 6, 7, 8]])
+
+        # interpolating along the other axis gives the transpose
+        assert np.array_equal(find_peaks.interpolate_nans(data.T, axis=0), result.T)
+
+    def test_remove_background_matches_convolve(self):
+        _, y = make_spectrum()
+
+        assert np.allclose(find_peaks.remove_background(y), convolve_background(y))
+
+    def test_find_peaks_batch(self):
+        spectra = [make_spectrum(seed=seed) for seed in range(3)]
+        x = spectra[0][0]
+        y = np.stack([spectrum[1] for spectrum in spectra])
+
+        result = find_peaks.find_peaks_batch(x, y, 50, 0, 10)
+
+        assert len(result) == 3
+        for (peaks, positions), spectrum in zip(result, spectra):
+            single_peaks, single_positions = find_peaks.findpeak_with_bck_removed(
+                *spectrum, 50, 0, 10
+            )
+            assert np.array_equal(peaks[0], single_peaks[0])
+            assert np.array_equal(positions, single_positions)
+
+            # peaks are found at the centres of the lines
+            assert len(peaks[0]) == 3
+            assert np.all(np.abs(peaks[0] - [400, 900, 1500]) <= 1)
+
+    def test_find_peaks_batch_without_background(self):
+        x, y = make_spectrum()
+
+        (peaks, positions), *_ = find_peaks.find_peaks_batch(
+            x, y[np.newaxis], 50, 0, 10, background=None
+        )
+        single_peaks, single_positions = find_peaks.findpeaks(x, y, 50, 0, 10)
+
+        assert np.array_equal(peaks[0], single_peaks[0])
+        assert np.array_equal(positions, single_positions)
+
+    def test_find_peaks_in_spectra(self):
+        # spectra of different lengths are stacked separately, and results are returned in order
+        spectra = [
+            make_spectrum(2000, seed=0),
+            make_spectrum(1000, centres=(300, 700), seed=1),
+            make_spectrum(2000, seed=2),
+        ]
+
+        result = find_peaks.find_peaks_in_spectra(spectra, 50, 0, 10)
+
+        assert len(result) == 3
+        assert [len(peaks[0]) for peaks, _ in result] == [3, 2, 3]
+        for (peaks, positions), spectrum in zip(result, spectra):
+            single_peaks, single_positions = find_peaks.findpeak_with_bck_removed(
+                *spectrum, 50, 0, 10
+            )
+            assert np.array_equal(peaks[0], single_peaks[0])
+            assert np.array_equal(positions, single_positions)
+
+    @pytest.mark.parametrize("method", ["snip", "rolling ball"])
+    def test_clipping_background(self, method):
+        x, y, background, centres = make_high_background_spectrum()
+        estimate = find_peaks.background_estimators[method](y)
+
+        # the background is followed between the peaks, and the peaks are left above it
+        between = np.ones(len(y), dtype=bool)
+        for centre in centres:
+            between[centre - 30 : centre + 30] = False
+        between[:30] = False
+
+        assert np.allclose(estimate[between], background[between], rtol=0.05)
+        assert np.all(y[centres] - estimate[centres] > 2 * np.sqrt(background[centres]))
+
+        # every spectrum in a stack is estimated separately
+        stack = find_peaks.background_estimators[method](np.stack([y, 2 * y]))
+        assert np.allclose(stack[0], estimate)
+
+    @pytest.mark.parametrize("method", ["snip", "rolling ball"])
+    def test_clipping_background_recall(self, method):
+        # on a high background, the clipping estimators find at least as many peaks as the mean filter, with fewer
+        # false peaks
+        spectra = [make_high_background_spectrum(seed=seed) for seed in range(5)]
+        x = spectra[0][0]
+        y = np.stack([spectrum[1] for spectrum in spectra])
+
+        def count_peaks(background):
+            found = 0
+            false = 0
+            for (peaks, _), spectrum in zip(
+                find_peaks.find_peaks_batch(x, y, 120, None, 5, background), spectra
+            ):
+                distance = np.abs(peaks[0][:, np.newaxis] - spectrum[3])
+                found += np.count_nonzero(distance.min(axis=0) <= 2)
+                false += np.count_nonzero(distance.min(axis=1) > 2)
+            return found, false
+
+        found, false = count_peaks(method)
+        mean_found, mean_false = count_peaks("mean filter")
+
+        assert found >= mean_found
+        assert false < mean_false
+
+    def test_unknown_background(self):
+        _, y = make_spectrum()
+
+        with pytest.raises(ValueError):
+            find_peaks.remove_background(y, "unknown")
@@ -1,5 +1,7 @@
+import numpy as np
 from pytestqt.plugin import qapp
 from EVA.core.app import get_app
+from EVA.core.data_loading import load_gamma_db
 
 
 class TestGammaDatabaseLoad:
@@ -15,3 +17,69 @@ class TestGammaDatabaseLoad:
         gammas = app.gamma_database
 
         assert len(gammas) == 118, "unexpected number of elements were loaded"
+
+    def test_gamma_db_sorted_by_energy(self, qapp):
+        gammas = get_app().gamma_database
+
+        assert gammas.size == 274570, "unexpected number of gamma energies were stored"
+        assert np.all(np.diff(gammas.energies) >= 0), (
+            "gamma energies are not sorted in the columnar database"
+        )
+
+    def test_isotope_lookup_matches_element_data(self, qapp):
+        gammas = get_app().gamma_database
+
+        expected = [row for row in gammas["Eu"] if row[0].strip() == "152Eu"]
+        positions = gammas.isotope_positions("152Eu")
+        found = [
+            (match["isotope"], match["energy"], match["intensity"], match["lifetime"])
+            for match in gammas.to_dicts(positions)
+        ]
+
+        assert len(expected) > 0
+        assert found == expected, "isotope lookup did not return all transitions"
+
+    def test_gamma_db_cache_round_trip(self, qapp, tmp_path):
+        gammas = get_app().gamma_database
+        level_files = load_gamma_db.get_gamma_level_files()
+        cache_path = str(tmp_path / "gamma_cache.npz")
+
+        load_gamma_db.save_gamma_cache(cache_path, gammas, level_files)
+        cached = load_gamma_db.load_gamma_cache(cache_path, level_files)
+
+        assert cached is not None, "valid gamma database cache was not loaded"
+        assert np.array_equal(cached.energies, gammas.energies)
+        assert cached["Eu"] == gammas["Eu"]
+        assert np.array_equal(
+            cached.isotope_positions("152Eu"), gammas.isotope_positions("152Eu")
+        )
+
+        # cache must be rejected if the level files it was built from are different
+        assert load_gamma_db.load_gamma_cache(cache_path, level_files[:-1]) is None
+
+    def test_gamma_db_cache_mtimes_updated(self, qapp, tmp_path, monkeypatch):
+        gammas = get_app().gamma_database
+        level_files = load_gamma_db.get_gamma_level_files()[:3]
+        cache_path = str(tmp_path / "gamma_cache.npz")
+        load_gamma_db.save_gamma_cache(cache_path, gammas, level_files)
+
+        # pretend the level files were checked out again - same contents, different modification times
+        with np.load(cache_path) as cache:
+            arrays = dict(cache)
+        arrays["source_mtimes"] = arrays["source_mtimes"] - 1
+        np.savez(cache_path, **arrays)
+
+        hashed = []
+        hash_file = load_gamma_db._hash_file
+        monkeypatch.setattr(
+            load_gamma_db,
+            "_hash_file",
+            lambda filename: hashed.append(filename) or hash_file(filename),
+        )
+
+        assert load_gamma_db.load_gamma_cache(cache_path, level_files) is not None
+        assert hashed == level_files
+
+        # the new modification times are stored, so the files are not hashed again
+        assert load_gamma_db.load_gamma_cache(cache_path, level_files) is not None
+        assert hashed == level_files
@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pytest
+
+from EVA.core.data_loading.histogram_cache import HistogramCache
+from EVA.core.physics import event_binning
+from tests.system.conftest import make_nexus_run
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HistogramCache(str(tmp_path / "cache"), max_bytes=10 * 1024**2)
+
+
+def cached_run(event_file, cache):
+    run = make_nexus_run(event_file)
+    run.histogram_cache = cache
+    return run
+
+
+class TestHistogramCache:
+    def test_reopened_run_skips_event_pass(self, event_file, cache, monkeypatch):
+        run = cached_run(event_file, cache)
+        run.set_corrections(normalisation="none", bin_rate=1)
+        expected = run.data["GE1"].y.copy()
+        assert len(os.listdir(cache.directory)) == 1
+
+        def fail(*args, **kwargs):
+            raise AssertionError("events histogrammed again")
+
+        monkeypatch.setattr(event_binning, "histogram_event_windows", fail)
+
+        reopened = cached_run(event_file, cache)
+        reopened.set_corrections(normalisation="none", bin_rate=1)
+        assert np.array_equal(reopened.data["GE1"].y, expected)
+
+        # other plot modes come from the same cached histograms
+        for mode in ["Manual Delayed Spectrum", "Efficiency Spectrum", "Time Plot"]:
+            run.set_corrections(plot_mode=mode)
+            reopened.set_corrections(plot_mode=mode)
+            assert np.array_equal(reopened.data["GE1"].x, run.data["GE1"].x)
+            assert np.array_equal(reopened.data["GE1"].y, run.data["GE1"].y)
+
+    def test_key_covers_binning(self, event_file):
+        energy, time = event_file["energy"], event_file["time"]
+        windows = [(0, 500), (500, 20000), (0, None)]
+
+        key = HistogramCache.make_key(
+            energy, time, windows, 8192, (0, 8000), 100, (0, 2000)
+        )
+        assert key == HistogramCache.make_key(
+            energy, time, list(windows), 8192, (0.0, 8000.0), 100, (0, 2000)
+        )
+        assert key != HistogramCache.make_key(
+            energy,
+            time,
+            [(0, 600), (600, 20000), (0, None)],
+            8192,
+            (0, 8000),
+            100,
+            (0, 2000),
+        )
+        assert key != HistogramCache.make_key(
+            energy, time, windows, 4096, (0, 8000), 100, (0, 2000)
+        )
+
+        # arrays in memory are not cached
+        assert (
+            HistogramCache.make_key(
+                energy[:], time[:], windows, 8192, (0, 8000), 100, (0, 2000)
+            )
+            is None
+        )
+
+    def test_least_recently_used_evicted(self, event_file, cache):
+        run = cached_run(event_file, cache)
+        run.set_corrections(normalisation="none", bin_rate=1)
+        (first,) = os.listdir(cache.directory)
+        file_size = os.path.getsize(os.path.join(cache.directory, first))
+
+        # room for two sets of histograms
+        cache.max_bytes = int(file_size * 2.5)
+        for prompt_limit in [600, 700]:
+            run.set_corrections(
+                plot_mode="Manual Prompt Spectrum", prompt_limit=prompt_limit
+            )
+
+            # keep the first histograms in use
+            os.utime(os.path.join(cache.directory, first), ns=(0, 2**62))
+
+        files = os.listdir(cache.directory)
+        assert len(files) == 2
+        assert first in files, "most recently used histograms were evicted"
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from EVA.core.data_loading import load_data
 
@@ -39,3 +41,37 @@ class LoadComment(unittest.TestCase):
         rtnstr, flag = load_data.load_comment_brni(RunNum, directory)
         self.assertEqual(flag, 1, "did return flag")
         self.assertEqual(rtnstr, [" ", " ", " ", " "], "didnt load comment file")
+
+    def test_loadcomment_exact_run_number(self):
+        # "Run 26" is a prefix of "Run 2628", but run 26 is not in the file
+        rtnstr, flag = load_data.load_comment_brni("26", "./test_data/")
+        self.assertEqual(flag, 1, "matched prefix of another run number")
+        self.assertEqual(rtnstr, [" ", " ", " ", " "])
+
+    def test_loadcomment_file_changed(self):
+        entry = (
+            "Run {}\nStart Time : a\nEnd   Time : b\nNumber of Events  : {}\n"
+            "Number of Records : 1 / 1\nComments : c\n"
+            "-----------------------------------\n"
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "Comment.dat")
+            with open(path, "w") as f:
+                f.write(entry.format(1, 10))
+
+            self.assertEqual(
+                load_data.load_comment_brni("1", directory)[0][2],
+                "Number of Events  : 10\n",
+            )
+            self.assertEqual(load_data.load_comment_brni("2", directory)[1], 1)
+
+            # new run appended during experiment
+            with open(path, "a") as f:
+                f.write(entry.format(2, 20))
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+            rtnstr, flag = load_data.load_comment_brni("2", directory)
+            self.assertEqual(flag, 0, "comment file was not read again after changing")
+            self.assertEqual(rtnstr[2], "Number of Events  : 20\n")
@@ -4,6 +4,7 @@ import pytest
 import numpy as np
 from EVA.core.app import get_config
 from EVA.core.data_loading import load_data
+from tests.system.conftest import ProgressRecorder, make_nexus_file, make_nexus_run
 
 # Run containing all data, run with one detector missing, invalid run
 brni_run_num_list = ["2630", "3064", "0"]
@@ -143,3 +144,60 @@ class TestLoadRun:
             for i, (detector, spectrum) in enumerate(run._raw.items()):
                 assert np.array_equal(spectrum.x, delayed_data[i][0])
                 assert np.array_equal(spectrum.y, delayed_data[i][1])
+
+    def test_nxs_detector_has_data(self, tmp_path):
+        path = make_nexus_file(tmp_path / "detectors.nxs", n_events=120, detectors=3)
+
+        with h5py.File(path, "r+") as f:
+            # no prompt events or efficiency histogram
+            f["raw_data_1/detector_2_energyA/num_events"][()] = 0
+            f["raw_data_1/detector_2_energyHist/energy"] = np.zeros(16)
+            # prompt counts without the number of events
+            del f["raw_data_1/detector_3_energyA/num_events"]
+
+            assert load_data.nxs_detector_has_data(f, 1)
+            assert not load_data.nxs_detector_has_data(f, 2)
+            assert load_data.nxs_detector_has_data(f, 3)
+
+            with pytest.raises(KeyError):
+                load_data.nxs_detector_has_data(f, 4)
+
+    def test_load_run_reports_progress(self, qapp, load_settings):
+        config = get_config()
+        progress = ProgressRecorder()
+
+        run, flags = load_data.load_run(
+            "2630",
+            config["general"]["working_directory"],
+            progress_callback=progress,
+            **load_settings,
+        )
+
+        assert flags["no_files_found"] == 0
+        stages = [p["stage"] for p in progress.emitted]
+        assert "Reading metadata" in stages
+        assert "Reading GE4" in stages
+        assert "Opening file" not in stages  # only the Biriani loader is used
+
+    def test_load_run_cancelled(self, qapp, load_settings):
+        with pytest.raises(load_data.LoadCancelled):
+            load_data.load_run(
+                "2630",
+                get_config()["general"]["working_directory"],
+                is_cancelled=lambda: True,
+                **load_settings,
+            )
+
+    def test_event_histogramming_cancelled(self, event_file):
+        run = make_nexus_run(event_file, ("GE1", "GE2"))
+        recorder = ProgressRecorder()
+
+        # cancel as soon as the first detector has reported progress
+        progress = load_data.LoadProgress(
+            recorder, is_cancelled=lambda: len(recorder.emitted) > 0
+        )
+
+        with pytest.raises(load_data.LoadCancelled):
+            run.set_corrections(normalisation="none", progress_callback=progress)
+
+        assert len(recorder.emitted) == 1, "histogramming continued after cancelling"
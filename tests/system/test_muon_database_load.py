@@ -29,3 +29,23 @@ class TestMuonDatabaseLoad:
         assert len(db["All energies"]) == 79, (
             "Incorrect number of elements loaded from legacy muonic xray JSON file"
         )
+
+    def test_databases_loaded_once(self, qapp):
+        app = get_app()
+        app.load_all_databases()
+
+        assert app.legacy_muon_database is app.legacy_muon_database, (
+            "database was loaded more than once"
+        )
+        assert app.gamma_database is app.gamma_database, (
+            "database was loaded more than once"
+        )
+
+    def test_muon_database_resolved_from_config(self, qapp):
+        app = get_app()
+        app.use_legacy_muon_db()
+        app.reset()
+
+        assert app.muon_database is app.mudirac_muon_database, (
+            "muon database was not reset to the database selected in config"
+        )
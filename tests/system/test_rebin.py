@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from EVA.core.physics import rebin
+from EVA.core.physics.histogram_pyramid import HistogramPyramid
+
+
+def unhistogram_rebin(x0, y0, bin_size, bin_range=None):
+    """Reference implementation which rebins by recreating every count, as numpy_rebin used to."""
+    energies = np.array([x for i, x in enumerate(x0) for _ in range(int(y0[i]))])
+    n_bins = int(len(x0) / bin_size)
+
+    hist, bin_edges = np.histogram(energies, n_bins, range=bin_range)
+    bin_centres = bin_edges[:-1] + (bin_edges[1] - bin_edges[0]) / 2
+    return bin_centres, hist / bin_size
+
+
+@pytest.fixture
+def spectrum():
+    rng = np.random.default_rng(0)
+    x0 = np.linspace(0.5, 4000.5, 2048)
+    y0 = rng.poisson(5, len(x0)).astype(float)
+    y0[:10] = 0
+    return x0, y0
+
+
+class TestRebin:
+    @pytest.mark.parametrize("bin_size", [1, 2, 3, 1.5, 7.3])
+    @pytest.mark.parametrize("bin_range", [None, (100.0, 3000.0)])
+    def test_numpy_rebin_matches_unhistogrammed(self, spectrum, bin_size, bin_range):
+        x0, y0 = spectrum
+
+        expected_x, expected_y = unhistogram_rebin(x0, y0, bin_size, bin_range)
+        x, y = rebin.numpy_rebin(x0, y0, bin_size, bin_range)
+
+        assert np.array_equal(x, expected_x)
+        assert np.allclose(y, expected_y, rtol=0, atol=1e-12)
+
+    def test_numpy_rebin_keeps_fractional_counts(self, spectrum):
+        x0, y0 = spectrum
+        normalised = y0 / y0.sum()
+
+        _, y = rebin.numpy_rebin(x0, normalised, 2)
+
+        assert np.isclose(np.sum(y) * 2, 1), "fractional counts were dropped"
+
+    def test_numpy_rebin_interpolates_below_one(self, spectrum):
+        x0, y0 = spectrum
+
+        x, y = rebin.numpy_rebin(x0, y0, 0.5)
+
+        assert len(x) == 2 * len(x0)
+        assert np.array_equal(y, np.interp(x, x0, y0))
+
+    def test_numpy_rebin_independent_of_counts(self, spectrum):
+        # rebinning ~10^9 counts gives the same result as rebinning fewer counts and scaling, which would take far too
+        # long (and too much memory) if every count was recreated
+        x0, y0 = spectrum
+        scale = 1e9 / y0.sum()
+
+        expected_x, expected_y = unhistogram_rebin(x0, y0, 4)
+        x, large = rebin.numpy_rebin(x0, y0 * scale, 4)
+
+        assert np.array_equal(x, expected_x)
+        assert np.allclose(large, expected_y * scale, rtol=1e-12, atol=0)
+
+    def test_overlap_rebin_conserves_counts(self, spectrum):
+        x0, y0 = spectrum
+        bin_edges = np.linspace(
+            -1, 4002, 700
+        )  # output bins ~2.9x wider than input bins
+
+        x, y = rebin.overlap_rebin(x0, y0, bin_edges)
+
+        assert len(x) == len(bin_edges) - 1
+        assert np.isclose(np.sum(y), np.sum(y0))
+
+        # flat spectrum stays flat, without the aliasing seen when whole input bins are assigned to output bins
+        _, flat = rebin.overlap_rebin(x0, np.ones(len(x0)), bin_edges[1:-1])
+        assert np.allclose(flat, flat[0])
+
+    def test_pyramid_levels_sum_neighbouring_bins(self, spectrum):
+        x0, y0 = spectrum
+        pyramid = HistogramPyramid(x0, y0)
+
+        for factor in [2, 8, 32]:
+            expected_x, expected_y = rebin.simple_rebin(x0, y0, factor)
+            x, y = pyramid.level(factor)
+            assert np.allclose(x, expected_x)
+            assert np.array_equal(y, expected_y)
+
+        assert sorted(pyramid.levels) == [1, 2, 8, 32], "levels were not kept"
+        assert pyramid.level(3) is None  # 3 does not divide 2048 bins
+
+    def test_pyramid_rebin_from_nearest_level(self, spectrum):
+        x0, y0 = spectrum
+        pyramid = HistogramPyramid(x0, y0)
+        bin_range = (x0[0] - 1, x0[-1] + 1)
+
+        # exact levels are returned as they are
+        assert pyramid.rebin(512, bin_range) is pyramid.level(4)
+
+        # other bin numbers are resampled from the nearest finer level
+        assert pyramid.nearest_level(2048 / 300) == 4
+        x, y = pyramid.rebin(300, bin_range)
+        assert len(x) == 300
+        assert np.isclose(np.sum(y), np.sum(y0))
+
+        assert pyramid.rebin(4096, bin_range) is None
@@ -0,0 +1,79 @@
+import threading
+import numpy as np
+
+from EVA.core.data_loading.run_cache import RunCache, estimate_nbytes, make_run_key
+from EVA.core.data_structures.spectrum import Spectrum
+
+
+class FakeRun:
+    def __init__(self, n: int):
+        self.data = {"GE1": Spectrum("GE1", "1", x=np.zeros(n), y=np.zeros(n))}
+
+
+class TestRunCache:
+    def test_estimate_nbytes_counts_arrays_once(self):
+        run = FakeRun(1000)
+        run.raw = {"GE1": run.data["GE1"]}  # same spectrum referred to twice
+
+        assert estimate_nbytes(run) == 2 * 1000 * 8
+
+    def test_make_run_key_ignores_order_of_settings(self):
+        settings = {"working_directory": "./data", "binning": 2, "plot_mode": "a"}
+        reordered = {"plot_mode": "a", "binning": 2, "working_directory": "data"}
+
+        assert make_run_key("1", settings) == make_run_key(1, reordered)
+        assert make_run_key("1", settings) != make_run_key(
+            "1", {**settings, "binning": 4}
+        )
+
+    def test_least_recently_used_run_removed(self):
+        run_size = estimate_nbytes(FakeRun(1000))
+        cache = RunCache(max_bytes=int(2.5 * run_size))
+
+        a, b, c, d = [
+            make_run_key(run_num, {"working_directory": "."}) for run_num in "abcd"
+        ]
+
+        for key in [a, b]:
+            cache.put(key, FakeRun(1000), {})
+
+        cache.get(a)  # b is now the least recently used
+        cache.put(c, FakeRun(1000), {})
+
+        assert a in cache and c in cache
+        assert b not in cache
+        assert cache.nbytes <= cache.max_bytes
+
+        # a run larger than the budget is still kept on its own
+        cache.put(d, FakeRun(10_000), {})
+        assert len(cache) == 1 and d in cache
+
+    def test_claimed_run_loaded_once(self):
+        cache = RunCache(max_bytes=1 << 30)
+        run = FakeRun(10)
+
+        assert cache.claim("a")
+        assert not cache.claim("a"), "run was claimed twice"
+
+        def load():
+            cache.put("a", run, {})
+            cache.release("a")
+
+        thread = threading.Timer(0.05, load)
+        thread.start()
+
+        cache.wait("a", timeout=5)
+        assert cache.pop("a") == (run, {})
+        assert cache.claim("a"), "run could not be loaded again once removed"
+        thread.join()
+
+    def test_wait_cancelled(self):
+        cache = RunCache(max_bytes=1 << 30)
+        assert cache.claim("a")
+
+        # the run is never released - waiting stops once cancelled
+        assert not cache.wait("a", timeout=5, is_cancelled=lambda: True)
+        assert cache.wait("a", timeout=0.2, is_cancelled=lambda: False)
+
+        cache.release("a")
+        assert cache.wait("a", is_cancelled=lambda: True)
@@ -5,6 +5,7 @@ from pytestqt.plugin import qapp
 
 from EVA.core.data_loading import load_data
 from EVA.core.app import get_config
+from tests.system.conftest import make_nexus_run
 
 
 # Which detectors to use for each test
@@ -65,3 +66,111 @@ class TestRunCorrections:
             assert np.array_equal(corrected, run.data[detector].x), (
                 f"energy correction failed when correcting {' and '.join(e_corr_which)}"
             )
+
+    def test_nexus_normalisation_reuses_binned_data(self, qapp, event_file):
+        run = make_nexus_run(event_file)
+        updates = []
+        run.corrections_updated_s.connect(lambda: updates.append(True))
+
+        run.set_corrections(normalisation="none", bin_rate=2)
+        binned = run._binned_spectra
+        y = run.data["GE1"].y
+
+        run.set_corrections(normalisation="counts")
+        assert run._binned_spectra is binned, "data was rebinned for normalisation"
+        assert np.allclose(run.data["GE1"].y, y / np.sum(y) * 1e5)
+
+        # nothing changed, so no replot is needed
+        run.set_corrections(normalisation="counts")
+        assert len(updates) == 2
+
+    def test_nexus_energy_correction_of_event_data(self, qapp, event_file):
+        run = make_nexus_run(event_file)
+
+        run.set_corrections(normalisation="none", bin_rate=2)
+        x, y = run.data["GE1"].x, run.data["GE1"].y
+
+        e_corr = {"GE1": {"e_corr_coeffs": [1.5, -10], "use_e_corr": True}}
+        run.set_corrections(energy_corrections=e_corr)
+
+        assert np.allclose(run.data["GE1"].x, x * 1.5 - 10)
+        assert np.array_equal(run.data["GE1"].y, y)
+
+    def test_corrections_reuse_buffers(self, qapp, load_settings):
+        run, _ = load_data.load_run(
+            "2630",
+            get_config()["general"]["working_directory"],
+            **load_settings,
+        )
+        raw = run.get_raw()
+        e_corr = {"GE1": {"e_corr_coeffs": [1.5, -10], "use_e_corr": True}}
+
+        run.set_corrections(
+            energy_corrections=e_corr, normalisation="counts", bin_rate=1
+        )
+        x, y = run.data["GE1"].x, run.data["GE1"].y
+        spectrum = run.get_spectrum("GE1")
+        assert np.array_equal(x, raw["GE1"].x * 1.5 - 10)
+        assert np.array_equal(y, raw["GE1"].y / np.sum(raw["GE1"].y) * 1e5)
+
+        # corrected again into the same arrays, raw data is never changed
+        run.set_corrections(
+            energy_corrections={"GE1": {"e_corr_coeffs": [2, 0], "use_e_corr": True}}
+        )
+        assert run.data["GE1"].x is x and run.data["GE1"].y is y
+        assert np.array_equal(x, raw["GE1"].x * 2)
+
+        # copies of the corrected data are not overwritten
+        assert np.array_equal(spectrum.x, raw["GE1"].x * 1.5 - 10)
+        assert np.array_equal(spectrum.y, raw["GE1"].y / np.sum(raw["GE1"].y) * 1e5)
+        for detector, spectrum in run._raw.items():
+            assert np.array_equal(spectrum.x, raw[detector].x)
+            assert np.array_equal(spectrum.y, raw[detector].y)
+
+    def test_polynomial_energy_correction(self, qapp, load_settings):
+        run, _ = load_data.load_run(
+            "2630",
+            get_config()["general"]["working_directory"],
+            **load_settings,
+        )
+        raw = run.get_raw()
+        e_corr = {
+            "GE1": {"e_corr_coeffs": [1e-6, 1.01, -2], "use_e_corr": True},
+            "GE2": {
+                "e_corr_model": "piecewise",
+                "e_corr_coeffs": [1, 0],
+                "e_corr_points": [[-10, -10], [1000, 1010], [10000, 10020]],
+                "use_e_corr": True,
+            },
+        }
+
+        run.set_corrections(energy_corrections=e_corr)
+
+        x = raw["GE1"].x
+        assert np.allclose(run.data["GE1"].x, 1e-6 * x**2 + 1.01 * x - 2)
+        assert np.allclose(
+            run.data["GE2"].x,
+            np.interp(raw["GE2"].x, [-10, 1000, 10000], [-10, 1010, 10020]),
+        )
+
+    def test_nexus_calibration_curves_are_cached(self, qapp, event_file):
+        e_corr = {
+            "GE1": {"e_corr_coeffs": [1e-5, 1, 0], "use_e_corr": True},
+            "GE2": {"e_corr_coeffs": [1.5, -10], "use_e_corr": True},
+        }
+        run = make_nexus_run(event_file, ("GE1", "GE2"))
+        run.set_corrections(energy_corrections=e_corr, normalisation="none")
+        curve = run.data["GE1"].x
+
+        # changing the calibration of another detector does not evaluate the non-linear curve again
+        e_corr = e_corr | {"GE2": {"e_corr_coeffs": [2, 0], "use_e_corr": True}}
+        run.set_corrections(energy_corrections=e_corr)
+        assert run.data["GE1"].x is curve
+        assert np.allclose(run.data["GE2"].x, 2 * run._raw["GE2"].x)
+
+        # a new binning is calibrated again
+        run.set_corrections(bin_rate=2)
+        assert run.data["GE1"].x is not curve
+        assert np.allclose(
+            run.data["GE1"].x, np.polyval([1e-5, 1, 0], run._raw["GE1"].x)
+        )
@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from EVA.core.app import get_config
+from EVA.core.data_loading import load_data, run_index
+from EVA.core.data_loading.run_index import RunIndex
+
+
+@pytest.fixture
+def run_dir(tmp_path):
+    for name in [
+        "ral02630.rooth2099.dat",
+        "ral02630.rooth3099.dat",
+        "ral03064.rooth5099.dat",
+        "ral03064.rooth9999.dat",  # not a detector channel
+        "MUX00000780.nxs",
+        "MUX0000000780.nxs",
+        "Comment.dat",
+    ]:
+        (tmp_path / name).touch()
+    return tmp_path
+
+
+class TestRunIndex:
+    def test_files_indexed(self, run_dir):
+        index = RunIndex(str(run_dir))
+
+        brni_files, nxs_file = index.find("2630")
+        assert brni_files == {
+            "GE1": os.path.join(str(run_dir), "ral02630.rooth2099.dat"),
+            "GE2": os.path.join(str(run_dir), "ral02630.rooth3099.dat"),
+        }
+        assert nxs_file is None
+
+        assert index.find("3064") == (
+            {"GE4": os.path.join(str(run_dir), "ral03064.rooth5099.dat")},
+            None,
+        )
+
+        # file with the fewest digits is used, as when searching for the file by name
+        assert index.find("780") == (
+            {},
+            os.path.join(str(run_dir), "MUX00000780.nxs"),
+        )
+        assert index.find("1") == ({}, None)
+
+    def test_index_refreshed(self, run_dir):
+        index = RunIndex(str(run_dir))
+        assert index.find("3050") == ({}, None)
+
+        (run_dir / "ral03050.rooth4099.dat").touch()
+        (run_dir / "MUX00000780.nxs").unlink()
+
+        assert index.find("3050")[0] == {
+            "GE3": os.path.join(str(run_dir), "ral03050.rooth4099.dat")
+        }
+        index.refresh(force=True)
+        assert index.nxs_file("780") == os.path.join(str(run_dir), "MUX0000000780.nxs")
+
+    def test_missing_directory(self, tmp_path):
+        assert RunIndex(str(tmp_path / "missing")).find("2630") == ({}, None)
+
+    def test_load_run_dispatches_to_format_found(
+        self, qapp, monkeypatch, load_settings
+    ):
+        def fail(*args, **kwargs):
+            raise AssertionError("Nexus loader called for Biriani run")
+
+        monkeypatch.setattr(load_data, "load_run_nxs", fail)
+
+        wdir = get_config()["general"]["working_directory"]
+        assert run_index.get_run_index(wdir) is run_index.get_run_index(wdir + "/")
+
+        run, flags = load_data.load_run("3064", wdir, **load_settings)
+        assert flags["no_files_found"] == 0
+        assert run.loaded_detectors == ["GE1", "GE2", "GE3"]
+
+        run, flags = load_data.load_run("0", wdir, **load_settings)
+        assert flags == {"no_files_found": 1}